@@ -0,0 +1,50 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .retrieval import Passage
+
+
+@dataclass
+class QueryAnalysis:
+    """Everything ZEEROAgent.reply needs to know about one query.
+
+    The query is lowercased, normalized and tokenized once; exact keyword hits
+    come from a single automaton scan and fuzzy hits from a single pass over
+    the tokens. Topic check, intent resolution, confidence scoring and answer
+    selection all read from this object instead of re-parsing the text, so the
+    outcome depends on the normalized text alone.
+    """
+
+    normalized: str
+    tokens: List[str]
+    hits: Dict[str, Set[str]]
+    fuzzy: Set[str]
+    words: FrozenSet[str] = field(init=False)
+    topic_ok: bool = False
+    intent: Optional[str] = None
+    # (intent, score) for every intent that scored, best first
+    intent_scores: List[Tuple[str, float]] = field(default_factory=list)
+    confidence: float = 0.0
+    # BM25 hits from the knowledge base when no intent matched
+    retrieved: List[Tuple[float, Passage]] = field(default_factory=list)
+    # Input was cut or the typo pass was skipped/shortened to bound the cost
+    degraded: bool = False
+
+    def __post_init__(self) -> None:
+        self.words = frozenset(self.tokens)
+
+    def matched(self, group: str, keywords: Iterable[str]) -> bool:
+        """True when a compiled keyword list hit exactly or through a typo."""
+        if self.hits.get(group):
+            return True
+        return any(k in self.fuzzy for k in keywords)
+
+    def has_whole_word(self, words: Iterable[str]) -> bool:
+        for word in words:
+            if " " not in word:
+                if word in self.words:
+                    return True
+            elif re.search(r'\b' + re.escape(word) + r'\b', self.normalized):
+                return True
+        return False
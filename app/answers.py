@@ -0,0 +1,62 @@
+import re
+from dataclasses import dataclass
+from typing import Mapping, Optional, Tuple
+
+_WORD = re.compile(r"\S+")
+
+
+@dataclass(frozen=True)
+class RenderedAnswer:
+    """One intent/variant answer, rendered and word-limited ahead of time."""
+
+    text: str
+    answer: str
+    truncated: bool
+    # words in answer
+    word_count: int
+    # answer split at line boundaries for streaming
+    chunks: Tuple[str, ...]
+    # answer encoded as a JSON string, ready to drop into a response body
+    answer_json: bytes
+
+
+# (intent, variant) -> answer; intent is None for the generic fallback
+AnswerKey = Tuple[Optional[str], str]
+AnswerTable = Mapping[AnswerKey, RenderedAnswer]
+
+
+def limit_words(text: str, max_words: int) -> Tuple[str, bool, int]:
+    """Cut markdown to at most max_words words without breaking its lines.
+
+    Walks the text a line at a time and stops at the first line that would go
+    over the limit, so a long text is never tokenized in full. The cut goes
+    after the last whole line that fits, keeping headings, list items and
+    inline formatting (which never span lines here) intact along with the
+    original line breaks. Only if the first line alone is over the limit is it
+    cut mid-line, after the last word that fits.
+
+    Returns (answer, truncated, words in answer).
+    """
+    count = 0
+    line_cut = 0  # end of the last non-blank line that fits
+    start, size = 0, len(text)
+    while start < size:
+        end = text.find("\n", start)
+        if end == -1:
+            end = size
+        line = text[start:end]
+        words = len(line.split())
+        if count + words > max_words:
+            if count:
+                return text[:line_cut], True, count
+            cut = line_cut
+            for i, match in enumerate(_WORD.finditer(text, start, end)):
+                if i == max_words:
+                    break
+                cut = match.end()
+            return text[:cut], True, max_words
+        if words:
+            count += words
+            line_cut = start + len(line.rstrip())
+        start = end + 1
+    return text, False, count
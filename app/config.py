@@ -0,0 +1,102 @@
+import os
+
+# Fuzzy keyword matching: minimum difflib-style similarity ratio for a typo to
+# count as a keyword hit, and the most deletions a query word is expanded to in
+# the typo index (longer words are compared with every keyword; same results).
+FUZZY_THRESHOLD = float(os.getenv("ZEERO_FUZZY_THRESHOLD", "0.8"))
+FUZZY_MAX_DISTANCE = int(os.getenv("ZEERO_FUZZY_MAX_DISTANCE", "2"))
+# Distinct query words whose typo lookups are remembered (LRU; 0 = off).
+FUZZY_MEMO_SIZE = int(os.getenv("ZEERO_FUZZY_MEMO_SIZE", "8192"))
+
+# Response cache for ZEEROAgent.reply, keyed on the normalized query.
+# Set ZEERO_CACHE_SIZE=0 to disable; TTL is in seconds (0 = no expiry).
+RESPONSE_CACHE_SIZE = int(os.getenv("ZEERO_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("ZEERO_CACHE_TTL", "300"))
+
+# Max number of queries accepted by POST /v1/chat/batch.
+BATCH_MAX_SIZE = int(os.getenv("ZEERO_BATCH_MAX_SIZE", "100"))
+
+# Max characters per chunk streamed by POST /v1/chat/stream (whole lines only).
+STREAM_CHUNK_CHARS = int(os.getenv("ZEERO_STREAM_CHUNK_CHARS", "400"))
+
+# Knowledge base file, how often (seconds) to poll it for changes (0 = never),
+# and the token required by POST /v1/admin/reload (unset = endpoint disabled).
+KNOWLEDGE_BASE_PATH = os.getenv(
+    "ZEERO_KNOWLEDGE_BASE", os.path.join(os.path.dirname(__file__), "data", "ormik_2025.json")
+)
+KB_WATCH_INTERVAL = float(os.getenv("ZEERO_KB_WATCH_INTERVAL", "5"))
+ADMIN_TOKEN = os.getenv("ZEERO_ADMIN_TOKEN", "")
+
+# BM25 fallback for on-topic queries with no matching intent: how many
+# knowledge base items to return and the minimum score for an item to count.
+RETRIEVAL_TOP_K = int(os.getenv("ZEERO_RETRIEVAL_TOP_K", "3"))
+RETRIEVAL_MIN_SCORE = float(os.getenv("ZEERO_RETRIEVAL_MIN_SCORE", "2.5"))
+# A query with no topic keyword is only answered from (and counted on topic by)
+# the knowledge base when every word of it occurs there (or is an intent keyword)
+# and one is rare, i.e. has at least this BM25 idf ("softlens", "bpjs"); 0 = never.
+RETRIEVAL_TOPIC_MIN_IDF = float(os.getenv("ZEERO_RETRIEVAL_TOPIC_MIN_IDF", "3.5"))
+
+# Prometheus metrics at GET /metrics (stage timings, route latency, intent
+# counters, cache stats). ZEERO_METRICS=0 turns off collection and the endpoint.
+METRICS_ENABLED = os.getenv("ZEERO_METRICS", "1").lower() not in ("0", "false", "no", "off")
+
+# Cost bounds for one query. Longer input is cut (bytes first, then tokens)
+# and answered from the prefix; at most FUZZY_BUDGET distinct words get a typo
+# lookup; queries over EARLY_EXIT_TOKENS tokens skip the typo pass once exact
+# matches already settle topic and intent (0 = never). Responses cut by any of
+# these are flagged ``degraded``.
+QUERY_MAX_BYTES = int(os.getenv("ZEERO_QUERY_MAX_BYTES", "2048"))
+QUERY_MAX_TOKENS = int(os.getenv("ZEERO_QUERY_MAX_TOKENS", "64"))
+FUZZY_BUDGET = int(os.getenv("ZEERO_FUZZY_BUDGET", "32"))
+EARLY_EXIT_TOKENS = int(os.getenv("ZEERO_EARLY_EXIT_TOKENS", "40"))
+
+# Prebuilt agent snapshot (see app/snapshot.py). When set and the file matches
+# the current code and knowledge base, startup loads it instead of building.
+SNAPSHOT_PATH = os.getenv("ZEERO_SNAPSHOT", "")
+
+# Worker processes forked by `python -m app.serve` after the agent is built once.
+WORKERS = int(os.getenv("ZEERO_WORKERS", "1"))
+
+# Other tenants' knowledge bases: <dir>/<tenant>.json, built on first use and
+# evicted least recently used first once they add up to more than the budget.
+# Unset = only the default tenant.
+TENANTS_DIR = os.getenv("ZEERO_TENANTS_DIR", "")
+TENANT_MEMORY_MB = float(os.getenv("ZEERO_TENANT_MEMORY_MB", "256"))
+
+# Query log for tuning the keyword tables: "jsonl" or "sqlite" (unset = off).
+# Files rotate at QUERY_LOG_MAX_MB, keeping QUERY_LOG_BACKUPS old ones; entries
+# beyond QUERY_LOG_BUFFER waiting to be written are dropped and counted.
+# Counts per intent are written every QUERY_LOG_AGGREGATE_INTERVAL seconds.
+QUERY_LOG = os.getenv("ZEERO_QUERY_LOG", "")
+QUERY_LOG_DIR = os.getenv("ZEERO_QUERY_LOG_DIR", "logs")
+QUERY_LOG_BUFFER = int(os.getenv("ZEERO_QUERY_LOG_BUFFER", "10000"))
+QUERY_LOG_MAX_MB = float(os.getenv("ZEERO_QUERY_LOG_MAX_MB", "50"))
+QUERY_LOG_BACKUPS = int(os.getenv("ZEERO_QUERY_LOG_BACKUPS", "5"))
+QUERY_LOG_AGGREGATE_INTERVAL = float(os.getenv("ZEERO_QUERY_LOG_AGGREGATE_INTERVAL", "60"))
+
+# WebSocket chat: connections silent for WS_IDLE_TIMEOUT seconds are closed
+# (0 = never); at most WS_MAX_IN_FLIGHT queries per connection are answered at
+# once, and the socket isn't read again until one of them is done.
+WS_IDLE_TIMEOUT = float(os.getenv("ZEERO_WS_IDLE_TIMEOUT", "60"))
+WS_MAX_IN_FLIGHT = int(os.getenv("ZEERO_WS_MAX_IN_FLIGHT", "16"))
+
+# Cache-Control max-age (seconds) for GET /v1/keywords and GET /v1/chat; ETags
+# change with the knowledge base, so this only bounds staleness after a reload.
+HTTP_CACHE_MAX_AGE = int(os.getenv("ZEERO_HTTP_CACHE_MAX_AGE", "60"))
+
+# Token-bucket rate limits for the chat routes, per X-API-Key and per client
+# IP: sustained requests/second and burst size (rate 0 = no limit). Behind a
+# proxy, set ZEERO_FORWARDED_ALLOW_IPS below so the client IP is the real one.
+# Keys aren't verified, so the IP limit is what holds back clients that send
+# no key or a new one per request; keep it on and above the key limit.
+RATE_LIMIT_KEY_RATE = float(os.getenv("ZEERO_RATE_LIMIT_KEY_RATE", "10"))
+RATE_LIMIT_KEY_BURST = float(os.getenv("ZEERO_RATE_LIMIT_KEY_BURST", "40"))
+RATE_LIMIT_IP_RATE = float(os.getenv("ZEERO_RATE_LIMIT_IP_RATE", "30"))
+RATE_LIMIT_IP_BURST = float(os.getenv("ZEERO_RATE_LIMIT_IP_BURST", "100"))
+RATE_LIMIT_MAX_BUCKETS = int(os.getenv("ZEERO_RATE_LIMIT_MAX_BUCKETS", "100000"))
+
+# Proxies python -m app.serve takes X-Forwarded-For/-Proto from (comma-separated
+# IPs, "*" = any); without it every user behind a proxy shares the proxy's IP.
+# ZEERO_PROXY_HEADERS=0 ignores the headers altogether.
+FORWARDED_ALLOW_IPS = os.getenv("ZEERO_FORWARDED_ALLOW_IPS", "127.0.0.1")
+PROXY_HEADERS = os.getenv("ZEERO_PROXY_HEADERS", "1") != "0"
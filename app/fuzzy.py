@@ -0,0 +1,122 @@
+import sys
+from difflib import SequenceMatcher
+from typing import Any, Dict, FrozenSet, Iterable, List, Set
+
+from .cache import ResponseCache
+
+
+class FuzzyIndex:
+    """SymSpell-style deletion dictionary over the fuzzy-eligible keywords.
+
+    Every keyword is stored under each string reachable by deleting up to
+    ``max_distance`` characters. A lookup generates the same deletions of the
+    query word, so only keywords sharing a deletion variant are scored with
+    ``SequenceMatcher`` -- typically a handful instead of the whole list.
+
+    A ratio of ``threshold`` bounds how many characters each side can lose to
+    reach the common subsequence (``len * (2 - 2t) / (2 - t)``, a third of the
+    length at 0.8), and keywords are indexed down to that bound. A query word
+    whose own bound is over ``max_distance`` (longer than eight characters at
+    0.8) would need too many deletions, so it is compared against every keyword
+    instead. Either way the answers are exactly those of a full difflib scan.
+
+    Lookups are memoized per word in a bounded LRU shared by every request
+    (``memo_size`` entries, 0 = off): the same typos come up over and over, and
+    a repeat costs a dictionary lookup instead of the deletions and the
+    ``SequenceMatcher`` scoring. Words are interned on their way in.
+    """
+
+    def __init__(self, keywords: Iterable[str], threshold: float = 0.8, max_distance: int = 2, memo_size: int = 0) -> None:
+        self.threshold = threshold
+        self.max_distance = max_distance
+        self.memo: ResponseCache[FrozenSet[str]] = ResponseCache(memo_size, 0)
+        # Longest query word looked up through the deletions; keywords too long to
+        # reach ``threshold`` against such a word only need to be in ``_forms``
+        self._max_word = self._longest_within(max_distance)
+        max_indexed = int(self._max_word * (2 - threshold) / threshold + 1e-9) if threshold > 0 else 0
+        # normalized form -> keywords as they appear in the tables
+        self._forms: Dict[str, List[str]] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+        for keyword in keywords:
+            form = keyword.lower().strip()
+            if form in self._forms:
+                self._forms[form].append(keyword)
+                continue
+            self._forms[form] = [keyword]
+            if len(form) > max_indexed:
+                continue
+            for variant in self._variants(form):
+                self._deletes.setdefault(variant, set()).add(form)
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword.lower().strip() in self._forms
+
+    def __len__(self) -> int:
+        return len(self._deletes)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The memo holds a lock and per-process traffic; snapshots carry its size only
+        state = self.__dict__.copy()
+        state["memo"] = self.memo.max_entries
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.memo = ResponseCache(state["memo"], 0)
+
+    def lookup(self, word: str) -> FrozenSet[str]:
+        """Keywords whose similarity to ``word`` is at least the threshold."""
+        if self.memo.max_entries <= 0:
+            return self._lookup(word)
+        word = sys.intern(word)
+        found = self.memo.get(word)
+        if found is None:
+            found = self._lookup(word)
+            self.memo.put(word, found)
+        return found
+
+    def memo_stats(self) -> Dict[str, Any]:
+        return self.memo.stats()
+
+    def _lookup(self, word: str) -> FrozenSet[str]:
+        if len(word) > self._max_word:
+            return frozenset(k for form, keywords in self._forms.items() if self.similar(word, form) for k in keywords)
+        candidates: Set[str] = set()
+        for variant in self._variants(word):
+            forms = self._deletes.get(variant)
+            if forms:
+                candidates.update(forms)
+        found: Set[str] = set()
+        for form in candidates:
+            if self.similar(word, form):
+                found.update(self._forms[form])
+        return frozenset(found)
+
+    def similar(self, word: str, keyword: str) -> bool:
+        total = len(word) + len(keyword)
+        if not total or 2.0 * min(len(word), len(keyword)) / total < self.threshold:
+            return False
+        matcher = SequenceMatcher(None, word, keyword)
+        # quick_ratio is an upper bound on ratio, so it only skips sure misses
+        return matcher.quick_ratio() >= self.threshold and matcher.ratio() >= self.threshold
+
+    def _depth(self, length: int) -> int:
+        t = self.threshold
+        # small epsilon so 6 * 0.4 / 1.2 is not floored to 1
+        return int(length * (2 - 2 * t) / (2 - t) + 1e-9) if t < 1 else 0
+
+    def _longest_within(self, max_distance: int) -> int:
+        if self.threshold >= 1:
+            return sys.maxsize
+        length = 0
+        while self._depth(length + 1) <= max_distance:
+            length += 1
+        return length
+
+    def _variants(self, word: str) -> Set[str]:
+        variants = {word}
+        frontier = {word}
+        for _ in range(self._depth(len(word))):
+            frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+            variants |= frontier
+        return variants
@@ -0,0 +1,42 @@
+import hashlib
+from typing import NamedTuple, Optional
+
+from fastapi import Response
+
+
+class CachedBody(NamedTuple):
+    """A serialized JSON response body and its strong ETag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def for_json(cls, version: str, body: bytes) -> "CachedBody":
+        return cls(body, strong_etag(version, body))
+
+
+def strong_etag(version: str, body: bytes) -> str:
+    """Quoted ETag over the knowledge base version and the exact response bytes."""
+    digest = hashlib.blake2b(version.encode() + b"\0" + body, digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison: a W/ prefix on either side doesn't matter
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def conditional_response(
+    cached: CachedBody, if_none_match: Optional[str], cache_control: str, vary: Optional[str] = None,
+) -> Response:
+    """304 when the client already has this body, else the body itself; both carry the validators."""
+    headers = {"ETag": cached.etag, "Cache-Control": cache_control}
+    if vary:
+        headers["Vary"] = vary
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
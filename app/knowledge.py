@@ -0,0 +1,218 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+# === Schema ===
+class Division(BaseModel):
+    name: str
+    position: str
+    description: str
+
+
+class TentangOrmik(BaseModel):
+    nama_lengkap: str
+    institusi: str
+    deskripsi: str
+    nama_acara: str
+    tahun: str
+    visi: str
+
+
+class KetentuanPeserta(BaseModel):
+    putra: List[str]
+    putri: List[str]
+    # Label -> one-line summary, answered for dress code and general ketentuan questions
+    ringkasan: Dict[str, str]
+
+
+class Perizinan(BaseModel):
+    saat_ormik: List[str]
+    tidak_mengikuti: List[str]
+
+
+class IndividuKompi(BaseModel):
+    individu: List[str]
+    kompi: List[str]
+
+
+class AtributPerlengkapan(BaseModel):
+    day_1: IndividuKompi
+    last_day: IndividuKompi
+    ringkasan: Dict[str, str]
+
+
+class TugasHari(IndividuKompi):
+    # "Individu"/"Kompi" -> one-line summary for the task overview
+    ringkasan: Dict[str, str]
+    catatan: List[str]
+
+
+class Tugas(BaseModel):
+    # Dates come from the schedule item with the same id ("day_1" -> "day-1")
+    pra_ormik: TugasHari
+    day_1: TugasHari
+    last_day: TugasHari
+
+
+class OrmikData(BaseModel):
+    tentang_ormik: TentangOrmik
+    divisi: Dict[str, Division]
+    tata_tertib: List[str]
+    hak_peserta: List[str]
+    kewajiban_peserta: List[str]
+    ketentuan_peserta: KetentuanPeserta
+    perizinan: Perizinan
+    punishment: Dict[str, List[str]]
+    # Level label -> one-line summary for the punishment overview
+    punishment_ringkasan: Dict[str, str]
+    atribut_perlengkapan: AtributPerlengkapan
+    tugas: Tugas
+
+
+class ScheduleItem(BaseModel):
+    id: str
+    title: str
+    date: str
+    fullDate: str
+
+
+class Contact(BaseModel):
+    instagram: str
+    instagram_handle: str
+
+
+class Acara(BaseModel):
+    """The event itself; answers, the off-topic reply and topic detection are built from it."""
+
+    # Used in answer headings ("Hak Peserta ORMIK 2025")
+    nama: str
+    nama_lengkap: str
+    institusi: str
+    # Names the event goes by; they put a query on topic and ask what the event is
+    kata_kunci: List[str]
+    pesan_offtopic: str
+
+
+class Kampus(BaseModel):
+    nama: str
+    alamat: str
+    kota: str
+    provinsi: str
+    hotline: str
+    whatsapp: str
+    email: str
+    website: str
+    maps_url: str
+    youtube: str
+    guidebook_url: str
+    fasilitas: str
+    akses: str
+    # Names of the campus that put a query on topic
+    kata_kunci: List[str]
+
+
+class ContextData(BaseModel):
+    acara: Acara
+    schedule: List[ScheduleItem]
+    contact: Contact
+    kampus: Kampus
+
+
+class Context(BaseModel):
+    ormikData: ContextData
+
+
+class KnowledgeBaseSchema(BaseModel):
+    ormik_data: OrmikData
+    context: Context
+
+
+# === Loading ===
+@dataclass(frozen=True)
+class KnowledgeBase:
+    """Validated knowledge base content plus a version derived from it."""
+
+    version: str
+    ormik_data: Dict[str, Any]
+    context: Dict[str, Any]
+    source: Optional[str] = None
+
+
+def parse_knowledge_base(raw: Dict[str, Any], source: Optional[str] = None) -> KnowledgeBase:
+    """Validate raw content against the schema; raises pydantic.ValidationError."""
+    data = KnowledgeBaseSchema.model_validate(raw).model_dump()
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    version = hashlib.sha256(canonical).hexdigest()[:16]
+    return KnowledgeBase(version=version, ormik_data=data["ormik_data"], context=data["context"], source=source)
+
+
+def load_knowledge_base(path: str) -> KnowledgeBase:
+    with open(path, "rb") as f:
+        raw = json.loads(f.read())
+    return parse_knowledge_base(raw, source=path)
+
+
+class KnowledgeBaseWatcher:
+    """Poll a knowledge base file and hand every new valid version to on_change.
+
+    Runs in a daemon thread so loading, validation and index building never
+    happen on the request path. Invalid files are logged and skipped; the
+    previous knowledge base stays in service.
+    """
+
+    def __init__(self, path: str, interval: float, on_change: Callable[[KnowledgeBase], Any]) -> None:
+        self.path = path
+        self.interval = interval
+        self.on_change = on_change
+        self._stamp = self._file_stamp()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="kb-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> bool:
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            kb = load_knowledge_base(self.path)
+        except Exception:
+            logger.exception("Knowledge base %s is invalid, keeping the current one", self.path)
+            return False
+        try:
+            self.on_change(kb)
+        except Exception:
+            # A failed build must not end the watcher thread; the next edit is tried again
+            logger.exception("Applying knowledge base %s failed, keeping the current one", self.path)
+            return False
+        return True
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
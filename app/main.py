@@ -1,13 +1,69 @@
-from fastapi import FastAPI, Depends, Header, HTTPException
+import time
+# Startup import time is measured from here, so it includes FastAPI and pydantic
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import APIRouter, FastAPI, Depends, Header, HTTPException, Query, Request, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any
-from .models import ChatRequest, ChatResponse, KeywordsResponse
-import re
-from difflib import get_close_matches
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, Any, Iterator, List, Set, Tuple
+from .models import ChatBatchRequest, ChatRequest, ChatResponse, KeywordsResponse
+from .analysis import QueryAnalysis
+from .answers import AnswerKey, AnswerTable, RenderedAnswer, limit_words
+from .cache import ResponseCache
+from .config import (
+    ADMIN_TOKEN, EARLY_EXIT_TOKENS, FUZZY_BUDGET, FUZZY_MAX_DISTANCE, FUZZY_MEMO_SIZE, FUZZY_THRESHOLD, HTTP_CACHE_MAX_AGE, KB_WATCH_INTERVAL,
+    KNOWLEDGE_BASE_PATH, METRICS_ENABLED, QUERY_LOG, QUERY_LOG_AGGREGATE_INTERVAL, QUERY_LOG_BACKUPS, QUERY_LOG_BUFFER,
+    QUERY_LOG_DIR, QUERY_LOG_MAX_MB, QUERY_MAX_BYTES, QUERY_MAX_TOKENS, RATE_LIMIT_IP_BURST,
+    RATE_LIMIT_IP_RATE, RATE_LIMIT_KEY_BURST, RATE_LIMIT_KEY_RATE, RATE_LIMIT_MAX_BUCKETS, RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL, RETRIEVAL_MIN_SCORE, RETRIEVAL_TOP_K, RETRIEVAL_TOPIC_MIN_IDF, SNAPSHOT_PATH,
+    STREAM_CHUNK_CHARS, TENANT_MEMORY_MB, TENANTS_DIR, WS_IDLE_TIMEOUT, WS_MAX_IN_FLIGHT,
+)
+from .fuzzy import FuzzyIndex
+from .httpcache import CachedBody, conditional_response
+from .knowledge import KnowledgeBase, KnowledgeBaseWatcher, load_knowledge_base
+from .matcher import KeywordMatcher, normalize_text
+from .metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, Gauge, Metrics, MetricsMiddleware, Stopwatch, format_memory, process_memory,
+)
+from .querylog import SINKS, QueryLog
+from .ratelimit import RateLimiter
+from .retrieval import BM25Index, Passage, knowledge_passages
+from .scoring import ContextRule, IntentScorer
+from .serialization import chat_response_json, dumps
+from .snapshot import fingerprint, load_snapshot
+from .streaming import split_markdown, sse_event
+from .tenants import DEFAULT_TENANT, TenantNotFound, TenantRegistry, TenantUnavailable
+from .websocket import ChatSockets
+import datetime
+import hmac
+import logging
+import math
+import os
+import threading
+
+logger = logging.getLogger(__name__)
 
 ALLOWED_ORIGINS = ["*"]
 
-app = FastAPI(title="ZEERO Agent API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up before serving (unless a prefork parent already did); /ready reports 503 until then
+    if startup["warmup_ms"] is None:
+        warm_up_agent()
+    logger.info("Worker %d ready: %s", os.getpid(), format_memory(process_memory()))
+    watcher = KnowledgeBaseWatcher(KNOWLEDGE_BASE_PATH, KB_WATCH_INTERVAL, reload_knowledge_base)
+    watcher.start()
+    if query_log is not None:
+        query_log.start()
+    yield
+    watcher.stop()
+    if query_log is not None:
+        query_log.stop()
+
+app = FastAPI(title="ZEERO Agent API", version="1.0.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -16,271 +72,100 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-OFFTOPIC_MSG = (
-    "Maaf, saya hanya bisa membantu pertanyaan seputar ORMIK 2025 dan STT Nurul Fikri. "
-    "Silakan hubungi @ormikxplore di Instagram untuk informasi lainnya."
-)
+# One registry per process so counters survive knowledge base reloads
+metrics = Metrics() if METRICS_ENABLED else None
+if metrics is not None:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+if QUERY_LOG and QUERY_LOG not in SINKS:
+    raise ValueError(f"ZEERO_QUERY_LOG must be one of {', '.join(SINKS)}, not {QUERY_LOG!r}")
+query_log = QueryLog(
+    SINKS[QUERY_LOG](QUERY_LOG_DIR, int(QUERY_LOG_MAX_MB * 1024 * 1024), QUERY_LOG_BACKUPS),
+    capacity=QUERY_LOG_BUFFER,
+    aggregate_interval=QUERY_LOG_AGGREGATE_INTERVAL,
+) if QUERY_LOG else None
+
+# Indonesian month abbreviations for short dates ("16 Sept")
+BULAN_SINGKAT = ("Jan", "Feb", "Mar", "Apr", "Mei", "Jun", "Jul", "Agu", "Sept", "Okt", "Nov", "Des")
+
+class CachedReply:
+    """A response cache entry: the reply and its intent label, plus its JSON body once serialized."""
+
+    __slots__ = ("response", "label", "answer_json", "body", "conditional")
+
+    def __init__(self, response: ChatResponse, label: str, answer_json: bytes) -> None:
+        self.response = response
+        self.label = label
+        self.answer_json = answer_json
+        self.body: bytes | None = None
+        # body with its ETag, for GET requests
+        self.conditional: CachedBody | None = None
 
 class ZEEROAgent:
-    def __init__(self) -> None:
-        self.context = self._init_context()
-        
-        # Knowledge base ORMIK Explore 2025 STT NF
-        self.ormik_data = {
-            "tentang_ormik": {
-                "nama_lengkap": "Orientasi Mahasiswa Baru",
-                "institusi": "Sekolah Tinggi Teknologi Terpadu Nurul Fikri",
-                "deskripsi": "Kegiatan yang bertujuan untuk memperkenalkan mahasiswa baru dengan sistem perkuliahan dan lingkungan kampus.",
-                "nama_acara": "Ormik Explore",
-                "tahun": "2025",
-                "visi": "ORMIK EXPLORE 2025 memiliki visi menjadi titik mulai eksplorasi mahasiswa baru STT-NF dalam membangun semangat akademik, budaya positif, dan kesiapan diri di era modern."
-            },
-            "divisi": {
-                "steering_committee": {
-                    "name": "Steering Committee",
-                "position": "STEERING COMMITTEE",
-                    "description": "Steering Committee bertanggung jawab mengendalikan seluruh proses kegiatan, mulai dari tahap perencanaan hingga evaluasi akhir, guna memastikan kegiatan berjalan sesuai tujuan dan harapan."
-                },
-                "project_officer": {
-                    "name": "Project Officer",
-                    "position": "PROJECT OFFICER", 
-                    "description": "Individu yang memegang tanggung jawab penuh atas pelaksanaan kegiatan ORMIK. Project Officer bertugas mengawasi secara langsung seluruh elemen di bawahnya, antara lain Sekretaris, Bendahara, dan divisi-divisi lainnya."
-                },
-                "sekretaris": {
-                    "name": "Sekretaris",
-                    "position": "SEKRETARIS",
-                    "description": "Membantu Project officer dalam menjalankan fungsi administrasi, dengan tanggung jawab utama meliputi pengelolaan dokumen, surat-menyurat, proposal, serta pembuatan notulen rapat."
-                },
-                "bendahara": {
-                    "name": "Bendahara", 
-                    "position": "BENDAHARA",
-                    "description": "Bendahara bertugas untuk menyusun rencana anggaran, mencatat transaksi keuangan, dan membuat laporan pertanggungjawaban keuangan, serta berkoordinasi dengan pihak Kemahasiswaan terkait dana kegiatan."
-                },
-                "public_relation": {
-                    "name": "Public Relation",
-                    "position": "PUBLIC RELATION",
-                    "description": "Bertanggung jawab untuk mengelola komunikasi, membangun citra positif, serta menjalin hubungan antara ORMIK dengan eksternal di lingkup STT NF."
-                },
-                "liaison_officer": {
-                    "name": "Liaison Officer",
-                    "position": "LIAISON OFFICER", 
-                    "description": "Divisi ini akan berkomunikasi dengan publik eksternal maupun internal kampus. LO juga bertindak sebagai contact person bagi pihak internal maupun eksternal. Serta membantu briefing pihak internal maupun eksternal."
-                },
-                "event": {
-                    "name": "Event",
-                    "position": "EVENT",
-                    "description": "Bertanggung jawab atas perencanaan, koordinasi, dan pelaksanaan seluruh rangkaian acara ORMIK, termasuk acara puncak."
-                },
-                "media": {
-                    "name": "Media",
-                    "position": "MEDIA",
-                    "description": "Bertugas untuk memproduksi, mengelola, dan mengabadikan seluruh momen kegiatan ORMIK dalam bentuk dokumentasi serta memastikan seluruh kebutuhan visual dan desain terpenuhi."
-                },
-                "kreatif": {
-                    "name": "Kreatif",
-                    "position": "KREATIF",
-                    "description": "Divisi Kreatif bertugas menciptakan suasana acara yang menarik, interaktif, dan berkesan melalui berbagai elemen hiburan, visual, dan partisipatif."
-                },
-                "kedisiplinan": {
-                    "name": "Kedisiplinan",
-                    "position": "KEDISIPLINAN",
-                    "description": "Bertugas memastikan seluruh rangkaian kegiatan ORMIK berjalan dengan tertib, tepat waktu, dan sesuai aturan yang telah ditetapkan."
-                },
-                "mentor": {
-                    "name": "Mentor",
-                    "position": "MENTOR",
-                    "description": "Bertugas untuk membimbing, mengarahkan, mendampingi, dan memberikan dukungan kepada peserta ORMIK selama kegiatan berlangsung."
-                },
-                "logistik": {
-                    "name": "Logistik",
-                    "position": "LOGISTIK",
-                    "description": "Bertanggung jawab untuk mengatur seluruh kebutuhan perlengkapan, peralatan, dan sarana prasarana yang diperlukan dalam mendukung kelancaran kegiatan ORMIK."
-                },
-                "konsumsi": {
-                    "name": "Konsumsi",
-                    "position": "KONSUMSI",
-                    "description": "Bertugas untuk menyiapkan menu makanan, camilan, serta menjadwalkan waktu makan selama kegiatan ORMIK. Divisi ini juga harus mampu mengatur persediaan makanan dengan cermat untuk memastikan kelancaran acara."
-                },
-                "medis": {
-                    "name": "Medis",
-                    "position": "MEDIS",
-                    "description": "Bertugas untuk memastikan keselamatan dan kesehatan seluruh peserta dan panitia selama kegiatan ORMIK berlangsung."
-                },
-                "it_support": {
-                    "name": "IT Support",
-                    "position": "IT SUPPORT",
-                    "description": "Fokus utama divisi ini mencakup instalasi perangkat, live streaming, serta pengawasan terhadap tiga objek utama, komputer, software, dan sistem jaringan (network)."
-                }
-            },
-            "tata_tertib": [
-                "Peserta wajib menjaga nama baik Almamater STT Terpadu Nurul Fikri.",
-                "Peserta wajib datang tepat waktu pada pukul 06.30 WIB.",
-                "Peserta wajib mengikuti seluruh rangkaian ORMIK dan wajib izin apabila tidak bisa mengikuti atau meninggalkan serangkaian acara ORMIK.",
-                "Peserta wajib menghormati dan menghargai panitia maupun sesama peserta ORMIK.",
-                "Peserta wajib menjaga sikap, perilaku, dan tidak boleh gaduh selama acara berlangsung.",
-                "Peserta wajib menerapkan 6S (Senyum, Salam, Sapa, Sopan, Santun, dan Semangat) kepada siapapun.",
-                "Peserta wajib mengisi semua presensi yang disediakan oleh panitia.",
-                "Peserta wajib menggunakan pakaian yang telah ditentukan panitia dari hari pertama hingga akhir.",
-                "Peserta tidak boleh meninggalkan ruang kelas tanpa seizin Tim Kedisiplinan dan Mentor.",
-                "Peserta wajib memakai atribut yang sesuai dengan yang sudah ditentukan.",
-                "Peserta wajib membawa dan melaksanakan penugasan yang diberikan dengan sebaik-baiknya dan penuh tanggung jawab.",
-                "Dilarang membawa senjata tajam dan senjata api.",
-                "Dilarang membawa, mengedarkan, dan menggunakan rokok, rokok elektrik (vape), obat-obatan terlarang, minuman keras, serta barang yang berbau pornografi.",
-                "Dilarang mengikuti rangkaian acara ORMIK dalam keadaan di bawah pengaruh minuman beralkohol dan obat-obatan terlarang.",
-                "Dilarang melakukan kontak fisik dengan lawan jenis, baik peserta maupun panitia ORMIK.",
-                "Dilarang menggunakan smartphone selama acara berlangsung, kecuali jika telah mendapatkan izin dari Mentor dan Tim Kedisiplinan.",
-                "Dilarang menggunakan kalimat atau perkataan yang merendahkan pihak lain.",
-                "Dilarang memakai perhiasan, make up berlebihan, tindik, bertato, dan rambut berwarna."
-            ],
-            "hak_peserta": [
-                "Mengeluarkan pendapat, baik secara lisan maupun tulisan.",
-                "Memperoleh perlakuan yang adil dan layak berdasarkan nilai-nilai kemanusiaan.",
-                "Mendapat pembelaan dari panitia apabila diperlakukan secara tidak adil.",
-                "Mendapat informasi yang jelas tentang jadwal kegiatan dan segala yang berkaitan dengan kegiatan ORMIK STT NF.",
-                "Mendapatkan materi ORMIK STT NF.",
-                "Mendapatkan sertifikat bagi yang mengikuti seluruh rangkaian kegiatan ORMIK STT NF, sesuai dengan ketentuan panitia pelaksana.",
-                "Melaporkan segala tindakan panitia yang melanggar nilai kemanusiaan dan merugikan STT NF."
-            ],
-            "kewajiban_peserta": [
-                "Mengikuti seluruh rangkaian kegiatan ORMIK STT NF atau yang telah dijadwalkan oleh panitia pelaksana.",
-                "Wajib menjaga nama baik STT Terpadu Nurul Fikri dan IM STT NF.",
-                "Menaati segala ketentuan yang telah ditetapkan oleh panitia pelaksana."
-            ],
-            "ketentuan_peserta": {
-                "putra": [
-                    "Pakaian bersih, rapi, dan sopan.",
-                    "Baju dimasukkan.",
-                    "Lengan tidak digulung.",
-                    "Tidak ketat.",
-                    "Menggunakan ikat pinggang hitam.",
-                    "Menggunakan kaos kaki berwarna putih diatas mata kaki.",
-                    "Rambut tidak dicat dan rapi.",
-                    "Menggunakan sepatu berwarna dominan hitam.",
-                    "Kuku bersih dan tidak panjang.",
-                    "Dilarang menggunakan aksesori seperti jaket, gelang/kalung, topi (kecuali jam tangan).",
-                    "Dilarang membawa barang terlarang seperti narkoba, minuman keras/alkohol, rokok/vape, senjata tajam atau alat berbahaya."
-                ],
-                "putri": [
-                    "Pakaian bersih, rapi, dan sopan.",
-                    "Mengenakan pakaian yang longgar, tidak transparan, dan tidak memperlihatkan lekuk tubuh.",
-                    "Baju tidak dimasukkan (dikeluarkan).",
-                    "Pakaian tidak ketat.",
-                    "Lengan baju tidak digulung.",
-                    "Wajib mengenakan rok bahan (bukan rok span) dengan panjang hingga mata kaki.",
-                    "Menggunakan kaos kaki berwarna putih di atas mata kaki.",
-                    "Rambut tidak dicat dan rapi.",
-                    "Bagi yang beragama Islam, diwajibkan menggunakan jilbab segiempat dan ciput.",
-                    "Bagi non muslim yang tidak mengenakan jilbab, rambut yang panjangnya melebihi bahu wajib diikat rapi selama acara berlangsung.",
-                    "Menggunakan sepatu berwarna dominan hitam.",
-                    "Kuku bersih, tidak panjang, dan tidak diwarnai.",
-                    "Dilarang memakai riasan (make up) yang berlebihan.",
-                    "Tidak diperkenankan menggunakan kontak lensa (softlens) yang berwarna.",
-                    "Dilarang menggunakan aksesori seperti jaket, gelang/kalung, topi (kecuali jam tangan).",
-                    "Dilarang membawa barang terlarang seperti narkoba, minuman keras/alkohol, rokok/vape, senjata tajam/alat berbahaya."
-                ]
-            },
-            "perizinan": {
-                "saat_ormik": [
-                    "Izin dapat dilakukan saat ORMIK berlangsung dengan cara melakukan perizinan langsung kepada Tim Kedisiplinan atau Mentor yang berada diruangan dan memberikan alasannya."
-                ],
-                "tidak_mengikuti": [
-                    "Peserta ORMIK yang tidak mengikuti kegiatan, diwajibkan membuat surat izin dan mengirimkannya via WhatsApp kepada Mentor masing-masing.",
-                    "Izin diberitahukan H-1 (selambat-lambatnya pukul 23.59 WIB) sebelum acara berlangsung.",
-                    "Memberikan bukti otentik bahwa yang bersangkutan memiliki keperluan atau kendala di luar acara ORMIK."
-                ]
-            },
-            "punishment": {
-                "ringan": [
-                    "Memungut 10 sampah di area kampus.",
-                    "Contoh pelanggaran: melanggar aturan-aturan yang telah ditetapkan (1x pelanggaran)."
-                ],
-                "sedang": [
-                    "Menyanyikan Lagu Mars STT Nurul Fikri.",
-                    "Membuat surat permintaan maaf yang ditandatangani minimal 15 Panitia ORMIK.",
-                    "Contoh pelanggaran: melanggar aturan-aturan yang telah ditetapkan (2x pelanggaran)."
-                ],
-                "berat": [
-                    "Akan mendapatkan evaluasi langsung dari Project Officer atau Steering Committee.",
-                    "Contoh pelanggaran: sudah mendapatkan punishment sedang dan masih melakukan pelanggaran."
-                ],
-                "khusus": [
-                    "Dilaporkan langsung ke pihak kampus.",
-                    "Contoh pelanggaran: membawa atau mengedarkan obat-obatan terlarang, minuman keras, serta barang yang berbau pornografi, datang ke kampus dalam keadaan dibawah pengaruh minuman beralkohol dan obat-obatan terlarang."
-                ]
-            },
-            "atribut_perlengkapan": {
-                "day_1": {
-                    "individu": [
-                        "Makanan: snack level up, snack zero panggang, air pegunungan, putih salju, bola kuning, kotak garing rasa ayam.",
-                        "ATK",
-                        "Topi rimba (warna navy)",
-                        "Name tag",
-                        "Buku passport",
-                        "Kantung kresek (untuk sepatu)",
-                        "Sandal",
-                        "Alat salat",
-                        "Kartu asuransi kesehatan (BPJS)",
-                        "Tumbler atau tempat minum"
-                    ],
-                    "kompi": [
-                        "Trash bag"
-                    ]
-                },
-                "last_day": {
-                    "individu": [
-                        "ATK",
-                        "Topi rimba (warna navy)",
-                        "Name tag",
-                        "Buku passport",
-                        "Kantung kresek (untuk sepatu)",
-                        "Sandal",
-                        "Alat salat",
-                        "Kartu asuransi kesehatan (BPJS)",
-                        "Tumbler atau tempat minum"
-                    ],
-                    "kompi": [
-                        "Trash bag"
-                    ]
-                }
-            },
-            "tugas": {
-                "pra_ormik": {
-                    "individu": [
-                        "Membuat name tag berbentuk siluet Zeroo, template: [NAMETAG] EXPLORERS of ORMIK EXPLORE 2025.docx, dilaminating dan menggunakan kertas ukuran A4, berisi: nama kompi, logo kompi, nama, foto (3x4), Prodi, asal daerah, motto hidup, tali name tag berwarna sesuai Prodi (SI=Oren, TI=Biru tua, BD=Merah).",
-                        "Mengunggah twibbon ke Instagram, template: http://twibbo.nz/explorers-oe25, wajib First Account, tag / mention IG @ormikxplore, @sttnf_official, dan Mentor masing-masing, kirimkan link postingan ke GForm penugasan.",
-                        "Membuat Video Perkenalan, ketentuan: menggunakan kemeja putih dan bawahan hitam, profil diri (nama lengkap, nama panggilan, kompi, prodi, domisili), fun Fact diri sendiri, hobi, alasan pilih Prodi, 'Kalau kamu adalah seorang penjelajah, kamu mau menjelajahi apa?', tambahan kalimat akhir video: '(Nama kamu) siap terbang bersama ORMIK Explore 2025! Start from Zero Go To Heroo!', frame video perkenalan: [OE25] FRAME EXPLORER INTRODUCE.png, unggah video di reels instagram first account masing-masing lalu tag IG @sttnf_official, @ormikxplore, serta Mentor masing-masing, kirimkan link video ke GForm penugasan.",
-                        "Wajib menghafalkan lagu: Hymne STT NF, Mars STT NF. Notes: Buat video lalu kirimkan link video (GDrive) ke GForm penugasan."
-                    ],
-                    "kompi": [
-                        "Membuat akun Instagram kompi.",
-                        "Membuat logo kompi.",
-                        "Membuat yel-yel.",
-                        "Mempersiapkan bakat yang akan ditampilkan saat last day ORMIK.",
-                        "Membuat buku passport: Passport merupakan buku kecil yang wajib dimiliki oleh setiap mentee selama kegiatan ORMIK berlangsung. Passport ini berfungsi sebagai identitas, catatan perjalanan kegiatan, sekaligus bukti kehadiran dan partisipasi mentee. Desain passport dibuat sama setiap kompi. Isi utama buku: Halaman biografi peserta, lirik yel-yel kelompok, tabel penugasan perhari juga kesesuaian dresscode, dan kolom untuk TTD Panitia ORMIK. Ukuran buku passport A5 : 2. Referensi: https://youtube.com/shorts/t0jyYoVfUao?si=-v-VeuzCJ4kMoaUz, https://youtube.com/shorts/-xNlG-QLF6c?si=LdUNvk_9fEzgmwJl, https://pin.it/42Ylcu8Ke"
-                    ]
-                },
-                "day_1": {
-                    "individu": [
-                        "Membuat resume materi day 1."
-                    ],
-                    "kompi": [
-                        "Membuat video yel-yel dan upload di IG kompi masing-masing.",
-                        "Dokumentasi setelah selesai ORMIK day 1 dan upload di IG kompi masing-masing.",
-                        "Membuat konten video edukasi sekreatif mungkin dengan tema: Teknologi (tema setiap kompi harus berbeda-beda). Pengerjaan tugas ini boleh dikerjakan sebelum ORMIK day 1.",
-                        "* notes: Teknis pengumpulan seluruh tugas di link GForm penugasan."
-                    ]
-                },
-                "last_day": {
-                    "individu": [
-                        "Memberikan satu mini gift kepada Mentor masing-masing.",
-                        "Membuat dua surat yang dibentuk pesawat untuk diberikan ke Mentor masing-masing dan salah satu panitia ormik."
-                    ],
-                    "kompi": [
-                        "Menampilkan unjuk bakat kolaborasi dua kompi yang dibimbing oleh satu Mentor."
-                    ]
-                }
-            }
-        }
+    def __init__(
+        self,
+        knowledge_base: KnowledgeBase | None = None,
+        fuzzy_threshold: float = FUZZY_THRESHOLD,
+        cache_size: int = RESPONSE_CACHE_SIZE,
+        cache_ttl: float = RESPONSE_CACHE_TTL,
+        metrics: Metrics | None = None,
+        query_log: QueryLog | None = None,
+        tenant: str = DEFAULT_TENANT,
+    ) -> None:
+        self.fuzzy_threshold = fuzzy_threshold
+        self.metrics = metrics
+        self.query_log = query_log
+        self.tenant = tenant
+        # Cached with the resolved intent label so cache hits still count per intent
+        self.response_cache: ResponseCache[CachedReply] = ResponseCache(cache_size, cache_ttl)
+
+        # Knowledge base of the event (ORMIK Explore 2025 STT NF by default)
+        kb = knowledge_base or load_knowledge_base(KNOWLEDGE_BASE_PATH)
+        self.version = kb.version
+        self.ormik_data = kb.ormik_data
+        self.context = kb.context
+        # The event's and campus's own names come from the knowledge base
+        self.keyword_tables = self._init_keywords()
+        self._build()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Snapshots hold what is built from the knowledge base; cache, metrics and log are per process
+        state = self.__dict__.copy()
+        state["answers"] = dict(self.answers)
+        state["response_cache"] = None
+        state["metrics"] = None
+        state["query_log"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.answers = MappingProxyType(self.answers)
+        self.response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+    def warm_up(self) -> int:
+        """Answer one query per intent keyword, plus a typo, an off-topic and a retrieval query.
+
+        Runs every code path once (regex compilation, lazy caches, response
+        serialization) without touching the response cache. Returns the number
+        of queries answered.
+        """
+        queries = [k for words in self.keyword_tables["intents"].values() for k in words]
+        queries += ["jadwl ormk", "resep nasi goreng", "kenapa harus bawa tumbler dan bpjs"]
+        for query in queries:
+            self._entry_json(self._respond(self._analyze(self._bounded_normalize(query)[0])))
+        return len(queries)
+
+    def _build(self) -> None:
+        # Compile keyword indexes and render every answer for this knowledge base;
+        # a new knowledge base gets a new agent (see reload_knowledge_base)
+        self.keyword_matcher = self._compile_keywords()
+        self.fuzzy_index = self._build_fuzzy_index(self.fuzzy_threshold)
+        self.division_keywords = self._sort_division_keywords()
+        self.intent_scorer = self._build_intent_scorer()
+        self.retrieval_index = BM25Index(knowledge_passages(self.ormik_data))
+        self.offtopic_answer = self._prerender(self._wrap(self.context['ormikData']['acara']['pesan_offtopic']))
+        self.answers = self._render_answers()
+        self.keywords_body = CachedBody.for_json(self.version, self.keywords().model_dump_json().encode())
 
     # Fungsi untuk mengambil informasi ORMIK
     def get_ormik_info(self, category, subcategory=None, day=None):
@@ -294,48 +179,319 @@ class ZEEROAgent:
         except KeyError:
             return "Data tidak ditemukan."
     def reply(self, user_input: str) -> ChatResponse:
-        topic_ok = self._is_on_topic(user_input)
-        if not topic_ok:
-            answer = self._wrap("\n".join([OFFTOPIC_MSG]))
-            return ChatResponse(answer=answer, confidence=0.0, topic_ok=False, truncated=False)
+        return self._reply_normalized(*self._bounded_normalize(user_input))
+
+    def reply_json(self, user_input: str) -> bytes:
+        """The reply as a JSON body; serialized once per response cache entry."""
+        return self._entry_json(self._reply_entry(*self._bounded_normalize(user_input)))
+
+    def reply_body(self, user_input: str) -> CachedBody:
+        """The JSON body with its ETag, for conditional GETs."""
+        entry = self._reply_entry(*self._bounded_normalize(user_input))
+        conditional = entry.conditional
+        if conditional is None:
+            conditional = entry.conditional = CachedBody.for_json(self.version, self._entry_json(entry))
+        return conditional
+
+    def reply_batch_json(self, queries: List[str]) -> bytes:
+        return b"[" + b",".join(self._entry_json(entry) for entry in self._reply_batch_entries(queries)) + b"]"
+
+    def _reply_batch_entries(self, queries: List[str]) -> List[CachedReply]:
+        # Identical queries (raw or after normalization) are answered once per batch
+        by_query: Dict[str, CachedReply] = {}
+        by_normalized: Dict[str, CachedReply] = {}
+        entries = []
+        for query in queries:
+            entry = by_query.get(query)
+            if entry is None:
+                normalized_text, clipped = self._bounded_normalize(query)
+                entry = None if clipped else by_normalized.get(normalized_text)
+                if entry is None:
+                    entry = self._reply_entry(normalized_text, clipped)
+                    if not clipped:
+                        by_normalized[normalized_text] = entry
+                by_query[query] = entry
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _entry_json(entry: CachedReply) -> bytes:
+        # The answer is already JSON (encoded at build time for static answers), so
+        # this only frames it; no model validation or re-encoding of the text
+        body = entry.body
+        if body is None:
+            response = entry.response
+            body = entry.body = chat_response_json(
+                entry.answer_json, response.confidence, response.topic_ok, response.truncated, response.degraded,
+            )
+        return body
 
-        text = self._get_keyword_based_response(user_input)
-        text, truncated = self._limit_words(text, 400)
-        conf = self._get_keyword_confidence(user_input)
-        return ChatResponse(answer=text, confidence=conf, topic_ok=True, truncated=truncated)
+    def _reply_normalized(self, normalized_text: str, clipped: bool = False) -> ChatResponse:
+        return self._reply_entry(normalized_text, clipped).response
+
+    def _reply_entry(self, normalized_text: str, clipped: bool = False) -> CachedReply:
+        # Clipped input is not a function of its normalized prefix alone, so it bypasses the cache
+        started = time.perf_counter()
+        watch = self.metrics.stopwatch() if self.metrics is not None else None
+        cached = None if clipped else self.response_cache.get(normalized_text)
+        if watch:
+            watch.lap("cache")
+        if cached is None:
+            analysis = self._analyze(normalized_text, watch)
+            analysis.degraded = analysis.degraded or clipped
+            cached = self._respond(analysis, watch)
+            if not clipped:
+                self.response_cache.put(normalized_text, cached)
+
+        if watch:
+            watch.flush()
+            self.metrics.observe_reply(cached.label, cached.response.topic_ok)
+        if self.query_log is not None:
+            response = cached.response
+            self._log_query(normalized_text, cached.label, response.confidence, response.topic_ok, response.degraded, started)
+        return cached
+
+    def _log_query(self, normalized_text: str, label: str, confidence: float, topic_ok: bool, degraded: bool, started: float) -> None:
+        self.query_log.append((
+            time.time(), self.tenant, normalized_text, label, confidence, topic_ok, degraded,
+            round((time.perf_counter() - started) * 1000, 3),
+        ))
+
+    def _respond(self, analysis: QueryAnalysis, watch: Stopwatch | None = None) -> CachedReply:
+        if not analysis.topic_ok:
+            response = ChatResponse(
+                answer=self.offtopic_answer.answer, confidence=0.0, topic_ok=False, truncated=False,
+                degraded=analysis.degraded,
+            )
+            return CachedReply(response, self._intent_label(analysis), self.offtopic_answer.answer_json)
+
+        rendered = self._get_keyword_based_response(analysis, watch)
+        response = ChatResponse(
+            answer=rendered.answer, confidence=analysis.confidence, topic_ok=True, truncated=rendered.truncated,
+            degraded=analysis.degraded,
+        )
+        return CachedReply(response, self._intent_label(analysis), rendered.answer_json)
+
+    @staticmethod
+    def _intent_label(analysis: QueryAnalysis) -> str:
+        if not analysis.topic_ok:
+            return "offtopic"
+        if analysis.intent is None:
+            return "retrieval" if analysis.retrieved else "default"
+        return analysis.intent
+
+    def reply_stream(self, user_input: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (event, data): metadata first, then answer chunks, then the truncated flag."""
+        started = time.perf_counter()
+        watch = self.metrics.stopwatch() if self.metrics is not None else None
+        normalized_text, clipped = self._bounded_normalize(user_input)
+        analysis = self._analyze(normalized_text, watch)
+        analysis.degraded = analysis.degraded or clipped
+        if analysis.topic_ok:
+            rendered = self._get_keyword_based_response(analysis, watch)
+        else:
+            rendered = self.offtopic_answer
+        if watch:
+            watch.flush()
+            self.metrics.observe_reply(self._intent_label(analysis), analysis.topic_ok)
+        if self.query_log is not None:
+            confidence = analysis.confidence if analysis.topic_ok else 0.0
+            self._log_query(normalized_text, self._intent_label(analysis), confidence, analysis.topic_ok, analysis.degraded, started)
+        yield "meta", {
+            "topic_ok": analysis.topic_ok,
+            "intent": analysis.intent if analysis.topic_ok else None,
+            "confidence": analysis.confidence if analysis.topic_ok else 0.0,
+            "degraded": analysis.degraded,
+        }
+        for chunk in rendered.chunks:
+            yield "chunk", {"text": chunk}
+        yield "done", {"truncated": rendered.truncated}
+
+    def analyze(self, user_input: str) -> QueryAnalysis:
+        """Normalize and match the query once; every later stage reads the result."""
+        normalized_text, clipped = self._bounded_normalize(user_input)
+        analysis = self._analyze(normalized_text)
+        analysis.degraded = analysis.degraded or clipped
+        return analysis
+
+    @staticmethod
+    def _bounded_normalize(user_input: str) -> Tuple[str, bool]:
+        """Normalized query cut to QUERY_MAX_BYTES and QUERY_MAX_TOKENS, and whether it was cut."""
+        clipped = False
+        # A str can't be more than 4 UTF-8 bytes per character, so short input skips the encode
+        if len(user_input) * 4 > QUERY_MAX_BYTES:
+            encoded = user_input.encode("utf-8")
+            if len(encoded) > QUERY_MAX_BYTES:
+                user_input = encoded[:QUERY_MAX_BYTES].decode("utf-8", "ignore")
+                clipped = True
+        normalized_text = normalize_text(user_input)
+        tokens = normalized_text.split(" ", QUERY_MAX_TOKENS)
+        if len(tokens) > QUERY_MAX_TOKENS:
+            normalized_text = " ".join(tokens[:QUERY_MAX_TOKENS])
+            clipped = True
+        return normalized_text, clipped
+
+    def _analyze(self, normalized_text: str, watch: Stopwatch | None = None) -> QueryAnalysis:
+        tokens = normalized_text.split()
+        hits = self.keyword_matcher.scan(normalized_text)
+        if watch:
+            watch.lap("scan")
+        fuzzy_tokens, degraded = self._fuzzy_candidates(tokens, hits)
+        fuzzy = self._fuzzy_keywords(fuzzy_tokens) if fuzzy_tokens else set()
+        if watch:
+            watch.lap("fuzzy")
+        analysis = QueryAnalysis(normalized=normalized_text, tokens=tokens, hits=hits, fuzzy=fuzzy, degraded=degraded)
+        analysis.topic_ok = analysis.matched("topic", self.keyword_tables["topic"])
+        if watch:
+            watch.lap("topic")
+        # Intents and confidence come out of the same scoring pass
+        scores = self.intent_scorer.score(analysis)
+        analysis.intent_scores = scores.ranked
+        analysis.intent = scores.intent
+        analysis.confidence = scores.confidence
+        if watch:
+            watch.lap("intent")
+        if analysis.intent is None and analysis.topic_ok:
+            # Fall back to the knowledge base itself
+            analysis.retrieved = self.retrieval_index.search(tokens, RETRIEVAL_TOP_K, RETRIEVAL_MIN_SCORE)
+            if watch:
+                watch.lap("retrieval")
+        elif not analysis.topic_ok and RETRIEVAL_TOPIC_MIN_IDF > 0 and self.retrieval_index.covers(
+            normalized_text, RETRIEVAL_TOPIC_MIN_IDF, {w for kws in hits.values() for kw in kws for w in kw.split()},
+        ):
+            # No topic keyword, but every word is a knowledge base (or intent keyword) word and one
+            # is rare there: "bawa bpjs" is, "lirik lagu terbaru" and "skor bola semalam" are not.
+            # An intent keyword alone never put a query on topic, so the knowledge base answers it
+            analysis.retrieved = self.retrieval_index.search(tokens, RETRIEVAL_TOP_K, RETRIEVAL_MIN_SCORE)
+            if analysis.retrieved:
+                analysis.intent = None
+                analysis.topic_ok = True
+            if watch:
+                watch.lap("retrieval")
+        return analysis
 
     def keywords(self) -> KeywordsResponse:
         return KeywordsResponse(keywords=self._available_keywords())
 
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.response_cache.stats()
+
+    def fuzzy_stats(self) -> Dict[str, Any]:
+        return self.fuzzy_index.memo_stats()
+
     # === Rules/Heuristics ===
     def _is_on_topic(self, user_input: str) -> bool:
-        s = user_input.lower()
-        allow = [
-            "ormik sttnf", "ormik explore", "ormik 2025", "apa itu ormik", "ormik apa", "tentang ormik", "pengertian ormik",
-            "guidebook", "guide book", "buku panduan", "rundown", "download", "unduh",
-            "stt nurul fikri", "stt nf", "nurul fikri", "zeero",
-            "jadwal", "schedule", "tanggal", "waktu", "kapan", "jam", "hari",
-            "divisi", "organisasi", "panitia", "steering", "project officer", "po", "sekretaris", "bendahara", "public relation", "pr", "liaison", "lo", "event", "media", "kreatif", "kedisiplinan", "kedis", "mentor", "logistik", "konsumsi", "konsum", "medis", "it support", "it",
-            "lokasi", "kampus", "alamat", "fasilitas", "dimana", "di mana",
-            "kontak", "instagram", "hubungi",
-            "tips", "persiapan", "panduan", "dress", "pakaian", "seragam", "outfit",
-            "tata tertib", "aturan", "peraturan", "punishment", "hukuman", "sanksi",
-            "atribut", "perlengkapan", "tugas", "assignment", "mentor", "kompi"
-        ]
-        if self._has_keyword(s, allow):
-            return True
         # short greetings still allowed when mentioning ZEERO or ORMIK later
-        return False
+        return self.analyze(user_input).topic_ok
 
     # (internal header removed to avoid exposing base prompt)
 
-    def _get_keyword_based_response(self, user_input: str) -> str:
-        s = user_input.lower()
-        intent = self._resolve_intent(s)
+    def _get_keyword_based_response(self, analysis: QueryAnalysis, watch: Stopwatch | None = None) -> RenderedAnswer:
+        if analysis.intent is None and analysis.retrieved:
+            return self._prerender(self._render_retrieved(analysis.retrieved), watch)
+        # Static answers were rendered and truncated at build time
+        rendered = self.answers[self._answer_key(analysis)]
+        if watch:
+            watch.lap("render")
+        return rendered
+
+    def _render_retrieved(self, retrieved: List[Tuple[float, Passage]]) -> str:
+        # Group hits under their section header, best-scoring section first
+        sections: Dict[str, List[str]] = {}
+        for _, passage in retrieved:
+            sections.setdefault(passage.section, []).append(passage.text)
+        blocks = [
+            f"**{section}:**\n" + "\n".join(f"• {text}" for text in texts)
+            for section, texts in sections.items()
+        ]
+        data = self.context['ormikData']
+        return (
+            f"🔎 **Info terkait dari data {data['acara']['nama']}:**\n\n" +
+            "\n\n".join(blocks) +
+            "\n\nBelum menjawab? Coba tanyakan dengan kata kunci seperti `jadwal`, `tugas`, atau `tata tertib`, "
+            f"atau hubungi {data['contact']['instagram_handle']} di Instagram."
+        )
+
+    def _answer_key(self, analysis: QueryAnalysis) -> AnswerKey:
+        # Pick the pre-rendered sub-variant for the resolved intent
+        s = analysis.normalized
+        intent = analysis.intent
+        if intent == "ketentuan":
+            if "putra" in s:
+                return intent, "putra"
+            if "putri" in s:
+                return intent, "putri"
+        elif intent == "tugas":
+            for variant, keywords in self.keyword_tables["tugas_variants"].items():
+                if any(keyword in s for keyword in keywords):
+                    return intent, variant
+            if "ormik" in s:
+                return intent, "pra_ormik"
+        elif intent == "greetings":
+            if "zeero" in s or "siapa kamu" in s or "kamu siapa" in s:
+                return intent, "zeero"
+        elif intent == "jadwal":
+            waktu = "jam" in s or "waktu" in s or "berapa" in s
+            download = "download" in s or "unduh" in s or "guidebook" in s
+            if waktu or download:
+                return intent, "_".join(v for v, on in (("waktu", waktu), ("download", download)) if on)
+        elif intent == "divisi":
+            # Longest keyword first; very short ones must appear as separate words
+            for keyword, division_key in self.division_keywords:
+                if (keyword in analysis.words) if len(keyword) <= 2 else (keyword in s):
+                    # The knowledge base may leave out a division the keyword table knows
+                    if division_key in self.ormik_data["divisi"]:
+                        return intent, division_key
+                    break
+        elif intent == "tips":
+            if "persiapan" in s or "sebelum" in s:
+                return intent, "persiapan"
+            if "selama" in s or "saat" in s:
+                return intent, "selama"
+        elif intent == "punishment":
+            for level in ("ringan", "sedang", "berat", "khusus"):
+                if level in s and level in self.ormik_data["punishment"]:
+                    return intent, level
+        elif intent == "atribut":
+            if "day 1" in s or "day1" in s:
+                return intent, "day_1"
+            if "last" in s or "akhir" in s:
+                return intent, "last_day"
+        return intent, "default"
+
+    def _schedule_item(self, day: str) -> Dict[str, Any] | None:
+        # Task days share the schedule's ids, with "-" for "_"
+        schedule_id = day.replace("_", "-")
+        return next((item for item in self.context['ormikData']['schedule'] if item['id'] == schedule_id), None)
+
+    def _task_date(self, day: str, label: str, prefix: str = "") -> str:
+        item = self._schedule_item(day)
+        return f"📅 **{label}:** {prefix}{item['date']}\n\n" if item else ""
+
+    def _task_short_date(self, day: str) -> str:
+        # " - 16 Sept" for the overview headings; nothing when the schedule has no usable date
+        item = self._schedule_item(day)
+        try:
+            day_date = datetime.date.fromisoformat(item['fullDate']) if item else None
+        except ValueError:
+            day_date = None
+        return f" - {day_date.day} {BULAN_SINGKAT[day_date.month - 1]}" if day_date else ""
+
+    def _task_notes(self, day: str) -> str:
+        notes = self.get_ormik_info("tugas", "catatan", day)
+        return "\n\n💡 **Catatan Penting:**\n" + "\n".join(f"• {note}" for note in notes) if notes else ""
+
+    def _task_summary(self, day: str) -> str:
+        ringkasan = self.get_ormik_info("tugas", "ringkasan", day)
+        return "".join(f"• **{label}:** {text}\n" for label, text in ringkasan.items()) + "\n"
+
+    def _render_answer(self, intent: str | None, variant: str) -> str:
+        acara = self.context['ormikData']['acara']
+        nama, nama_lengkap, institusi = acara['nama'], acara['nama_lengkap'], acara['institusi']
         if intent == "guidebook":
             k = self.context['ormikData']['kampus']
             return (
-                "📖 **Guidebook ORMIK Explore 2025**\n\n"
+                f"📖 **Guidebook {nama_lengkap}**\n\n"
                 "**Download Guidebook Lengkap:**\n"
                 f"{k['guidebook_url']}\n\n"
                 "🔗 **Cara Download:**\n"
@@ -360,21 +516,21 @@ class ZEEROAgent:
                 f"**Deskripsi:** {ormik_info['deskripsi']}\n\n"
                 f"**Nama Acara:** {ormik_info['nama_acara']} {ormik_info['tahun']}\n"
                 f"**Visi:** {ormik_info['visi']}\n\n"
-                "ORMIK adalah kegiatan wajib yang harus diikuti oleh semua mahasiswa baru STT Terpadu Nurul Fikri untuk beradaptasi dengan lingkungan kampus dan sistem perkuliahan.\n\n"
+                f"ORMIK adalah kegiatan wajib yang harus diikuti oleh semua mahasiswa baru {institusi} untuk beradaptasi dengan lingkungan kampus dan sistem perkuliahan.\n\n"
                 "Apakah Anda ingin tahu juga tentang jadwal ORMIK atau persyaratan peserta?"
             )
         
         if intent == "creator":
             return (
                 "👨‍💻 **Tentang Pembuat ZEERO Agent**\n\n"
-                "**Developer:** Tim Pengembang IT Support ORMIK EXPLORE 2025\n\n"
-                "🚀 **ZEERO Agent** adalah AI assistant yang dikembangkan khusus untuk membantu mahasiswa baru STT Terpadu Nurul Fikri dalam memperoleh informasi lengkap tentang ORMIK Explore 2025.\n\n"
+                f"**Developer:** Tim Pengembang IT Support {nama_lengkap.upper()}\n\n"
+                f"🚀 **ZEERO Agent** adalah AI assistant yang dikembangkan khusus untuk membantu mahasiswa baru {institusi} dalam memperoleh informasi lengkap tentang {nama_lengkap}.\n\n"
                 "💡 **Fitur Unggulan:**\n"
                 "• Respons cepat dan akurat 24/7\n"
-                "• Informasi lengkap tentang ORMIK 2025\n"
+                f"• Informasi lengkap tentang {nama}\n"
                 "• Interface yang user-friendly\n"
                 "• Pemahaman konteks yang baik\n\n"
-                "� **Dikembangkan oleh:** Tim IT Support ORMIK EXPLORE 2025\n\n"
+                f"� **Dikembangkan oleh:** Tim IT Support {nama_lengkap.upper()}\n\n"
                 "Terima kasih telah menggunakan ZEERO Agent! 😊\n"
                 "Ada yang ingin Anda tanyakan tentang ORMIK?"
             )
@@ -382,45 +538,44 @@ class ZEEROAgent:
         if intent == "hak":
             hak_list = self.get_ormik_info("hak_peserta")
             return (
-                "🎓 **Hak Peserta ORMIK 2025:**\n" +
+                f"🎓 **Hak Peserta {nama}:**\n" +
                 "\n".join([f"{idx+1}. {item}" for idx, item in enumerate(hak_list)]) +
                 "\n\nApakah Anda ingin tahu juga kewajiban peserta?"
             )
         if intent == "kewajiban":
             kewajiban_list = self.get_ormik_info("kewajiban_peserta")
             return (
-                "📘 **Kewajiban Peserta ORMIK 2025:**\n" +
+                f"📘 **Kewajiban Peserta {nama}:**\n" +
                 "\n".join([f"{idx+1}. {item}" for idx, item in enumerate(kewajiban_list)]) +
                 "\n\nApakah Anda ingin tahu juga hak peserta?"
             )
         if intent == "ketentuan":
-            if "putra" in s:
+            if variant == "putra":
                 putra_list = self.get_ormik_info("ketentuan_peserta", "putra")
                 return (
-                    "👕 **Ketentuan Peserta Putra ORMIK 2025:**\n" +
+                    f"👕 **Ketentuan Peserta Putra {nama}:**\n" +
                     "\n".join([f"{idx+1}. {item}" for idx, item in enumerate(putra_list)]) +
                     "\n\nApakah Anda ingin tahu juga ketentuan peserta putri?"
                 )
-            elif "putri" in s:
+            elif variant == "putri":
                 putri_list = self.get_ormik_info("ketentuan_peserta", "putri")
                 return (
-                    "👗 **Ketentuan Peserta Putri ORMIK 2025:**\n" +
+                    f"👗 **Ketentuan Peserta Putri {nama}:**\n" +
                     "\n".join([f"{idx+1}. {item}" for idx, item in enumerate(putri_list)]) +
                     "\n\nApakah Anda ingin tahu juga ketentuan peserta putra?"
                 )
             else:
+                ringkasan = self.get_ormik_info("ketentuan_peserta", "ringkasan")
                 return (
-                    "👔 **Ketentuan Peserta ORMIK 2025:**\n\n"
-                    "**Putra:** Kemeja putih (dimasukkan), celana hitam/dongker, ikat pinggang hitam, kaos kaki putih, sepatu hitam. Rambut rapi, tanpa cat.\n"
-                    "**Putri:** Kemeja putih longgar, rok bahan hingga mata kaki, kaos kaki putih, sepatu hitam. Muslim jilbab segiempat+ciput; non‑Muslim rambut diikat.\n"
-                    "**Dilarang:** Aksesori berlebihan, make up berlebih, softlens berwarna.\n\n"
-                    "Ingin tahu detail untuk putra atau putri? Tanyakan misal: 'Ketentuan putra'."
+                    f"👔 **Ketentuan Peserta {nama}:**\n\n" +
+                    "".join(f"**{label}:** {text}\n" for label, text in ringkasan.items()) +
+                    "\nIngin tahu detail untuk putra atau putri? Tanyakan misal: 'Ketentuan putra'."
                 )
         if intent == "perizinan":
             izin_saat = self.get_ormik_info("perizinan", "saat_ormik")
             izin_tidak = self.get_ormik_info("perizinan", "tidak_mengikuti")
             return (
-                "📝 **Perizinan ORMIK 2025:**\n\n"
+                f"📝 **Perizinan {nama}:**\n\n"
                 "**Saat ORMIK berlangsung:**\n" +
                 "\n".join([f"• {item}" for item in izin_saat]) +
                 "\n\n**Izin tidak mengikuti ORMIK:**\n" +
@@ -428,98 +583,60 @@ class ZEEROAgent:
                 "\n\nApakah Anda ingin tahu juga tentang punishment atau tata tertib?"
             )
         if intent == "tugas":
-            s_lower = s.lower()
-            
-            # Enhanced keyword detection for different task periods
-            day_1_keywords = [
-                "day 1", "day1", "hari 1", "hari ke-1", "hari ke 1", "hari pertama", 
-                "tugas hari pertama", "tugas day 1", "tugas hari 1", "hari satu",
-                "day satu", "tugas day satu"
-            ]
-            
-            last_day_keywords = [
-                "last day", "last", "akhir", "terakhir", "hari terakhir", "hari akhir",
-                "tugas akhir", "tugas terakhir", "tugas last day", "hari pamungkas"
-            ]
-            
-            pra_keywords = [
-                "pra", "pra ormik", "sebelum", "persiapan", "tugas pra", "tugas persiapan",
-                "sebelum ormik", "tugas sebelum"
-            ]
-            
-            # Check for specific day keywords
-            is_day_1 = any(keyword in s_lower for keyword in day_1_keywords)
-            is_last_day = any(keyword in s_lower for keyword in last_day_keywords)
-            is_pra = any(keyword in s_lower for keyword in pra_keywords)
-            
-            # Prioritize specific matches
-            if is_day_1:
+            if variant == "day_1":
                 individu = self.get_ormik_info("tugas", "individu", "day_1")
                 kompi = self.get_ormik_info("tugas", "kompi", "day_1")
                 response = (
-                    "📝 **Tugas Day 1 ORMIK 2025 (Hari Pertama):**\n\n"
-                    "📅 **Tanggal:** Selasa, 16 September 2025\n\n"
+                    f"📝 **Tugas Day 1 {nama} (Hari Pertama):**\n\n" +
+                    self._task_date("day_1", "Tanggal") +
                     "👤 **Tugas Individu:**\n" + 
                     "\n".join([f"{idx+1}. {item}" for idx, item in enumerate(individu)]) + 
                     "\n\n👥 **Tugas Kompi:**\n" + 
                     "\n".join([f"{idx2+1}. {item}" for idx2, item in enumerate(kompi)]) +
-                    "\n\n💡 **Catatan Penting:**\n"
-                    "• Tugas resume materi dikerjakan setelah kegiatan Day 1 selesai\n"
-                    "• Video yel-yel dan dokumentasi segera diunggah ke IG kompi\n"
-                    "• Video edukasi teknologi boleh dikerjakan sebelum Day 1\n\n"
-                    "📋 **Mau tahu tugas lainnya?** Tanyakan `tugas pra ormik` atau `tugas last day`!"
+                    self._task_notes("day_1") +
+                    "\n\n📋 **Mau tahu tugas lainnya?** Tanyakan `tugas pra ormik` atau `tugas last day`!"
                 )
                 return response
                 
-            elif is_last_day:
+            elif variant == "last_day":
                 individu = self.get_ormik_info("tugas", "individu", "last_day")
                 kompi = self.get_ormik_info("tugas", "kompi", "last_day")
                 response = (
-                    "📝 **Tugas Last Day ORMIK 2025 (Hari Terakhir):**\n\n"
-                    "📅 **Tanggal:** Sabtu, 20 September 2025\n\n"
+                    f"📝 **Tugas Last Day {nama} (Hari Terakhir):**\n\n" +
+                    self._task_date("last_day", "Tanggal") +
                     "👤 **Tugas Individu:**\n" + 
                     "\n".join([f"{idx+1}. {item}" for idx, item in enumerate(individu)]) + 
                     "\n\n👥 **Tugas Kompi:**\n" + 
                     "\n".join([f"{idx2+1}. {item}" for idx2, item in enumerate(kompi)]) +
-                    "\n\n💡 **Catatan Penting:**\n"
-                    "• Mini gift disiapkan sebelum Last Day\n"
-                    "• Surat pesawat dibuat kreatif dan bermakna\n"
-                    "• Unjuk bakat adalah kolaborasi 2 kompi per 1 Mentor\n\n"
-                    "📋 **Mau tahu tugas lainnya?** Tanyakan `tugas pra ormik` atau `tugas day 1`!"
+                    self._task_notes("last_day") +
+                    "\n\n📋 **Mau tahu tugas lainnya?** Tanyakan `tugas pra ormik` atau `tugas day 1`!"
                 )
                 return response
                 
-            elif is_pra or "ormik" in s_lower:
+            elif variant == "pra_ormik":
                 individu = self.get_ormik_info("tugas", "individu", "pra_ormik")
                 kompi = self.get_ormik_info("tugas", "kompi", "pra_ormik")
                 response = (
-                    "📝 **Tugas Pra ORMIK 2025 (Sebelum Kegiatan):**\n\n"
-                    "📅 **Deadline:** Sebelum Senin, 8 September 2025\n\n"
+                    f"📝 **Tugas Pra {nama} (Sebelum Kegiatan):**\n\n" +
+                    self._task_date("pra_ormik", "Deadline", "Sebelum ") +
                     "👤 **Tugas Individu:**\n" + 
                     "\n".join([f"{idx+1}. {item}" for idx, item in enumerate(individu)]) + 
                     "\n\n👥 **Tugas Kompi:**\n" + 
                     "\n".join([f"{idx2+1}. {item}" for idx2, item in enumerate(kompi)]) +
-                    "\n\n💡 **Catatan Penting:**\n"
-                    "• Semua tugas wajib dikumpulkan via GForm yang disediakan\n"
-                    "• Name tag harus dilaminating dan sesuai template\n"
-                    "• Video perkenalan gunakan frame yang telah disediakan\n"
-                    "• Passport dibuat sama untuk setiap kompi\n\n"
-                    "📋 **Mau tahu tugas lainnya?** Tanyakan `tugas day 1` atau `tugas last day`!"
+                    self._task_notes("pra_ormik") +
+                    "\n\n📋 **Mau tahu tugas lainnya?** Tanyakan `tugas day 1` atau `tugas last day`!"
                 )
                 return response
             else:
                 # General overview when no specific day is mentioned
                 return (
-                    "📝 **Overview Tugas ORMIK 2025:**\n\n"
-                    "🗓️ **Tugas Pra ORMIK (Sebelum Kegiatan):**\n"
-                    "• **Individu:** Name tag, twibbon IG, video perkenalan, hafal lagu\n"
-                    "• **Kompi:** Akun IG, logo, yel-yel, passport, persiapan bakat\n\n"
-                    "📅 **Tugas Day 1 (Hari Pertama - 16 Sept):**\n"
-                    "• **Individu:** Resume materi Day 1\n"
-                    "• **Kompi:** Video yel-yel, dokumentasi, video edukasi teknologi\n\n"
-                    "🏆 **Tugas Last Day (Hari Terakhir - 20 Sept):**\n"
-                    "• **Individu:** Mini gift untuk Mentor, surat pesawat\n"
-                    "• **Kompi:** Unjuk bakat kolaborasi 2 kompi\n\n"
+                    f"📝 **Overview Tugas {nama}:**\n\n"
+                    "🗓️ **Tugas Pra ORMIK (Sebelum Kegiatan):**\n" +
+                    self._task_summary("pra_ormik") +
+                    f"📅 **Tugas Day 1 (Hari Pertama{self._task_short_date('day_1')}):**\n" +
+                    self._task_summary("day_1") +
+                    f"🏆 **Tugas Last Day (Hari Terakhir{self._task_short_date('last_day')}):**\n" +
+                    self._task_summary("last_day") +
                     "💡 **Ingin detail lengkap?** Tanyakan:\n"
                     "• `tugas pra ormik` atau `tugas persiapan`\n"
                     "• `tugas hari pertama` atau `tugas day 1`\n"
@@ -528,11 +645,11 @@ class ZEEROAgent:
 
         # Greetings/intro
         if intent == "greetings":
-            # Check if it's the first interaction or user is asking about ZEERO specifically
-            if "zeero" in s.lower() or "siapa kamu" in s.lower() or "kamu siapa" in s.lower():
+            # User is asking about ZEERO specifically
+            if variant == "zeero":
                 return (
                     "Halo! Saya **ZEERO** 🤖 - **Z**one **E**ducational **E**xploration **R**obot **O**rganizer!\n\n"
-                    "🎯 **Saya adalah AI Assistant khusus untuk ORMIK Explore 2025** yang dikembangkan oleh **Tim Pengembang IT Support ORMIK EXPLORE 2025**.\n\n"
+                    f"🎯 **Saya adalah AI Assistant khusus untuk {nama_lengkap}** yang dikembangkan oleh **Tim Pengembang IT Support {nama_lengkap.upper()}**.\n\n"
                     "✨ **Yang bisa saya bantu:**\n"
                     "• 📅 **Jadwal** lengkap kegiatan ORMIK\n"
                     "• 👥 **Divisi & Organisasi** panitia\n"
@@ -548,7 +665,7 @@ class ZEEROAgent:
             else:
                 # Simple greeting response
                 return (
-                    "Halo! Saya **ZEERO** 🤖, AI Assistant untuk ORMIK Explore 2025!\n\n"
+                    f"Halo! Saya **ZEERO** 🤖, AI Assistant untuk {nama_lengkap}!\n\n"
                     "Saya siap bantu info tentang:\n"
                     "• 📅 **Jadwal** kegiatan ORMIK\n"
                     "• 👥 **Struktur organisasi** dan divisi\n"
@@ -563,13 +680,9 @@ class ZEEROAgent:
             lines = [f"• **{x['title']}** - {x['date']}" for x in self.context['ormikData']['schedule']]
             k = self.context['ormikData']['kampus']
             
-            # Check if user is asking about specific time-related aspects
-            current_date = "11 September 2025"  # Current date context
-            s_lower = s.lower()
-            
-            base_response = "📅 **Jadwal ORMIK Explore 2025:**\n\n" + "\n".join(lines) + "\n\n"
+            base_response = f"📅 **Jadwal {nama_lengkap}:**\n\n" + "\n".join(lines) + "\n\n"
             
-            if "jam" in s_lower or "waktu" in s_lower or "berapa" in s_lower:
+            if variant in ("waktu", "waktu_download"):
                 base_response += (
                     "⏰ **Detail Waktu:**\n"
                     "• **Jam Kedatangan:** 06:30 WIB (WAJIB tepat waktu)\n"
@@ -585,7 +698,7 @@ class ZEEROAgent:
                     "• Pastikan datang tepat waktu ya!\n\n"
                 )
             
-            if "download" in s_lower or "unduh" in s_lower or "guidebook" in s_lower:
+            if variant in ("download", "waktu_download"):
                 base_response += (
                     f"📖 **Guidebook & Rundown Lengkap:**\n"
                     f"🔗 {k['guidebook_url']}\n"
@@ -606,59 +719,11 @@ class ZEEROAgent:
             return base_response
 
         if intent == "divisi":
-            # Check if user is asking for specific division
-            s_lower = s.lower()
-            
-            # Check for specific division keywords
-            division_keywords = {
-                "steering": "steering_committee",
-                "project officer": "project_officer",
-                "po": "project_officer",
-                "sekretaris": "sekretaris",
-                "bendahara": "bendahara",
-                "public relation": "public_relation",
-                "pr": "public_relation",
-                "liaison": "liaison_officer",
-                "lo": "liaison_officer",
-                "event": "event",
-                "media": "media",
-                "kreatif": "kreatif",
-                "kedisiplinan": "kedisiplinan",
-                "kedis": "kedisiplinan",
-                "mentor": "mentor",
-                "logistik": "logistik",
-                "konsumsi": "konsumsi",
-                "konsum": "konsumsi",
-                "medis": "medis",
-                "it support": "it_support",
-                "it": "it_support"
-            }
-            
-            # Find specific division being asked - prioritize longer matches first
-            specific_division = None
-            # Sort keywords by length (longest first) to prioritize exact matches
-            sorted_keywords = sorted(division_keywords.items(), key=lambda x: len(x[0]), reverse=True)
-            
-            for keyword, division_key in sorted_keywords:
-                # Use word boundary matching for short keywords to avoid false positives
-                if len(keyword) <= 2:
-                    # For very short keywords, check if they appear as separate words
-                    import re
-                    pattern = r'\b' + re.escape(keyword) + r'\b'
-                    if re.search(pattern, s_lower):
-                        specific_division = division_key
-                        break
-                else:
-                    # For longer keywords, use substring matching
-                    if keyword in s_lower:
-                        specific_division = division_key
-                        break
-            
             # If specific division is asked, show detailed info
-            if specific_division:
-                div_info = self.get_ormik_info("divisi", specific_division)
+            if variant != "default":
+                div_info = self.get_ormik_info("divisi", variant)
                 return (
-                    f"👥 **{div_info['position']} - ORMIK 2025**\n\n"
+                    f"👥 **{div_info['position']} - {nama}**\n\n"
                     f"**📋 Deskripsi Tugas:**\n"
                     f"{div_info['description']}\n\n"
                     "Ingin tahu tentang divisi lain? Tanyakan nama divisinya!\n\n"
@@ -667,7 +732,7 @@ class ZEEROAgent:
             
             # If general question, show overview
             return (
-                "👥 **Struktur Organisasi ORMIK 2025:**\n\n"
+                f"👥 **Struktur Organisasi {nama}:**\n\n"
                 "**🏆 Core Team:**\n"
                 "• Steering Committee\n• Project Officer (PO)\n• Sekretaris\n• Bendahara\n• Public Relation (PR)\n• Liaison Officer (LO)\n\n"
                 "**⚡ Divisi Operasional:**\n"
@@ -684,8 +749,8 @@ class ZEEROAgent:
                 "🏫 **Lokasi Kegiatan ORMIK:**\n\n"
                 f"**{k['nama']}**\n"
                 f"📍 {k['alamat']}, {k['kota']}, {k['provinsi']}\n\n"
-                "🗺️ **Fasilitas:** Auditorium, ruang kelas ber-AC, lab komputer, Masjid Al-Hikmah, kantin, area parkir.\n\n"
-                "🚌 **Akses:** TransJakarta (Lenteng Agung), KRL (Stasiun Lenteng Agung), angkot Pasar Minggu–Bogor.\n"
+                f"🗺️ **Fasilitas:** {k['fasilitas']}\n\n"
+                f"🚌 **Akses:** {k['akses']}\n"
                 f"📍 **Google Maps:** {k['maps_url']}\n\n"
                 "Apakah Anda ingin tahu juga tentang jadwal kegiatan atau kontak panitia?"
             )
@@ -694,7 +759,7 @@ class ZEEROAgent:
             ig = self.context['ormikData']['contact']
             k = self.context['ormikData']['kampus']
             return (
-                "📞 **Kontak ORMIK 2025:**\n\n"
+                f"📞 **Kontak {nama}:**\n\n"
                 f"**Instagram DM:** {ig['instagram_handle']}\n"
                 f"Link: {ig['instagram']}\n\n"
                 "Semua komunikasi resmi via DM Instagram ya! ⏰ Respon: 2–4 jam kerja.\n\n"
@@ -709,12 +774,11 @@ class ZEEROAgent:
 
         if intent == "tips":
             k = self.context['ormikData']['kampus']
-            s_lower = s.lower()
             
             # Contextual tips based on user's specific question
-            if "persiapan" in s_lower or "sebelum" in s_lower:
+            if variant == "persiapan":
                 return (
-                    "🎯 **Tips Persiapan ORMIK 2025:**\n\n"
+                    f"🎯 **Tips Persiapan {nama}:**\n\n"
                     "📚 **H-3 sampai H-1:**\n"
                     "• Download & baca guidebook lengkap\n"
                     "• Siapkan dress code sesuai ketentuan\n"
@@ -729,9 +793,9 @@ class ZEEROAgent:
                     f"📖 **Guidebook:** {k['guidebook_url']}\n"
                     "💡 **Next:** Tanyakan tentang `dress code` atau `atribut`!"
                 )
-            elif "selama" in s_lower or "saat" in s_lower:
+            elif variant == "selama":
                 return (
-                    "🚀 **Tips Selama ORMIK 2025:**\n\n"
+                    f"🚀 **Tips Selama {nama}:**\n\n"
                     "⏰ **Kedatangan:**\n"
                     "• Datang TEPAT WAKTU pukul 06:30 WIB\n"
                     "• Registrasi ulang 30 menit sebelumnya\n"
@@ -751,7 +815,7 @@ class ZEEROAgent:
             else:
                 # Comprehensive tips response
                 return (
-                    "💡 **Tips Sukses ORMIK 2025:**\n\n"
+                    f"💡 **Tips Sukses {nama}:**\n\n"
                     "🎯 **Sebelum Kegiatan:**\n"
                     "• 📚 Baca guidebook dari awal sampai akhir\n"
                     "• 👔 Siapkan dress code sesuai ketentuan\n"
@@ -773,71 +837,67 @@ class ZEEROAgent:
                 )
 
         if intent == "dress":
+            ringkasan = self.get_ormik_info("ketentuan_peserta", "ringkasan")
             return (
-                "👔 **Dress Code ORMIK 2025:**\n\n"
-                "**Putra:** Kemeja putih (dimasukkan), celana hitam/dongker, ikat pinggang hitam, kaos kaki putih, sepatu hitam. Rambut rapi, tanpa cat.\n"
-                "**Putri:** Kemeja putih longgar, rok bahan hingga mata kaki, kaos kaki putih, sepatu hitam. Muslim jilbab segiempat+ciput; non‑Muslim rambut diikat.\n"
-                "**Dilarang:** Aksesori berlebihan, make up berlebih, softlens berwarna.\n\n"
-                "Apakah Anda ingin tahu juga tentang tips persiapan atau atribut yang perlu dibawa?"
+                f"👔 **Dress Code {nama}:**\n\n" +
+                "".join(f"**{label}:** {text}\n" for label, text in ringkasan.items()) +
+                "\nApakah Anda ingin tahu juga tentang tips persiapan atau atribut yang perlu dibawa?"
             )
 
         if intent == "tata_tertib":
             tertib_list = self.get_ormik_info("tata_tertib")
             return (
-                "📋 **Tata Tertib Peserta ORMIK 2025:**\n" +
+                f"📋 **Tata Tertib Peserta {nama}:**\n" +
                 "\n".join([f"{idx+1}. {item}" for idx, item in enumerate(tertib_list)]) +
                 "\n\nApakah Anda ingin tahu juga tentang punishment atau hak peserta?"
             )
 
         if intent == "punishment":
-            if "ringan" in s:
+            if variant == "ringan":
                 ringan = self.get_ormik_info("punishment", "ringan")
-                response = "⚖️ **Punishment Ringan ORMIK 2025:**\n" + "\n".join([f"• {item}" for item in ringan])
+                response = f"⚖️ **Punishment Ringan {nama}:**\n" + "\n".join([f"• {item}" for item in ringan])
                 return response + "\n\nApakah Anda ingin tahu juga punishment sedang, berat, atau khusus?"
-            elif "sedang" in s:
+            elif variant == "sedang":
                 sedang = self.get_ormik_info("punishment", "sedang")
-                response = "⚖️ **Punishment Sedang ORMIK 2025:**\n" + "\n".join([f"• {item}" for item in sedang])
+                response = f"⚖️ **Punishment Sedang {nama}:**\n" + "\n".join([f"• {item}" for item in sedang])
                 return response + "\n\nApakah Anda ingin tahu juga punishment ringan, berat, atau khusus?"
-            elif "berat" in s:
+            elif variant == "berat":
                 berat = self.get_ormik_info("punishment", "berat")
-                response = "⚖️ **Punishment Berat ORMIK 2025:**\n" + "\n".join([f"• {item}" for item in berat])
+                response = f"⚖️ **Punishment Berat {nama}:**\n" + "\n".join([f"• {item}" for item in berat])
                 return response + "\n\nApakah Anda ingin tahu juga punishment ringan, sedang, atau khusus?"
-            elif "khusus" in s:
+            elif variant == "khusus":
                 khusus = self.get_ormik_info("punishment", "khusus")
-                response = "⚖️ **Punishment Khusus ORMIK 2025:**\n" + "\n".join([f"• {item}" for item in khusus])
+                response = f"⚖️ **Punishment Khusus {nama}:**\n" + "\n".join([f"• {item}" for item in khusus])
                 return response + "\n\nApakah Anda ingin tahu juga punishment ringan, sedang, atau berat?"
             else:
+                ringkasan = self.get_ormik_info("punishment_ringkasan")
                 return (
-                    "⚖️ **Punishment ORMIK 2025:**\n"
-                    "• Ringan: Memungut 10 sampah di area kampus. (Pelanggaran 1x)\n"
-                    "• Sedang: Menyanyikan Mars STT NF & surat permintaan maaf (15 tanda tangan panitia). (Pelanggaran 2x)\n"
-                    "• Berat: Evaluasi langsung oleh Project Officer/Steering Committee. (Setelah punishment sedang, masih melanggar)\n"
-                    "• Khusus: Dilaporkan ke pihak kampus. (Contoh: narkoba, minuman keras, pornografi, datang dalam pengaruh alkohol/obat, pelecehan seksual)\n\n"
-                    "Ingin tahu detail punishment tertentu? Tanyakan misal: 'Punishment ringan' atau 'Punishment khusus'."
+                    f"⚖️ **Punishment {nama}:**\n" +
+                    "".join(f"• {level}: {text}\n" for level, text in ringkasan.items()) +
+                    "\nIngin tahu detail punishment tertentu? Tanyakan misal: 'Punishment ringan' atau 'Punishment khusus'."
                 )
 
         if intent == "atribut":
-            if "day 1" in s or "day1" in s:
+            if variant == "day_1":
                 individu = self.get_ormik_info("atribut_perlengkapan", "individu", "day_1")
                 kompi = self.get_ormik_info("atribut_perlengkapan", "kompi", "day_1")
-                response = "🎒 **Atribut & Perlengkapan Day 1 ORMIK 2025:**\n\n**Individu:**\n" + "\n".join([f"• {item}" for item in individu]) + "\n\n**Kompi:**\n" + "\n".join([f"• {item}" for item in kompi])
+                response = f"🎒 **Atribut & Perlengkapan Day 1 {nama}:**\n\n**Individu:**\n" + "\n".join([f"• {item}" for item in individu]) + "\n\n**Kompi:**\n" + "\n".join([f"• {item}" for item in kompi])
                 return response + "\n\nApakah Anda ingin tahu juga atribut di Last Day?"
-            elif "last" in s or "akhir" in s:
+            elif variant == "last_day":
                 individu = self.get_ormik_info("atribut_perlengkapan", "individu", "last_day")
                 kompi = self.get_ormik_info("atribut_perlengkapan", "kompi", "last_day")
-                response = "🎒 **Atribut & Perlengkapan Last Day ORMIK 2025:**\n\n**Individu:**\n" + "\n".join([f"• {item}" for item in individu]) + "\n\n**Kompi:**\n" + "\n".join([f"• {item}" for item in kompi])
+                response = f"🎒 **Atribut & Perlengkapan Last Day {nama}:**\n\n**Individu:**\n" + "\n".join([f"• {item}" for item in individu]) + "\n\n**Kompi:**\n" + "\n".join([f"• {item}" for item in kompi])
                 return response + "\n\nApakah Anda ingin tahu juga atribut di Day 1?"
             else:
+                ringkasan = self.get_ormik_info("atribut_perlengkapan", "ringkasan")
                 return (
-                    "🎒 **Atribut & Perlengkapan ORMIK 2025:**\n\n"
-                    "**Day 1 (Individu):** Makanan (snack level up, dll), ATK, topi rimba navy, name tag, passport, kresek sepatu, sandal, alat salat, BPJS, tumbler.\n"
-                    "**Per Kompi:** Trash bag.\n"
-                    "**Last Day:** Item serupa + konsumsi sesuai panduan.\n\n"
-                    "Ingin tahu detail atribut untuk hari tertentu? Tanyakan misal: 'Atribut Day 1' atau 'Atribut Last Day'."
+                    f"🎒 **Atribut & Perlengkapan {nama}:**\n\n" +
+                    "".join(f"**{label}:** {text}\n" for label, text in ringkasan.items()) +
+                    "\nIngin tahu detail atribut untuk hari tertentu? Tanyakan misal: 'Atribut Day 1' atau 'Atribut Last Day'."
                 )
 
         return (
-            "Halo! Saya **ZEERO** 🤖 siap bantu info resmi ORMIK 2025.\n\n"
+            f"Halo! Saya **ZEERO** 🤖 siap bantu info resmi {nama}.\n\n"
             "**Yang bisa ditanya:** `jadwal`, `divisi`, `lokasi`, `kontak`, `tips`, `dress code`, `tata tertib`, `punishment`, `atribut`, `tugas`.\n"
             "Contoh: *\"Apa dress code untuk putri?\"* ✨"
         )
@@ -858,167 +918,65 @@ class ZEEROAgent:
         ]
 
     def _get_keyword_confidence(self, user_input: str) -> float:
-        s = user_input.lower()
-        high = ['jadwal','schedule','tanggal','waktu','kapan','jam','hari',
-                'kontak','contact','telepon','instagram','lokasi','alamat','kampus','tempat','dimana','di mana',
-                'dress code','pakaian','baju','seragam','outfit']
-        med  = ['divisi','struktur','panitia','tim','atribut','perlengkapan','barang','tugas','assignment','kerjaan','tata tertib','peraturan','punishment','hukuman','sanksi']
-        conf = 0.0
-        for k in high:
-            if self._has_keyword(s, [k]): conf += 0.4
-        for k in med:
-            if self._has_keyword(s, [k]): conf += 0.3
-        return min(conf, 1.0)
-
-    def _has_keyword(self, text: str, keywords: list[str]) -> bool:
-        text_lower = text.lower().strip()
-        
-        # Normalize text - remove extra spaces and special characters for better matching
-        normalized_text = re.sub(r'[^\w\s]', ' ', text_lower)
-        normalized_text = re.sub(r'\s+', ' ', normalized_text).strip()
-        
-        # Sort keywords by length (longest first) for better phrase matching
-        sorted_keywords = sorted(keywords, key=len, reverse=True)
-        
-        # Check for exact phrase matches first (highest priority)
-        for keyword in sorted_keywords:
-            keyword_lower = keyword.lower().strip()
-            normalized_keyword = re.sub(r'[^\w\s]', ' ', keyword_lower)
-            normalized_keyword = re.sub(r'\s+', ' ', normalized_keyword).strip()
-            
-            # Exact phrase match in original text
-            if keyword_lower in text_lower:
-                return True
-            
-            # Exact phrase match in normalized text
-            if normalized_keyword in normalized_text:
-                return True
-        
-        # For single word keywords, check if they appear as whole words
-        text_words = re.findall(r'\b\w+\b', normalized_text)
-        for keyword in keywords:
-            keyword_lower = keyword.lower().strip()
-            # If keyword is a single word, check for exact word match
-            if ' ' not in keyword_lower and keyword_lower in text_words:
-                return True
-        
-        # Fuzzy matching for common typos (only for longer keywords to avoid false positives)
-        for keyword in sorted_keywords:
-            if len(keyword) > 4:  # Only apply fuzzy matching to longer keywords
-                keyword_lower = keyword.lower().strip()
-                # Check if keyword appears with minor variations (1 character difference)
-                if self._fuzzy_match(normalized_text, keyword_lower):
-                    return True
-                    
-        return False
-    
-    def _fuzzy_match(self, text: str, keyword: str) -> bool:
-        """Check for fuzzy match with edit distance of 1 for keywords > 4 characters"""
-        import difflib
-        text_words = text.split()
-        
-        # Check if any word in text is similar to keyword
-        for word in text_words:
-            if len(word) > 3 and len(keyword) > 3:
-                # Calculate similarity ratio
-                similarity = difflib.SequenceMatcher(None, word, keyword).ratio()
-                if similarity >= 0.8:  # 80% similarity threshold
-                    return True
-        
-        # Check if keyword appears in text with minor variations
-        close_matches = difflib.get_close_matches(keyword, text_words, n=1, cutoff=0.8)
-        return len(close_matches) > 0
+        return self.analyze(user_input).confidence
+
+    def _fuzzy_candidates(self, tokens: List[str], hits: Dict[str, Set[str]]) -> Tuple[List[str], bool]:
+        """Words that get a typo lookup, and whether the cost bounds left any out."""
+        if EARLY_EXIT_TOKENS and len(tokens) > EARLY_EXIT_TOKENS and "topic" in hits:
+            # Long query whose exact hits already settle topic and intent: skip the typo pass
+            if any(group in hits for group in self.keyword_tables["intents"]):
+                return [], True
+        words = list(dict.fromkeys(w for w in tokens if len(w) > 3))
+        if len(words) > FUZZY_BUDGET:
+            return words[:FUZZY_BUDGET], True
+        return tokens, False
+
+    def _fuzzy_keywords(self, tokens: list[str]) -> Set[str]:
+        # One index lookup per distinct query word instead of scoring every keyword
+        found: Set[str] = set()
+        for word in set(tokens):
+            if len(word) > 3:
+                found |= self.fuzzy_index.lookup(word)
+        return found
 
     def _resolve_intent(self, text: str) -> str | None:
-        intents = {
-            "creator": ["tim pengembang", "pembuat", "developer", "creator", "pencipta", "siapa yang buat", "who created", "who made", "it support ormik"],
-            "greetings": ["halo", "hai", "hello", "zeero apa", "siapa kamu", "kamu siapa", "perkenalan", "intro"],
-            "jadwal": ["jadwal", "schedule", "tanggal", "waktu", "kapan", "jam", "hari", "berapa", "mulai", "selesai"],
-            "divisi": ["divisi", "struktur", "organisasi", "tim", "steering", "project officer", "po", "sekretaris", "bendahara", "public relation", "pr", "liaison", "lo", "event", "media", "kreatif", "kedisiplinan", "kedis", "mentor", "logistik", "konsumsi", "konsum", "medis", "it support", "it"],
-            "lokasi": ["lokasi", "kampus", "tempat", "alamat", "fasilitas", "dimana", "di mana", "gedung", "ruangan", "parkir"],
-            "kontak": ["kontak", "contact", "hubungi", "telepon", "whatsapp", "email", "instagram", "cp", "nomor", "wa"],
-            "tips": ["tips", "saran", "panduan", "cara", "bagaimana", "strategi", "persiapan", "advice"],
-            "dress": ["dress", "pakaian", "baju", "seragam", "outfit", "kostum", "berpakaian"],
-            "tata_tertib": ["tata tertib", "peraturan", "tertib", "tata", "aturan", "rule"],
-            "punishment": ["punishment", "hukuman", "sanksi", "pelanggaran", "hukum", "sanksi apa", "denda"],
-            "atribut": ["atribut", "perlengkapan", "barang", "bawa", "perlu", "bawa apa", "apa yang dibawa", "kelengkapan"],
-            "tugas": ["tugas", "assignment", "kerjaan", "kerja", "tugas apa", "pekerjaan", "job", "hari pertama", "hari 1", "hari ke-1", "day 1", "hari terakhir", "last day", "tugas pra", "tugas persiapan"],
-            "ketentuan": ["ketentuan", "putra", "putri", "dress code", "syarat", "requirement"],
-            "perizinan": ["perizinan", "izin", "izinan", "tidak hadir", "absen"],
-            "kewajiban": ["kewajiban", "wajib", "kewajiban peserta", "harus", "must"],
-            "hak": ["hak", "hak peserta", "boleh", "dapat", "bisa"],
-            "guidebook": ["guidebook", "guide book", "buku panduan", "panduan", "rundown", "download", "unduh", "pdf"],
-            "ormik": ["ormik sttnf", "ormik explore", "ormik 2025", "apa itu ormik", "tentang ormik", "pengertian ormik", "definisi ormik", "orientasi"],
-        }
-        
-        matches = []
-        for cat, words in intents.items():
-            if self._has_keyword(text, words):
-                matches.append(cat)
-        
-        if not matches:
-            return None
-        
-        # Handle specific combinations and context first
-        text_lower = text.lower()
-        
-        # Helper function for whole word matching in combinations
-        def has_whole_word(text: str, words: list) -> bool:
-            import re
-            for word in words:
-                pattern = r'\b' + re.escape(word) + r'\b'
-                if re.search(pattern, text):
-                    return True
-            return False
-        
-        # Task-specific combinations (HIGH PRIORITY - check first)
-        if "tugas" in matches and (
-            has_whole_word(text_lower, ["hari", "day", "pertama", "terakhir", "akhir", "pra", "persiapan", "sebelum"]) or 
-            any(phrase in text_lower for phrase in ["hari 1", "hari ke-1", "day 1", "last day", "hari pertama"])
-        ):
-            return "tugas"
-        
-        # Creator-specific combinations
-        if "creator" in matches and has_whole_word(text_lower, ["pembuat", "developer", "creator", "tim pengembang"]):
-            return "creator"
-            
-        # Contact-specific combinations (use whole word matching to avoid false positives)
-        if "kontak" in matches and (has_whole_word(text_lower, ["panitia", "whatsapp"]) or "nomor" in text_lower or "cp " in text_lower):
-            return "kontak"
-            
-        # Schedule-specific combinations  
-        if "jadwal" in matches and has_whole_word(text_lower, ["hari", "tanggal", "kapan", "jam", "waktu", "berapa", "mulai", "selesai"]):
-            return "jadwal"
-            
-        # Division-specific combinations
-        if "divisi" in matches and has_whole_word(text_lower, ["struktur", "organisasi", "tim", "panitia"]):
-            return "divisi"
-            
-        # Location-specific combinations
-        if "lokasi" in matches and has_whole_word(text_lower, ["kampus", "alamat", "gedung", "parkir", "fasilitas"]):
-            return "lokasi"
-            
-        # Tips-specific combinations
-        if "tips" in matches and has_whole_word(text_lower, ["persiapan", "strategi", "cara", "panduan"]):
-            return "tips"
-            
-        # Dress code combinations
-        if ("dress" in matches or "ketentuan" in matches) and has_whole_word(text_lower, ["pakaian", "baju", "seragam", "outfit"]):
-            return "dress"
-            
+        return self.analyze(text).intent
+
+    def _build_intent_scorer(self) -> IntentScorer:
+        # Context rules, highest precedence first: an intent that matched together
+        # with words that make it specific beats the priority order below
+        rules = [
+            # Task-specific combinations
+            ContextRule("tugas", ("tugas",), ("hari", "day", "pertama", "terakhir", "akhir", "pra", "persiapan", "sebelum"),
+                        ("hari 1", "day 1", "last day", "hari pertama")),
+            # Creator-specific combinations
+            ContextRule("creator", ("creator",), ("pembuat", "developer", "creator", "tim pengembang")),
+            # Contact-specific combinations (whole words avoid false positives)
+            ContextRule("kontak", ("kontak",), ("panitia", "whatsapp"), ("nomor", "cp ")),
+            # Schedule-specific combinations
+            ContextRule("jadwal", ("jadwal",), ("hari", "tanggal", "kapan", "jam", "waktu", "berapa", "mulai", "selesai")),
+            # Division-specific combinations
+            ContextRule("divisi", ("divisi",), ("struktur", "organisasi", "tim", "panitia")),
+            # Location-specific combinations
+            ContextRule("lokasi", ("lokasi",), ("kampus", "alamat", "gedung", "parkir", "fasilitas")),
+            # Tips-specific combinations
+            ContextRule("tips", ("tips",), ("persiapan", "strategi", "cara", "panduan")),
+            # Dress code combinations
+            ContextRule("dress", ("dress", "ketentuan"), ("pakaian", "baju", "seragam", "outfit")),
+        ]
         # Priority order - more specific intents first
         priority = [
             "creator",    # Highest priority for creator information
             "greetings",
             "guidebook",
-            "jadwal", 
+            "jadwal",
             "kontak",
-            "lokasi", 
+            "lokasi",
             "divisi",
             "tips",
             "dress",
             "tata_tertib",
-            "punishment", 
+            "punishment",
             "atribut",
             "tugas",
             "ketentuan",
@@ -1027,61 +985,453 @@ class ZEEROAgent:
             "hak",
             "ormik",  # Put ormik at the end with lowest priority
         ]
-        
-        # Sort matches by priority
-        matches.sort(key=lambda c: priority.index(c))
-        return matches[0]
+        tables = self.keyword_tables
+        return IntentScorer(
+            tables["intents"], priority, rules,
+            confidence=[
+                ("confidence_high", tables["confidence_high"], 0.4),
+                ("confidence_med", tables["confidence_med"], 0.3),
+            ],
+        )
 
-    def _init_context(self) -> Dict[str, Any]:
+    def _init_keywords(self) -> Dict[str, Any]:
+        event_names = self.context['ormikData']['acara']['kata_kunci']
+        campus_names = self.context['ormikData']['kampus']['kata_kunci']
         return {
-            "ormikData": {
-                "schedule": [
-                    {"id": "pra-ormik", "title": "PRA ORMIK", "date": "Senin, 8 September 2025", "fullDate": "2025-09-08"},
-                    {"id": "day-1", "title": "DAY 1", "date": "Selasa, 16 September 2025", "fullDate": "2025-09-16"},
-                    {"id": "last-day", "title": "LAST DAY", "date": "Sabtu, 20 September 2025", "fullDate": "2025-09-20"}
+            "topic": [
+                *event_names, "apa itu ormik", "ormik apa", "tentang ormik", "pengertian ormik",
+                "guidebook", "guide book", "buku panduan", "rundown", "download", "unduh",
+                *campus_names, "zeero",
+                "jadwal", "schedule", "tanggal", "waktu", "kapan", "jam", "hari",
+                "divisi", "organisasi", "panitia", "steering", "project officer", "po", "sekretaris", "bendahara", "public relation", "pr", "liaison", "lo", "event", "media", "kreatif", "kedisiplinan", "kedis", "mentor", "logistik", "konsumsi", "konsum", "medis", "it support", "it",
+                "lokasi", "kampus", "alamat", "fasilitas", "dimana", "di mana",
+                "kontak", "instagram", "hubungi",
+                "tips", "persiapan", "panduan", "dress", "pakaian", "seragam", "outfit",
+                "tata tertib", "aturan", "peraturan", "punishment", "hukuman", "sanksi",
+                "atribut", "perlengkapan", "tugas", "assignment", "mentor", "kompi"
+            ],
+            "intents": {
+                "creator": ["tim pengembang", "pembuat", "developer", "creator", "pencipta", "siapa yang buat", "who created", "who made", "it support ormik"],
+                "greetings": ["halo", "hai", "hello", "zeero apa", "siapa kamu", "kamu siapa", "perkenalan", "intro"],
+                "jadwal": ["jadwal", "schedule", "tanggal", "waktu", "kapan", "jam", "hari", "berapa", "mulai", "selesai"],
+                "divisi": ["divisi", "struktur", "organisasi", "tim", "steering", "project officer", "po", "sekretaris", "bendahara", "public relation", "pr", "liaison", "lo", "event", "media", "kreatif", "kedisiplinan", "kedis", "mentor", "logistik", "konsumsi", "konsum", "medis", "it support", "it"],
+                "lokasi": ["lokasi", "kampus", "tempat", "alamat", "fasilitas", "dimana", "di mana", "gedung", "ruangan", "parkir"],
+                "kontak": ["kontak", "contact", "hubungi", "telepon", "whatsapp", "email", "instagram", "cp", "nomor", "wa"],
+                "tips": ["tips", "saran", "panduan", "cara", "bagaimana", "strategi", "persiapan", "advice"],
+                "dress": ["dress", "pakaian", "baju", "seragam", "outfit", "kostum", "berpakaian"],
+                "tata_tertib": ["tata tertib", "peraturan", "tertib", "tata", "aturan", "rule"],
+                "punishment": ["punishment", "hukuman", "sanksi", "pelanggaran", "hukum", "sanksi apa", "denda"],
+                "atribut": ["atribut", "perlengkapan", "barang", "bawa", "perlu", "bawa apa", "apa yang dibawa", "kelengkapan"],
+                "tugas": ["tugas", "assignment", "kerjaan", "kerja", "tugas apa", "pekerjaan", "job", "hari pertama", "hari 1", "hari ke-1", "day 1", "hari terakhir", "last day", "tugas pra", "tugas persiapan"],
+                "ketentuan": ["ketentuan", "putra", "putri", "dress code", "syarat", "requirement"],
+                "perizinan": ["perizinan", "izin", "izinan", "tidak hadir", "absen"],
+                "kewajiban": ["kewajiban", "wajib", "kewajiban peserta", "harus", "must"],
+                "hak": ["hak", "hak peserta", "boleh", "dapat", "bisa"],
+                "guidebook": ["guidebook", "guide book", "buku panduan", "panduan", "rundown", "download", "unduh", "pdf"],
+                "ormik": [*event_names, "apa itu ormik", "tentang ormik", "pengertian ormik", "definisi ormik", "orientasi"],
+            },
+            "confidence_high": ['jadwal','schedule','tanggal','waktu','kapan','jam','hari',
+                                'kontak','contact','telepon','instagram','lokasi','alamat','kampus','tempat','dimana','di mana',
+                                'dress code','pakaian','baju','seragam','outfit'],
+            "confidence_med": ['divisi','struktur','panitia','tim','atribut','perlengkapan','barang','tugas','assignment','kerjaan','tata tertib','peraturan','punishment','hukuman','sanksi'],
+            # Enhanced keyword detection for different task periods (checked in this order)
+            "tugas_variants": {
+                "day_1": [
+                    "day 1", "day1", "hari 1", "hari ke 1", "hari pertama",
+                    "tugas hari pertama", "tugas day 1", "tugas hari 1", "hari satu",
+                    "day satu", "tugas day satu"
+                ],
+                "last_day": [
+                    "last day", "last", "akhir", "terakhir", "hari terakhir", "hari akhir",
+                    "tugas akhir", "tugas terakhir", "tugas last day", "hari pamungkas"
+                ],
+                "pra_ormik": [
+                    "pra", "pra ormik", "sebelum", "persiapan", "tugas pra", "tugas persiapan",
+                    "sebelum ormik", "tugas sebelum"
                 ],
-                "contact": {
-                    "instagram": "https://www.instagram.com/ormikxplore/",
-                    "instagram_handle": "@ormikxplore"
-                },
-                "kampus": {
-                    "nama": "STT Terpadu Nurul Fikri Kampus B",
-                    "alamat": "Jl. Raya Lenteng Agung No.20–21, Srengseng Sawah, Jagakarsa, Jakarta Selatan",
-                    "kota": "Jakarta Selatan",
-                    "provinsi": "DKI Jakarta",
-                    "hotline": "021-7863191",
-                    "whatsapp": "0857-1624-3174",
-                    "email": "info@nurulfikri.ac.id",
-                    "website": "https://nurulfikri.ac.id",
-                    "maps_url": "https://maps.app.goo.gl/jnG4mhZV8QJDLdbNA",
-                    "youtube": "https://www.youtube.com/@STTNF",
-                    "guidebook_url": "https://drive.usercontent.google.com/u/1/uc?id=1dicryzEqjhbPcSGXx02x9t2ULLRTb7oT&export=download"
-                }
-            }
+            },
+            # Specific division keywords
+            "divisi_variants": {
+                "steering": "steering_committee",
+                "project officer": "project_officer",
+                "po": "project_officer",
+                "sekretaris": "sekretaris",
+                "bendahara": "bendahara",
+                "public relation": "public_relation",
+                "pr": "public_relation",
+                "liaison": "liaison_officer",
+                "lo": "liaison_officer",
+                "event": "event",
+                "media": "media",
+                "kreatif": "kreatif",
+                "kedisiplinan": "kedisiplinan",
+                "kedis": "kedisiplinan",
+                "mentor": "mentor",
+                "logistik": "logistik",
+                "konsumsi": "konsumsi",
+                "konsum": "konsumsi",
+                "medis": "medis",
+                "it support": "it_support",
+                "it": "it_support"
+            },
+        }
+
+    def _compile_keywords(self) -> KeywordMatcher:
+        # Every keyword list compiled into one automaton; intents keep their own names
+        tables = self.keyword_tables
+        return KeywordMatcher({
+            "topic": tables["topic"],
+            **tables["intents"],
+            "confidence_high": tables["confidence_high"],
+            "confidence_med": tables["confidence_med"],
+        })
+
+    def _build_fuzzy_index(self, threshold: float) -> FuzzyIndex:
+        # Only longer keywords take part in fuzzy matching to avoid false positives
+        keywords = {k for words in self.keyword_matcher.groups.values() for k in words if len(k) > 4}
+        return FuzzyIndex(sorted(keywords), threshold=threshold, max_distance=FUZZY_MAX_DISTANCE, memo_size=FUZZY_MEMO_SIZE)
+
+    def _sort_division_keywords(self) -> List[Tuple[str, str]]:
+        # Sort keywords by length (longest first) to prioritize exact matches
+        return sorted(self.keyword_tables["divisi_variants"].items(), key=lambda x: len(x[0]), reverse=True)
+
+    def _answer_variants(self) -> Dict[str | None, List[str]]:
+        return {
+            None: ["default"],
+            "guidebook": ["default"],
+            "ormik": ["default"],
+            "creator": ["default"],
+            "hak": ["default"],
+            "kewajiban": ["default"],
+            "ketentuan": ["default", "putra", "putri"],
+            "perizinan": ["default"],
+            "tugas": ["default", "pra_ormik", "day_1", "last_day"],
+            "greetings": ["default", "zeero"],
+            "jadwal": ["default", "waktu", "download", "waktu_download"],
+            "divisi": ["default", *self.ormik_data["divisi"]],
+            "lokasi": ["default"],
+            "kontak": ["default"],
+            "tips": ["default", "persiapan", "selama"],
+            "dress": ["default"],
+            "tata_tertib": ["default"],
+            "punishment": ["default", *self.ormik_data["punishment"]],
+            "atribut": ["default", "day_1", "last_day"],
         }
 
+    def _render_answers(self) -> AnswerTable:
+        # Every answer is static for a given knowledge base, so render and word-limit it once
+        table = {}
+        for intent, variants in self._answer_variants().items():
+            for variant in variants:
+                table[(intent, variant)] = self._prerender(self._render_answer(intent, variant))
+        return MappingProxyType(table)
+
+    def _prerender(self, text: str, watch: Stopwatch | None = None) -> RenderedAnswer:
+        if watch:
+            watch.lap("render")
+        answer, truncated, word_count = limit_words(text, 400)
+        if watch:
+            watch.lap("truncation")
+        return RenderedAnswer(
+            text=text,
+            answer=answer,
+            truncated=truncated,
+            word_count=word_count,
+            chunks=tuple(split_markdown(answer, STREAM_CHUNK_CHARS)),
+            answer_json=dumps(answer),
+        )
+
     def _limit_words(self, text: str, max_words: int):
-        words = re.findall(r"\S+", text)
-        if len(words) <= max_words:
-            return text, False
-        trimmed = " ".join(words[:max_words])
-        return trimmed, True
+        answer, truncated, _ = limit_words(text, max_words)
+        return answer, truncated
 
     def _wrap(self, text: str) -> str:
         return text
 
-agent = ZEEROAgent()
+def snapshot_fingerprint() -> str:
+    # Settings baked into the built indexes and pre-rendered answers
+    return fingerprint(KNOWLEDGE_BASE_PATH, (FUZZY_THRESHOLD, FUZZY_MAX_DISTANCE, FUZZY_MEMO_SIZE, STREAM_CHUNK_CHARS))
+
+def _create_agent() -> Tuple[ZEEROAgent, str]:
+    if SNAPSHOT_PATH:
+        loaded = load_snapshot(SNAPSHOT_PATH, snapshot_fingerprint())
+        if isinstance(loaded, ZEEROAgent):
+            loaded.metrics = metrics
+            loaded.query_log = query_log
+            return loaded, "snapshot"
+    return ZEEROAgent(metrics=metrics, query_log=query_log), "built"
+
+_agent_started = time.perf_counter()
+agent, _agent_source = _create_agent()
+# Filled in as startup proceeds and reported by /ready
+startup: Dict[str, Any] = {
+    "agent_source": _agent_source,
+    "agent_ms": round((time.perf_counter() - _agent_started) * 1000, 1),
+    "import_ms": None,
+    "warmup_ms": None,
+}
+_reload_lock = threading.Lock()
+
+def warm_up_agent() -> None:
+    started = time.perf_counter()
+    warmed = agent.warm_up()
+    startup["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "app.main imported in %.0f ms (agent %s in %.0f ms), warm-up of %d queries in %.0f ms",
+        startup["import_ms"], startup["agent_source"], startup["agent_ms"], warmed, startup["warmup_ms"],
+    )
+
+def reload_knowledge_base(kb: KnowledgeBase | None = None) -> ZEEROAgent:
+    """Build an agent for the new knowledge base, then swap it in with a single assignment.
+
+    Requests read the module-level `agent` once, so each one is served entirely
+    by either the old or the new agent, never by a half-built one.
+    """
+    global agent
+    with _reload_lock:
+        kb = kb or load_knowledge_base(KNOWLEDGE_BASE_PATH)
+        current = agent
+        if kb.version != current.version:
+            new = ZEEROAgent(
+                kb,
+                fuzzy_threshold=current.fuzzy_threshold,
+                cache_size=current.response_cache.max_entries,
+                cache_ttl=current.response_cache.ttl,
+                metrics=current.metrics,
+                query_log=current.query_log,
+            )
+            new.warm_up()
+            agent = new
+        return agent
+
+def _build_tenant_agent(tenant: str, kb: KnowledgeBase) -> ZEEROAgent:
+    tenant_agent = ZEEROAgent(kb, metrics=metrics, query_log=query_log, tenant=tenant)
+    tenant_agent.warm_up()
+    return tenant_agent
+
+tenants = TenantRegistry(
+    TENANTS_DIR, int(TENANT_MEMORY_MB * 1024 * 1024), _build_tenant_agent, lambda: agent,
+    shared=(metrics, query_log),
+)
+
+def _tenant_unavailable(tenant: str, exc: TenantUnavailable) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Tenant knowledge base could not be loaded: {tenant}",
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+async def _tenant_agent(tenant: str) -> ZEEROAgent:
+    # Loaded tenants resolve on the event loop; only a first build goes to the threadpool
+    bot = tenants.loaded(tenant)
+    if bot is None:
+        bot = await run_in_threadpool(tenants.get, tenant)
+    return bot
+
+async def resolve_agent(request: Request, x_tenant: str | None = Header(default=None)) -> AsyncIterator[ZEEROAgent]:
+    """The agent for the tenant named in the path (/v1/tenants/{tenant}/...) or X-Tenant, else the default one."""
+    tenant = request.path_params.get("tenant") or x_tenant or DEFAULT_TENANT
+    started = time.perf_counter()
+    try:
+        bot = await _tenant_agent(tenant)
+    except TenantNotFound:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant}")
+    except TenantUnavailable as exc:
+        raise _tenant_unavailable(tenant, exc)
+    try:
+        yield bot
+    finally:
+        elapsed = time.perf_counter() - started
+        tenants.observe(tenant, elapsed)
+        if metrics is not None:
+            metrics.tenant_seconds.observe(elapsed, tenant)
+
+rate_limiter = RateLimiter(
+    RATE_LIMIT_KEY_RATE, RATE_LIMIT_KEY_BURST, RATE_LIMIT_IP_RATE, RATE_LIMIT_IP_BURST,
+    max_buckets=RATE_LIMIT_MAX_BUCKETS,
+)
+
+async def enforce_rate_limit(request: Request, x_api_key: str | None = Header(default=None)) -> None:
+    # async so the check runs on the event loop instead of taking a threadpool hop
+    _check_rate_limit(x_api_key, request.client.host if request.client else None)
+
+def _check_rate_limit(api_key: str | None, host: str | None) -> None:
+    if not rate_limiter.enabled:
+        return
+    wait, limit = rate_limiter.check(api_key, host)
+    if wait:
+        if metrics is not None:
+            metrics.rate_limited.inc(limit)
+        raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": str(math.ceil(wait))})
 
 # === Routes ===
 @app.get("/health")
 def health():
-    return {"ok": True}
+    return {"ok": True, "version": agent.version}
+
+@app.get("/ready")
+def ready():
+    # Readiness probe: 503 until the startup warm-up has run
+    if startup["warmup_ms"] is None:
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"ready": True, "version": agent.version, "pid": os.getpid(), **startup}
+
+# Answers only change with the knowledge base, and the ETag changes with it
+HTTP_CACHE_CONTROL = f"public, max-age={HTTP_CACHE_MAX_AGE}" if HTTP_CACHE_MAX_AGE > 0 else "no-cache"
+
+@app.get("/v1/tenants")
+def get_tenants():
+    return tenants.stats()
+
+if metrics is not None:
+    # Read from whichever agent is current at scrape time
+    for _stat, _help in (
+        ("entries", "Responses currently cached"),
+        ("hits", "Response cache hits since the current knowledge base was loaded"),
+        ("misses", "Response cache misses since the current knowledge base was loaded"),
+        ("hit_rate", "Response cache hit rate since the current knowledge base was loaded"),
+        ("evictions", "Response cache LRU evictions since the current knowledge base was loaded"),
+        ("expirations", "Response cache TTL expirations since the current knowledge base was loaded"),
+    ):
+        metrics.register(Gauge(f"zeero_cache_{_stat}", _help, lambda _stat=_stat: agent.cache_stats()[_stat]))
+    for _stat, _help in (
+        ("entries", "Query words with a remembered typo lookup"),
+        ("hit_rate", "Typo lookups answered from memory since the current knowledge base was loaded"),
+        ("evictions", "Typo lookups dropped from memory since the current knowledge base was loaded"),
+    ):
+        metrics.register(Gauge(f"zeero_fuzzy_memo_{_stat}", _help, lambda _stat=_stat: agent.fuzzy_stats()[_stat]))
+    metrics.register(Gauge("zeero_tenants_loaded", "Tenants other than the default one in memory", lambda: len(tenants.stats()["tenants"]) - 1))
+    metrics.register(Gauge("zeero_tenant_memory_bytes", "Estimated memory of the loaded tenants", tenants.memory_used))
+    metrics.register(Gauge("zeero_ws_connections", "Open WebSocket chat connections", lambda: chat_sockets.open))
+    if query_log is not None:
+        for _stat, _help in (
+            ("buffered", "Query log entries waiting to be written"),
+            ("written", "Query log entries written"),
+            ("dropped", "Query log entries dropped because the buffer was full or a write failed"),
+        ):
+            metrics.register(Gauge(f"zeero_query_log_{_stat}", _help, lambda _stat=_stat: query_log.stats()[_stat]))
+    # Per worker process; shared is what prefork workers still share with the parent
+    for _stat in ("rss", "pss", "shared", "private"):
+        metrics.register(Gauge(
+            f"zeero_process_{_stat}_bytes", f"Process memory: {_stat}", lambda _stat=_stat: process_memory().get(_stat, 0),
+        ))
+
+    @app.get("/metrics", include_in_schema=False)
+    def get_metrics():
+        return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+# Served for the default tenant or X-Tenant under /v1, and for any tenant under /v1/tenants/{tenant}
+tenant_routes = APIRouter()
 
-@app.get("/v1/keywords", response_model=KeywordsResponse)
-def get_keywords():
-    return agent.keywords()
+@tenant_routes.get("/keywords", response_model=KeywordsResponse)
+def get_keywords(bot: ZEEROAgent = Depends(resolve_agent), if_none_match: str | None = Header(default=None)):
+    return conditional_response(bot.keywords_body, if_none_match, HTTP_CACHE_CONTROL, vary="X-Tenant")
 
-@app.post("/v1/chat", response_model=ChatResponse)
-def chat(req: ChatRequest, x_api_key: str | None = Header(default=None)):
+@tenant_routes.get("/cache/stats")
+def get_cache_stats(bot: ZEEROAgent = Depends(resolve_agent)):
+    return {**bot.cache_stats(), "fuzzy": bot.fuzzy_stats()}
+
+@tenant_routes.get("/chat", response_model=ChatResponse, dependencies=[Depends(enforce_rate_limit)])
+def chat_get(
+    query: str = Query(..., description="User message (natural language)"),
+    bot: ZEEROAgent = Depends(resolve_agent),
+    if_none_match: str | None = Header(default=None),
+    x_api_key: str | None = Header(default=None),
+):
+    # Same answer as POST, but cacheable by a CDN or Next.js fetch and revalidated with If-None-Match
+    return conditional_response(bot.reply_body(query), if_none_match, HTTP_CACHE_CONTROL, vary="X-Tenant")
+
+@tenant_routes.post("/chat", response_model=ChatResponse, dependencies=[Depends(enforce_rate_limit)])
+def chat(req: ChatRequest, bot: ZEEROAgent = Depends(resolve_agent), x_api_key: str | None = Header(default=None)):
     # Optional: place simple header token check here if needed
-    return agent.reply(req.query)
+    # Pre-serialized body: skips response_model validation and JSON encoding
+    return Response(bot.reply_json(req.query), media_type="application/json")
+
+@tenant_routes.post("/chat/stream", dependencies=[Depends(enforce_rate_limit)])
+def chat_stream(req: ChatRequest, bot: ZEEROAgent = Depends(resolve_agent), x_api_key: str | None = Header(default=None)):
+    # Server-sent events: `meta`, one or more `chunk`, then `done`
+    events = (sse_event(event, data) for event, data in bot.reply_stream(req.query))
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@tenant_routes.post("/chat/batch", response_model=List[ChatResponse], dependencies=[Depends(enforce_rate_limit)])
+def chat_batch(req: ChatBatchRequest, bot: ZEEROAgent = Depends(resolve_agent), x_api_key: str | None = Header(default=None)):
+    return Response(bot.reply_batch_json(req.queries), media_type="application/json")
+
+chat_sockets = ChatSockets(WS_IDLE_TIMEOUT, WS_MAX_IN_FLIGHT)
+
+@tenant_routes.websocket("/chat/ws")
+async def chat_ws(
+    websocket: WebSocket,
+    api_key: str | None = Query(default=None),
+    x_api_key: str | None = Header(default=None),
+    x_tenant: str | None = Header(default=None),
+):
+    # Browsers can't set headers on a WebSocket, so the key may also come as ?api_key=
+    tenant = websocket.path_params.get("tenant") or x_tenant or DEFAULT_TENANT
+    try:
+        await _tenant_agent(tenant)
+    except TenantNotFound:
+        # Closing before accept rejects the handshake with 403
+        await websocket.close(code=1008, reason=f"Unknown tenant: {tenant}")
+        return
+    except TenantUnavailable:
+        await websocket.close(code=1013, reason=f"Tenant knowledge base could not be loaded: {tenant}")
+        return
+    key = x_api_key or api_key
+    host = websocket.client.host if websocket.client else None
+
+    async def answer(query: str) -> bytes:
+        started = time.perf_counter()
+        status = "500"
+        try:
+            _check_rate_limit(key, host)
+            try:
+                # Looked up per message so a reload or an eviction is picked up mid-session
+                bot = await _tenant_agent(tenant)
+            except TenantNotFound:
+                raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant}")
+            except TenantUnavailable as exc:
+                raise _tenant_unavailable(tenant, exc)
+            body = await run_in_threadpool(bot.reply_json, query)
+            status = "200"
+            tenants.observe(tenant, time.perf_counter() - started)
+            return body
+        except HTTPException as exc:
+            status = str(exc.status_code)
+            raise
+        finally:
+            if metrics is not None:
+                elapsed = time.perf_counter() - started
+                metrics.ws_message_seconds.observe(elapsed, status)
+                if status == "200":
+                    metrics.tenant_seconds.observe(elapsed, tenant)
+
+    await chat_sockets.serve(websocket, answer)
+
+app.include_router(tenant_routes, prefix="/v1")
+app.include_router(tenant_routes, prefix="/v1/tenants/{tenant}")
+
+@app.post("/v1/admin/reload")
+def admin_reload(x_admin_token: str | None = Header(default=None), x_tenant: str | None = Header(default=None)):
+    if not ADMIN_TOKEN or not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    if x_tenant and x_tenant != DEFAULT_TENANT:
+        # Other tenants are rebuilt from their file on their next request
+        return {"tenant": x_tenant, "evicted": tenants.evict(x_tenant)}
+    previous = agent.version
+    try:
+        current = reload_knowledge_base()
+    except (OSError, ValueError) as e:
+        # unreadable file, invalid JSON or schema violation: keep serving the old one
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        # valid file the agent can't be built from
+        logger.exception("Building an agent for the reloaded knowledge base failed")
+        raise HTTPException(status_code=422, detail=f"Knowledge base could not be built: {e!r}")
+    return {"version": current.version, "reloaded": current.version != previous}
+
+startup["import_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
@@ -0,0 +1,92 @@
+import re
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+_NON_WORD = re.compile(r'[^\w\s]')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, replace punctuation with spaces and collapse whitespace."""
+    normalized = _NON_WORD.sub(' ', text.lower().strip())
+    return _SPACES.sub(' ', normalized).strip()
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over named keyword lists.
+
+    Keywords are normalized once when the matcher is built. A single pass over
+    a normalized query returns, per list, every keyword found in it (plain
+    substring semantics, the same as the old per-keyword ``in`` checks).
+    """
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]) -> None:
+        self.groups: Dict[str, List[str]] = {name: list(words) for name, words in groups.items()}
+        self._normalized: Dict[str, str] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        # pattern id -> [(group, original keyword), ...]
+        self._owners: List[List[Tuple[str, str]]] = []
+
+        pattern_ids: Dict[str, int] = {}
+        for name, words in self.groups.items():
+            for keyword in words:
+                pattern = self.normalize(keyword)
+                if not pattern:
+                    continue
+                pid = pattern_ids.get(pattern)
+                if pid is None:
+                    pid = pattern_ids[pattern] = len(self._owners)
+                    self._owners.append([])
+                    self._insert(pattern, pid)
+                self._owners[pid].append((name, keyword))
+        self._link()
+
+    def normalize(self, keyword: str) -> str:
+        normalized = self._normalized.get(keyword)
+        if normalized is None:
+            normalized = self._normalized[keyword] = normalize_text(keyword)
+        return normalized
+
+    def scan(self, normalized_text: str) -> Dict[str, Set[str]]:
+        """Return ``{group: {matched keywords}}`` for an already normalized text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[int] = set()
+        node = 0
+        for ch in normalized_text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+
+        hits: Dict[str, Set[str]] = {}
+        for pid in found:
+            for name, keyword in self._owners[pid]:
+                hits.setdefault(name, set()).add(keyword)
+        return hits
+
+    def _insert(self, pattern: str, pid: int) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = self._goto[node][ch] = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(pid)
+
+    def _link(self) -> None:
+        # Breadth-first over the trie so every fail target is final before use
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                state = self._fail[node]
+                while state and ch not in self._goto[state]:
+                    state = self._fail[state]
+                target = self._goto[state].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
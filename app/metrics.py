@@ -0,0 +1,242 @@
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Stage timings are tens of microseconds; route latencies up to seconds
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+ROUTE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str]) -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labels, key), value) for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = ROUTE_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[LabelValues, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.observe_many([(labels, value)])
+
+    def observe_many(self, observations: Iterable[Tuple[LabelValues, float]]) -> None:
+        """Record several (label values, value) pairs under a single lock acquisition."""
+        buckets = self.buckets
+        with self._lock:
+            for labels, value in observations:
+                series = self._series.get(labels)
+                if series is None:
+                    series = self._series[labels] = [[0] * (len(buckets) + 1), 0.0]
+                series[0][bisect.bisect_left(buckets, value)] += 1
+                series[1] += value
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        out = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                out.append((self.name + "_bucket", _format_labels(self.labels + ("le",), key + (_format_value(bound),)), cumulative))
+            out.append((self.name + "_sum", _format_labels(self.labels, key), total))
+            out.append((self.name + "_count", _format_labels(self.labels, key), cumulative))
+        return out
+
+
+class Gauge:
+    """Value read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]) -> None:
+        self.name = name
+        self.help = help
+        self.labels = ()
+        self._read = read
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [(self.name, "", self._read())]
+
+
+class Stopwatch:
+    """Times consecutive stages of one request.
+
+    ``lap(stage)`` records the time since the previous lap; the laps are only
+    written to the histogram by ``flush()``, under a single lock.
+    """
+
+    __slots__ = ("_histogram", "_last", "_laps")
+
+    def __init__(self, histogram: Histogram) -> None:
+        self._histogram = histogram
+        self._laps: List[Tuple[LabelValues, float]] = []
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self._laps.append(((stage,), now - self._last))
+        self._last = now
+
+    def flush(self) -> None:
+        if self._laps:
+            self._histogram.observe_many(self._laps)
+            self._laps = []
+
+
+def process_memory(pid: int | str = "self") -> Dict[str, int]:
+    """Memory of one process in bytes: rss, pss, shared and private (Linux only, else empty).
+
+    ``shared`` counts pages also mapped by another process -- for prefork
+    workers, the agent built by the parent that nobody has written to since.
+    """
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared",
+              "Private_Clean": "private", "Private_Dirty": "private"}
+    usage: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                key = fields.get(name)
+                if key is not None:
+                    usage[key] = usage.get(key, 0) + int(rest.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return {}
+    return usage
+
+
+def format_memory(usage: Dict[str, int]) -> str:
+    if not usage:
+        return "memory usage unavailable"
+    return ", ".join(f"{key} {usage[key] / 1048576:.1f} MiB" for key in ("rss", "pss", "shared", "private") if key in usage)
+
+
+class Metrics:
+    """Process-wide metrics for the agent pipeline and the HTTP routes.
+
+    Lives outside ZEEROAgent so counters survive a knowledge base reload.
+    """
+
+    def __init__(self) -> None:
+        self._collectors: List[Any] = []
+        self.stage_seconds = self.register(Histogram(
+            "zeero_stage_seconds", "Time spent in each stage of ZEEROAgent.reply", ["stage"], STAGE_BUCKETS,
+        ))
+        self.replies = self.register(Counter(
+            "zeero_replies_total", "Replies by resolved intent (offtopic, retrieval or an intent name)", ["intent"],
+        ))
+        self.offtopic = self.register(Counter("zeero_offtopic_total", "Replies that were off topic"))
+        self.rate_limited = self.register(Counter(
+            "zeero_rate_limited_total", "Requests rejected with 429 by limit (key or ip)", ["limit"],
+        ))
+        self.tenant_seconds = self.register(Histogram(
+            "zeero_tenant_request_seconds", "Time from tenant lookup to response by tenant", ["tenant"], ROUTE_BUCKETS,
+        ))
+        self.ws_message_seconds = self.register(Histogram(
+            "zeero_ws_message_seconds", "WebSocket chat message latency by reply status", ["status"], ROUTE_BUCKETS,
+        ))
+        self.request_seconds = self.register(Histogram(
+            "zeero_http_request_seconds", "HTTP request latency by route", ["method", "route", "status"], ROUTE_BUCKETS,
+        ))
+
+    def register(self, collector: Any) -> Any:
+        self._collectors.append(collector)
+        return collector
+
+    def stopwatch(self) -> Stopwatch:
+        return Stopwatch(self.stage_seconds)
+
+    def observe_reply(self, intent: str, topic_ok: bool) -> None:
+        self.replies.inc(intent)
+        if not topic_ok:
+            self.offtopic.inc()
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for collector in self._collectors:
+            lines.append(f"# HELP {collector.name} {collector.help}")
+            lines.append(f"# TYPE {collector.name} {collector.kind}")
+            for name, labels, value in collector.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its route template.
+
+    Plain ASGI rather than BaseHTTPMiddleware to keep the per-request overhead
+    to two clock reads and one histogram update. Unknown paths share a single
+    ``unmatched`` label so scanners can't blow up the series count.
+    """
+
+    def __init__(self, app: Any, metrics: Optional[Metrics]) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or self.metrics is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            self.metrics.request_seconds.observe(time.perf_counter() - start, scope["method"], path, str(status))
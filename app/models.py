@@ -1,16 +1,22 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from .config import BATCH_MAX_SIZE
 
 
 class ChatRequest(BaseModel):
     query: str = Field(..., description="User message (natural language)")
 
 
+class ChatBatchRequest(BaseModel):
+    queries: List[str] = Field(..., max_length=BATCH_MAX_SIZE, description="User messages, answered in order")
+
+
 class ChatResponse(BaseModel):
     answer: str
     confidence: float
     topic_ok: bool
     truncated: bool
+    degraded: bool = Field(False, description="Query exceeded a cost limit and was only partly matched")
 
 
 class KeywordsResponse(BaseModel):
@@ -0,0 +1,256 @@
+"""Query log for tuning the keyword tables: every reply's intent, confidence and latency.
+
+The request path only appends a tuple to an in-memory buffer: no I/O and no
+lock (``deque.append`` is atomic). A daemon thread drains the buffer in
+batches into rotating files, JSONL or SQLite, and every ``aggregate_interval``
+seconds also writes counts per (tenant, intent, topic_ok) for that window, so
+offline analysis can start from the counts instead of the raw log.
+
+When the buffer is full, new entries are dropped and counted rather than
+slowing requests down; the count is exported and written with each aggregate.
+Each worker process writes its own files (the pid is in the name).
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (unix time, tenant, normalized query, intent label, confidence, topic_ok, degraded, latency ms)
+Entry = Tuple[float, str, str, str, float, bool, bool, float]
+FIELDS = ("ts", "tenant", "query", "intent", "confidence", "topic_ok", "degraded", "latency_ms")
+
+
+class _Sink(ABC):
+    """Writes batches to ``<directory>/queries-<pid>.<ext>``, rotating by size.
+
+    Rotation renames the current file to ``.1`` (and ``.1`` to ``.2`` and so
+    on up to ``backups``) and starts a new one. The pid is read when writing,
+    so a sink created before a prefork still gives each worker its own file.
+    """
+
+    ext = ""
+
+    def __init__(self, directory: str, max_bytes: int, backups: int) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"queries-{os.getpid()}.{self.ext}")
+
+    @abstractmethod
+    def write(self, entries: List[Entry]) -> None:
+        """Append a batch of query entries."""
+
+    @abstractmethod
+    def write_counts(self, start: float, end: float, counts: Dict[Tuple[str, str, bool], List[float]], dropped: int) -> None:
+        """Append the window's counts per (tenant, intent, topic_ok) and the number of entries dropped."""
+
+    def close(self) -> None:
+        pass
+
+    def _rotate_if_needed(self) -> bool:
+        path = self.path
+        try:
+            if os.path.getsize(path) < self.max_bytes:
+                return False
+        except OSError:
+            return False
+        self.close()
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{n}"):
+                os.replace(f"{path}.{n}", f"{path}.{n + 1}")
+        if self.backups > 0:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+        return True
+
+
+class JsonlSink(_Sink):
+    """One JSON object per query; aggregates go to ``counts-<pid>.jsonl`` next to it."""
+
+    ext = "jsonl"
+
+    @property
+    def counts_path(self) -> str:
+        return os.path.join(self.directory, f"counts-{os.getpid()}.jsonl")
+
+    def write(self, entries: List[Entry]) -> None:
+        self._rotate_if_needed()
+        lines = [json.dumps(dict(zip(FIELDS, entry)), ensure_ascii=False) for entry in entries]
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def write_counts(self, start: float, end: float, counts: Dict[Tuple[str, str, bool], List[float]], dropped: int) -> None:
+        record = {
+            "start": start,
+            "end": end,
+            "dropped": dropped,
+            "counts": [
+                {"tenant": tenant, "intent": intent, "topic_ok": topic_ok, "count": int(n), "latency_ms_sum": round(total, 3)}
+                for (tenant, intent, topic_ok), (n, total) in sorted(counts.items())
+            ],
+        }
+        with open(self.counts_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class SqliteSink(_Sink):
+    """Tables ``queries`` (one row per query) and ``counts`` (one row per group and window)."""
+
+    ext = "sqlite"
+
+    def __init__(self, directory: str, max_bytes: int, backups: int) -> None:
+        super().__init__(directory, max_bytes, backups)
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            # Only the flusher thread uses the connection, but it is created there lazily
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS queries (ts REAL, tenant TEXT, query TEXT, intent TEXT, "
+                "confidence REAL, topic_ok INTEGER, degraded INTEGER, latency_ms REAL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS counts (start REAL, end REAL, tenant TEXT, intent TEXT, "
+                "topic_ok INTEGER, count INTEGER, latency_ms_sum REAL, dropped INTEGER)"
+            )
+        return self._db
+
+    def write(self, entries: List[Entry]) -> None:
+        self._rotate_if_needed()
+        db = self._connect()
+        with db:
+            db.executemany("INSERT INTO queries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", entries)
+
+    def write_counts(self, start: float, end: float, counts: Dict[Tuple[str, str, bool], List[float]], dropped: int) -> None:
+        db = self._connect()
+        with db:
+            db.executemany(
+                "INSERT INTO counts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(start, end, tenant, intent, topic_ok, int(n), total, dropped)
+                 for (tenant, intent, topic_ok), (n, total) in sorted(counts.items())],
+            )
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+SINKS = {"jsonl": JsonlSink, "sqlite": SqliteSink}
+
+
+class QueryLog:
+    """Bounded buffer of query entries and the background thread that flushes it."""
+
+    def __init__(
+        self,
+        sink: _Sink,
+        capacity: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        aggregate_interval: float = 60.0,
+    ) -> None:
+        self.sink = sink
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.aggregate_interval = aggregate_interval
+        self._buffer: Deque[Entry] = deque()
+        # Only the overflow path locks, to count what it had to throw away
+        self._drop_lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+        self._counts: Dict[Tuple[str, str, bool], List[float]] = {}
+        self._dropped_reported = 0
+        self._window_start = time.time()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def append(self, entry: Entry) -> None:
+        # The length check races with other appenders, so the buffer can run a
+        # few entries over capacity; it never blocks
+        if len(self._buffer) >= self.capacity:
+            with self._drop_lock:
+                self.dropped += 1
+            return
+        self._buffer.append(entry)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="query-log", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write out whatever is still buffered."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+        self._write_counts()
+        self.sink.close()
+
+    def flush(self) -> int:
+        written = 0
+        while self._buffer:
+            batch = []
+            buffer = self._buffer
+            while buffer and len(batch) < self.batch_size:
+                batch.append(buffer.popleft())
+            for ts, tenant, _, intent, _, topic_ok, _, latency_ms in batch:
+                bucket = self._counts.get((tenant, intent, topic_ok))
+                if bucket is None:
+                    bucket = self._counts[(tenant, intent, topic_ok)] = [0, 0.0]
+                bucket[0] += 1
+                bucket[1] += latency_ms
+            try:
+                self.sink.write(batch)
+            except Exception:
+                logger.exception("Writing %d query log entries failed; they are dropped", len(batch))
+                with self._drop_lock:
+                    self.dropped += len(batch)
+                continue
+            written += len(batch)
+        self.written += written
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        return {"buffered": len(self._buffer), "capacity": self.capacity, "written": self.written, "dropped": self.dropped}
+
+    def _write_counts(self) -> None:
+        now = time.time()
+        dropped = self.dropped - self._dropped_reported
+        if self._counts or dropped:
+            try:
+                self.sink.write_counts(self._window_start, now, self._counts, dropped)
+            except Exception:
+                logger.exception("Writing query counts failed")
+        self._counts = {}
+        self._dropped_reported += dropped
+        self._window_start = now
+
+    def _run(self) -> None:
+        next_aggregate = time.monotonic() + self.aggregate_interval
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+            if time.monotonic() >= next_aggregate:
+                self._write_counts()
+                next_aggregate = time.monotonic() + self.aggregate_interval
@@ -0,0 +1,127 @@
+"""Token-bucket rate limiting per API key and per client IP.
+
+Buckets live in a ``BucketStore``. The in-memory store is per process and is
+what the service uses by default; a shared store (Redis or similar) only has to
+implement ``take`` atomically to make the limits cluster-wide.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class BucketStore(ABC):
+    """Where token buckets live; a shared implementation (e.g. Redis) makes limits cluster-wide.
+
+    ``take`` must be atomic per key: refill the bucket for the time elapsed
+    since it was last touched (a new bucket starts full), then take ``cost``
+    tokens if that many are available.
+    """
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: float, now: float, cost: float = 1.0) -> float:
+        """Seconds until the request could succeed; 0.0 means it was allowed."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class InMemoryBucketStore(BucketStore):
+    """Process-local buckets in two generations.
+
+    Every ``idle_seconds`` the current generation becomes the previous one and
+    the old previous one is dropped wholesale; a bucket touched in between is
+    carried forward. With ``idle_seconds`` at least ``burst / rate`` a dropped
+    bucket had refilled completely, the same as having no bucket at all, so
+    eviction never loosens a limit and costs O(1). Reaching ``max_buckets``
+    rotates early, which may forget buckets that were still refilling.
+    """
+
+    def __init__(self, idle_seconds: float, max_buckets: int = 100_000) -> None:
+        self.idle_seconds = idle_seconds
+        self.max_buckets = max_buckets
+        # key -> [tokens, last update]
+        self._current: Dict[str, List[float]] = {}
+        self._previous: Dict[str, List[float]] = {}
+        self._rotate_at = 0.0
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, now: float, cost: float = 1.0) -> float:
+        with self._lock:
+            if now >= self._rotate_at or len(self._current) >= self.max_buckets:
+                self._previous = self._current
+                self._current = {}
+                self._rotate_at = now + self.idle_seconds
+            bucket = self._current.get(key)
+            if bucket is None:
+                bucket = self._previous.pop(key, None) or [burst, now]
+                self._current[key] = bucket
+            tokens = bucket[0] + (now - bucket[1]) * rate
+            if tokens > burst:
+                tokens = burst
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return 0.0
+            bucket[0] = tokens
+            return (cost - tokens) / rate
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._current) + len(self._previous)
+
+
+class RateLimiter:
+    """Token buckets per API key and per client IP.
+
+    Each limit allows ``rate`` requests per second with bursts of up to
+    ``burst``; a rate of 0 turns that limit off. Stores default to process-local
+    ones sized so idle buckets are evicted once they are full again.
+    """
+
+    def __init__(
+        self,
+        key_rate: float,
+        key_burst: float,
+        ip_rate: float,
+        ip_burst: float,
+        key_store: Optional[BucketStore] = None,
+        ip_store: Optional[BucketStore] = None,
+        max_buckets: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.key_rate, self.key_burst = key_rate, max(key_burst, 1.0)
+        self.ip_rate, self.ip_burst = ip_rate, max(ip_burst, 1.0)
+        self.key_store = key_store if key_store is not None else self._default_store(key_rate, self.key_burst, max_buckets)
+        self.ip_store = ip_store if ip_store is not None else self._default_store(ip_rate, self.ip_burst, max_buckets)
+        self._clock = clock
+
+    @staticmethod
+    def _default_store(rate: float, burst: float, max_buckets: int) -> Optional[BucketStore]:
+        return InMemoryBucketStore(burst / rate, max_buckets) if rate > 0 else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.key_rate > 0 or self.ip_rate > 0
+
+    def check(self, api_key: Optional[str], client_ip: Optional[str]) -> Tuple[float, str]:
+        """(seconds to wait, "key" or "ip"); (0.0, "") when the request may proceed."""
+        now = self._clock()
+        # IP first: keys are whatever the client sends, so one minting a key per
+        # request is stopped here before its keys crowd others out of key_store
+        if client_ip and self.ip_rate > 0:
+            wait = self.ip_store.take(client_ip, self.ip_rate, self.ip_burst, now)
+            if wait:
+                return wait, "ip"
+        if api_key and self.key_rate > 0:
+            wait = self.key_store.take(api_key, self.key_rate, self.key_burst, now)
+            if wait:
+                return wait, "key"
+        return 0.0, ""
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "key_buckets": len(self.key_store) if self.key_store is not None else 0,
+            "ip_buckets": len(self.ip_store) if self.ip_store is not None else 0,
+        }
@@ -0,0 +1,109 @@
+import math
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, Iterable, List, Tuple
+
+from .matcher import normalize_text
+
+# Function words that would otherwise match half the knowledge base
+STOPWORDS = frozenset("""
+yang dan di ke dari untuk dengan atau ini itu apa apakah ada saya aku kamu kak kakak ya dong sih
+gimana bagaimana mau tanya nanya bisa boleh juga dalam pada oleh akan sudah masih jika kalau
+seperti serta tidak the a an of to is are what how
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    # Bare numbers ("1", "2025", "10") appear everywhere and carry no topic
+    return [t for t in normalize_text(text).split() if t not in STOPWORDS and not t.isdigit()]
+
+
+@dataclass(frozen=True)
+class Passage:
+    section: str
+    text: str
+
+
+class BM25Index:
+    """Inverted index with Okapi BM25 scoring over short knowledge base passages."""
+
+    def __init__(self, passages: Iterable[Passage], k1: float = 1.5, b: float = 0.75) -> None:
+        self.passages: List[Passage] = list(passages)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+
+        lengths = []
+        term_freqs = []
+        for passage in self.passages:
+            tokens = tokenize(passage.text)
+            lengths.append(len(tokens))
+            tf: Dict[str, int] = {}
+            for token in tokens:
+                tf[token] = tf.get(token, 0) + 1
+            term_freqs.append(tf)
+
+        n = len(self.passages)
+        avgdl = (sum(lengths) / n) if n else 0.0
+        for doc_id, tf in enumerate(term_freqs):
+            norm = k1 * (1 - b + b * lengths[doc_id] / avgdl) if avgdl else k1
+            for term, freq in tf.items():
+                # Store the tf part of the score so a lookup is a multiply-add per posting
+                self._postings.setdefault(term, []).append((doc_id, freq * (k1 + 1) / (freq + norm)))
+        self._idf = {
+            term: math.log((n - len(posting) + 0.5) / (len(posting) + 0.5) + 1)
+            for term, posting in self._postings.items()
+        }
+
+    def covers(self, text: str, min_idf: float, known: Collection[str] = ()) -> bool:
+        """Whether every content word of text is in some passage or in known, and one has idf >= min_idf."""
+        rare = False
+        for term in tokenize(text):
+            idf = self._idf.get(term)
+            if idf is None:
+                if term not in known:
+                    return False
+            elif idf >= min_idf:
+                rare = True
+        return rare
+
+    def search(self, tokens: Iterable[str], k: int, min_score: float = 0.0) -> List[Tuple[float, Passage]]:
+        """Top k passages scoring at least min_score."""
+        scores: Dict[int, float] = {}
+        for term in set(tokens):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            idf = self._idf[term]
+            for doc_id, weight in posting:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * weight
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:k]
+        return [(score, self.passages[doc_id]) for doc_id, score in ranked if score >= min_score]
+
+
+# Summaries and notes restate items found elsewhere; indexed, they would outrank the full text
+SUMMARY_KEYS = frozenset({"ringkasan", "punishment_ringkasan", "catatan"})
+
+
+def knowledge_passages(ormik_data: Dict[str, Any]) -> List[Passage]:
+    """Every leaf item in ormik_data with a readable section header, summaries left out."""
+    passages: List[Passage] = []
+
+    def title(key: str) -> str:
+        return key.replace("_", " ").title().replace("Ormik", "ORMIK")
+
+    def walk(node: Any, path: List[str]) -> None:
+        if isinstance(node, dict):
+            if "description" in node and "name" in node:
+                passages.append(Passage(" › ".join(path[:-1] + [node["name"]]), node["description"]))
+                return
+            for key, value in node.items():
+                if key not in SUMMARY_KEYS:
+                    walk(value, path + [title(key)])
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, path)
+        elif isinstance(node, str):
+            passages.append(Passage(" › ".join(path), node))
+
+    walk(ormik_data, [])
+    return passages
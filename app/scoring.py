@@ -0,0 +1,150 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from .analysis import QueryAnalysis
+
+# Output column holding the keyword confidence next to the intent scores
+CONFIDENCE = "confidence"
+
+
+@dataclass(frozen=True)
+class ContextRule:
+    """Boost ``target`` when one of ``intents`` matched and the query gives context for it.
+
+    Context is any of ``words`` as a whole word, or any of ``phrases`` as a
+    substring of the normalized query.
+    """
+
+    target: str
+    intents: Tuple[str, ...]
+    words: Tuple[str, ...]
+    phrases: Tuple[str, ...] = ()
+
+    def applies(self, analysis: QueryAnalysis) -> bool:
+        return analysis.has_whole_word(self.words) or any(p in analysis.normalized for p in self.phrases)
+
+
+@dataclass
+class IntentScores:
+    # (intent, score) for every intent scoring above zero, best first
+    ranked: List[Tuple[str, float]] = field(default_factory=list)
+    confidence: float = 0.0
+
+    @property
+    def intent(self) -> Optional[str]:
+        return self.ranked[0][0] if self.ranked else None
+
+
+class IntentScorer:
+    """Scores every intent and the keyword confidence with one sparse product.
+
+    A query becomes a sparse binary feature vector:
+
+    * ``intent:<name>``       the intent's keywords hit, exactly or through a typo
+    * ``rule:<n>:<target>``   context rule n applies (only checked when one of its intents hit)
+    * ``<group>:<keyword>``   a confidence keyword hit
+
+    and is multiplied with a sparse weight matrix whose columns are the intents
+    plus ``confidence``. The default weights reproduce the hand-written
+    resolution: the first context rule that applies wins, otherwise the
+    matched intent earliest in ``priority``; confidence adds each group's
+    weight per keyword hit, capped at 1.0. Pass ``weights`` to override
+    single cells, keyed by (feature name, column name).
+    """
+
+    def __init__(
+        self,
+        intents: Mapping[str, Sequence[str]],
+        priority: Sequence[str],
+        rules: Sequence[ContextRule],
+        confidence: Sequence[Tuple[str, Sequence[str], float]],
+        weights: Optional[Mapping[Tuple[str, str], float]] = None,
+    ) -> None:
+        if set(priority) != set(intents):
+            raise ValueError("priority must list every intent exactly once")
+        self.columns: List[str] = [*priority, CONFIDENCE]
+        column = {name: i for i, name in enumerate(self.columns)}
+        self.rules = tuple(rules)
+        self.feature_names: List[str] = []
+        cells: List[Dict[int, float]] = []
+
+        def add(name: str, col: str, weight: float) -> int:
+            fid = len(self.feature_names)
+            self.feature_names.append(name)
+            cells.append({column[col]: weight})
+            return fid
+
+        # Priority tier: 1..len(priority); every rule tier outweighs all of it and
+        # every later rule, so the ordering never depends on a sum of tiers
+        tier = len(priority) + 1
+        self._intent_feature: Dict[str, int] = {
+            name: add(f"intent:{name}", name, len(priority) - rank) for rank, name in enumerate(priority)
+        }
+        self._rule_feature = [
+            add(f"rule:{n}:{rule.target}", rule.target, tier * (len(self.rules) - n)) for n, rule in enumerate(self.rules)
+        ]
+        # Confidence features are numbered in keyword order, so the sum adds up in that order
+        self._confidence_features: Dict[str, Dict[str, int]] = {}
+        for group, keywords, weight in confidence:
+            features = self._confidence_features.setdefault(group, {})
+            for keyword in keywords:
+                if keyword in features:
+                    cells[features[keyword]][column[CONFIDENCE]] += weight
+                else:
+                    features[keyword] = add(f"{group}:{keyword}", CONFIDENCE, weight)
+
+        if weights:
+            index = {name: fid for fid, name in enumerate(self.feature_names)}
+            for (feature, col), weight in weights.items():
+                cells[index[feature]][column[col]] = weight
+        self._rows: List[Tuple[Tuple[int, float], ...]] = [tuple(row.items()) for row in cells]
+
+        # A typo of a keyword lights up every feature that keyword belongs to
+        self._fuzzy_features: Dict[str, Set[int]] = {}
+        for name, keywords in intents.items():
+            for keyword in keywords:
+                self._fuzzy_features.setdefault(keyword, set()).add(self._intent_feature[name])
+        for features in self._confidence_features.values():
+            for keyword, fid in features.items():
+                self._fuzzy_features.setdefault(keyword, set()).add(fid)
+
+    def features(self, analysis: QueryAnalysis) -> List[int]:
+        """Ids of the features active for this query, in ascending order."""
+        active: Set[int] = set()
+        for group, found in analysis.hits.items():
+            fid = self._intent_feature.get(group)
+            if fid is not None and found:
+                active.add(fid)
+            keyword_features = self._confidence_features.get(group)
+            if keyword_features:
+                active.update(keyword_features[k] for k in found if k in keyword_features)
+        for keyword in analysis.fuzzy:
+            fids = self._fuzzy_features.get(keyword)
+            if fids:
+                active |= fids
+
+        # Intent features are numbered like their columns
+        matched = {self.columns[fid] for fid in active if fid < len(self._intent_feature)}
+        if matched:
+            for rule, fid in zip(self.rules, self._rule_feature):
+                if not matched.isdisjoint(rule.intents) and rule.applies(analysis):
+                    active.add(fid)
+        return sorted(active)
+
+    def score(self, analysis: QueryAnalysis) -> IntentScores:
+        scores = [0.0] * len(self.columns)
+        rows = self._rows
+        for fid in self.features(analysis):
+            for col, weight in rows[fid]:
+                scores[col] += weight
+        confidence = min(scores.pop(), 1.0)
+        # Stable sort: ties keep priority order
+        ranked = sorted(
+            ((name, score) for name, score in zip(self.columns, scores) if score > 0),
+            key=lambda item: -item[1],
+        )
+        return IntentScores(ranked, confidence)
+
+    def explain(self, analysis: QueryAnalysis) -> List[str]:
+        """Names of the active features, for tuning and debugging."""
+        return [self.feature_names[fid] for fid in self.features(analysis)]
@@ -0,0 +1,34 @@
+"""JSON encoding for response bodies.
+
+Uses orjson when it is installed and the standard library otherwise; both
+produce compact UTF-8 JSON.
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def chat_response_json(answer_json: bytes, confidence: float, topic_ok: bool, truncated: bool, degraded: bool) -> bytes:
+    """A ChatResponse body around an answer that is already a JSON string.
+
+    Fields are in ChatResponse order, so the bytes match what the model would
+    serialize to.
+    """
+    return b"".join((
+        b'{"answer":', answer_json,
+        b',"confidence":', dumps(confidence),
+        b',"topic_ok":', b"true" if topic_ok else b"false",
+        b',"truncated":', b"true" if truncated else b"false",
+        b',"degraded":', b"true" if degraded else b"false",
+        b"}",
+    ))
@@ -0,0 +1,153 @@
+"""Prefork server: build the agent once, then fork uvicorn workers that share it.
+
+The parent imports the app (building the agent or loading its snapshot), warms
+it up, opens the listening socket and calls ``gc.freeze()`` before forking, so
+the knowledge base, indexes and rendered answers sit in pages every worker
+shares copy-on-write. The collector never scans frozen objects, so it doesn't
+write to their headers and unshare the pages. Reference count updates still
+touch the objects a request reads, which is why each worker reports its memory
+(RSS/PSS/shared/private) at startup and in ``/metrics``.
+
+    python -m app.serve --workers 4 --host 0.0.0.0 --port 6969
+    python -m app.serve --forwarded-allow-ips 10.0.0.5   # behind a proxy at 10.0.0.5
+
+Workers that exit unexpectedly are replaced; SIGINT/SIGTERM stop them all.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+logger = logging.getLogger("app.serve")
+
+# Memory of every worker is logged once this long after they start
+REPORT_DELAY = 5.0
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, config: "uvicorn.Config") -> None:
+    # Undo the parent's supervisor handlers; uvicorn installs its own
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_DFL)
+    gc.enable()
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, sock: socket.socket, config: "uvicorn.Config", args: argparse.Namespace) -> None:
+        self.sock = sock
+        self.config = config
+        self.args = args
+        self.workers: Dict[int, int] = {}  # pid -> worker slot
+        self.stopping = False
+
+    def spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(self.sock, self.config)
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = slot
+
+    def stop(self, signum: int, frame: object) -> None:
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def report(self) -> None:
+        from .metrics import format_memory, process_memory
+
+        logger.info("Parent %d: %s", os.getpid(), format_memory(process_memory()))
+        for pid, slot in sorted(self.workers.items(), key=lambda item: item[1]):
+            logger.info("Worker %d (pid %d): %s", slot, pid, format_memory(process_memory(pid)))
+
+    def run(self) -> int:
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        for slot in range(self.args.workers):
+            self.spawn(slot)
+        report_at: Optional[float] = time.monotonic() + REPORT_DELAY
+
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if report_at is not None and time.monotonic() >= report_at:
+                    self.report()
+                    report_at = None
+                time.sleep(0.2)
+                continue
+            slot = self.workers.pop(pid, None)
+            if slot is None or self.stopping:
+                continue
+            logger.warning("Worker %d (pid %d) exited with status %d, restarting", slot, pid, os.waitstatus_to_exitcode(status))
+            self.spawn(slot)
+        return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .config import FORWARDED_ALLOW_IPS, PROXY_HEADERS, WORKERS
+
+    parser = argparse.ArgumentParser(description="Run ZEERO Agent with prefork workers sharing one built agent.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="worker processes (default: $ZEERO_WORKERS or 1)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=6969)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    parser.add_argument("--forwarded-allow-ips", default=FORWARDED_ALLOW_IPS,
+                        help="proxies whose X-Forwarded-For is trusted, comma-separated or * (default: $ZEERO_FORWARDED_ALLOW_IPS or 127.0.0.1)")
+    parser.add_argument("--no-proxy-headers", dest="proxy_headers", action="store_false", default=PROXY_HEADERS,
+                        help="ignore X-Forwarded-For/-Proto even from trusted proxies")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    # Nothing allocated while building the agent needs collecting before the freeze
+    gc.disable()
+    from . import main as service
+
+    service.warm_up_agent()
+    # Loading the config here imports the event loop and HTTP protocol modules once, pre-fork
+    config = uvicorn.Config(
+        service.app, log_level=args.log_level, access_log=args.access_log,
+        proxy_headers=args.proxy_headers, forwarded_allow_ips=args.forwarded_allow_ips,
+    )
+    config.load()
+    sock = _bind(args.host, args.port, args.backlog)
+    gc.collect()
+    gc.freeze()
+    logger.info("Forking %d workers on %s:%d (%d objects frozen)", args.workers, args.host, args.port, gc.get_freeze_count())
+    return Supervisor(sock, config, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Prebuilt agent snapshots for fast cold starts.
+
+A snapshot is a pickled, fully built ZEEROAgent (knowledge base, keyword
+automaton, fuzzy index, BM25 index and pre-rendered answers) behind a small
+header. The header carries a fingerprint of everything the build depends on
+(source code, knowledge base bytes, build settings), and a snapshot whose
+fingerprint doesn't match is ignored, so a stale artifact can never serve
+answers for a different knowledge base or code version.
+
+Build one (the Dockerfile does this at image build time):
+
+    python -m app.snapshot build [PATH]
+"""
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import sys
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+_MAGIC = b"ZEERO-SNAPSHOT"
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def fingerprint(knowledge_base_path: str, settings: Iterable[Any]) -> str:
+    """Hash of the app source, the knowledge base file and the build settings."""
+    digest = hashlib.sha256(f"format={SNAPSHOT_FORMAT}\0".encode())
+    for name in sorted(os.listdir(_APP_DIR)):
+        if name.endswith(".py"):
+            with open(os.path.join(_APP_DIR, name), "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read() + b"\0")
+    with open(knowledge_base_path, "rb") as f:
+        digest.update(f.read())
+    digest.update(repr(tuple(settings)).encode())
+    return digest.hexdigest()
+
+
+def save_snapshot(obj: Any, path: str, fp: str) -> None:
+    # Write next to the target and rename, so a reader never sees half a file
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_MAGIC + b"\n" + fp.encode() + b"\n")
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: str, fp: str) -> Optional[Any]:
+    """The pickled object, or None when the file is missing, unreadable or stale."""
+    try:
+        with open(path, "rb") as f:
+            magic = f.readline().rstrip(b"\n")
+            stored = f.readline().rstrip(b"\n").decode()
+            if magic != _MAGIC:
+                logger.warning("%s is not an agent snapshot, building the agent instead", path)
+                return None
+            if stored != fp:
+                logger.warning("Agent snapshot %s is stale, building the agent instead", path)
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.exception("Agent snapshot %s could not be loaded, building the agent instead", path)
+        return None
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build a prebuilt ZEERO agent snapshot.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build the agent and write the snapshot")
+    build.add_argument("path", nargs="?", help="output file (default: $ZEERO_SNAPSHOT)")
+    args = parser.parse_args(argv)
+
+    from .config import SNAPSHOT_PATH
+    from .main import ZEEROAgent, snapshot_fingerprint
+
+    path = args.path or SNAPSHOT_PATH
+    if not path:
+        parser.error("no output path: pass one or set ZEERO_SNAPSHOT")
+    agent = ZEEROAgent()
+    save_snapshot(agent, path, snapshot_fingerprint())
+    print(f"agent snapshot for knowledge base {agent.version} written to {path} ({os.path.getsize(path)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+import json
+from typing import Any, Dict, List
+
+
+def split_markdown(text: str, max_chars: int) -> List[str]:
+    """Split markdown into chunks of whole lines, each at most max_chars long.
+
+    Lines are never cut, so bold/italic spans, links and list items always
+    arrive complete; a single line longer than max_chars becomes its own chunk.
+    Joining the chunks gives back the original text.
+    """
+    chunks: List[str] = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        if current and len(current) + len(line) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    # JSON keeps newlines inside the payload out of the SSE framing
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
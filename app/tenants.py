@@ -0,0 +1,244 @@
+"""Per-tenant agents built on demand and evicted under a memory budget.
+
+A tenant is an event or campus with its own knowledge base file,
+``<directory>/<tenant>.json`` (same schema as the default one). Its agent --
+indexes and pre-rendered answers -- is built the first time a request names
+the tenant, and the least recently used tenants are dropped once the loaded
+ones together go over the memory budget. A dropped tenant is simply rebuilt
+on its next request, which also picks up edits to its file. A tenant whose
+file can't be loaded or built from is reported unavailable, and not tried
+again for ``retry_after`` seconds.
+
+The default tenant is the process-wide agent from ``app.main``; it is always
+loaded, never evicted and not counted against the budget.
+"""
+import gc
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .knowledge import load_knowledge_base
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+# Tenant ids double as file names, so keep them to a safe alphabet
+TENANT_ID = re.compile(r"[a-z0-9][a-z0-9_-]{0,63}")
+BUILD_RETRY_SECONDS = 30.0
+
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+class TenantNotFound(LookupError):
+    pass
+
+
+class TenantUnavailable(RuntimeError):
+    def __init__(self, tenant: str, retry_after: float) -> None:
+        super().__init__(tenant)
+        self.retry_after = retry_after
+
+
+def deep_size(obj: Any, exclude: Iterable[Any] = ()) -> int:
+    """Bytes held by obj and everything it references (classes, modules, functions and exclude left out)."""
+    seen = {id(item) for item in exclude}
+    total = 0
+    pending = [obj]
+    while pending:
+        batch = []
+        for item in pending:
+            if id(item) in seen or isinstance(item, _SKIP_TYPES):
+                continue
+            seen.add(id(item))
+            total += sys.getsizeof(item, 0)
+            batch.append(item)
+        pending = gc.get_referents(*batch)
+    return total
+
+
+class _Tenant:
+    __slots__ = ("agent", "size", "build_ms", "last_used", "requests", "seconds")
+
+    def __init__(self, agent: Any, size: int, build_ms: float) -> None:
+        self.agent = agent
+        self.size = size
+        self.build_ms = build_ms
+        self.last_used = time.monotonic()
+        self.requests = 0
+        self.seconds = 0.0
+
+
+class TenantRegistry:
+    """Thread-safe map of tenant id to agent, built lazily, LRU-evicted by estimated size.
+
+    ``factory(tenant, kb)`` builds an agent from a KnowledgeBase; ``default`` returns the
+    current default agent (read on every call, so reloads are seen at once).
+    Sizes are measured once, right after the build, and leave out what the
+    response cache collects afterwards as well as the ``shared`` objects all
+    agents hold (metrics, query log).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        memory_budget: int,
+        factory: Callable[[str, Any], Any],
+        default: Callable[[], Any],
+        shared: Iterable[Any] = (),
+        retry_after: float = BUILD_RETRY_SECONDS,
+    ) -> None:
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self._factory = factory
+        self._default = default
+        self._shared = tuple(shared)
+        self.retry_after = retry_after
+        self._tenants: "OrderedDict[str, _Tenant]" = OrderedDict()
+        # tenant -> (monotonic time of the next attempt, error) for failed builds
+        self._failed: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        # Builds are serialized so a burst of first requests builds a tenant once
+        self._build_lock = threading.Lock()
+        self.builds = 0
+        self.evictions = 0
+        self._default_requests = 0
+        self._default_seconds = 0.0
+
+    def get(self, tenant: str) -> Any:
+        """The tenant's agent, building it first if needed; raises TenantNotFound or TenantUnavailable."""
+        if tenant == DEFAULT_TENANT:
+            return self._default()
+        entry = self._touch(tenant)
+        if entry is not None:
+            return entry.agent
+        self._check_failed(tenant)
+        with self._build_lock:
+            entry = self._touch(tenant)
+            if entry is None:
+                # Requests queued behind a failing build don't repeat it
+                self._check_failed(tenant)
+                entry = self._build(tenant)
+        return entry.agent
+
+    def loaded(self, tenant: str) -> Optional[Any]:
+        """The tenant's agent if it is in memory, without building it."""
+        if tenant == DEFAULT_TENANT:
+            return self._default()
+        entry = self._touch(tenant)
+        return entry.agent if entry is not None else None
+
+    def evict(self, tenant: str) -> bool:
+        """Drop the tenant and forget a failed build, so its next request loads the file again."""
+        with self._lock:
+            self._failed.pop(tenant, None)
+            return self._tenants.pop(tenant, None) is not None
+
+    def observe(self, tenant: str, seconds: float) -> None:
+        with self._lock:
+            if tenant == DEFAULT_TENANT:
+                self._default_requests += 1
+                self._default_seconds += seconds
+                return
+            entry = self._tenants.get(tenant)
+            if entry is not None:
+                entry.requests += 1
+                entry.seconds += seconds
+
+    def memory_used(self) -> int:
+        with self._lock:
+            return sum(entry.size for entry in self._tenants.values())
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            tenants = {
+                DEFAULT_TENANT: {
+                    "version": self._default().version,
+                    "pinned": True,
+                    "requests": self._default_requests,
+                    "mean_ms": self._mean_ms(self._default_requests, self._default_seconds),
+                },
+            }
+            for name, entry in self._tenants.items():
+                tenants[name] = {
+                    "version": entry.agent.version,
+                    "pinned": False,
+                    "size_bytes": entry.size,
+                    "build_ms": entry.build_ms,
+                    "idle_seconds": round(now - entry.last_used, 1),
+                    "requests": entry.requests,
+                    "mean_ms": self._mean_ms(entry.requests, entry.seconds),
+                }
+            used = sum(entry.size for entry in self._tenants.values())
+            unavailable = {
+                name: {"error": error, "retry_in_seconds": round(max(0.0, until - now), 1)}
+                for name, (until, error) in self._failed.items()
+            }
+        return {
+            "memory_budget_bytes": self.memory_budget,
+            "memory_used_bytes": used,
+            "builds": self.builds,
+            "evictions": self.evictions,
+            "tenants": tenants,
+            "unavailable": unavailable,
+        }
+
+    @staticmethod
+    def _mean_ms(requests: int, seconds: float) -> float:
+        return round(seconds / requests * 1000, 3) if requests else 0.0
+
+    def _touch(self, tenant: str) -> Optional[_Tenant]:
+        with self._lock:
+            entry = self._tenants.get(tenant)
+            if entry is not None:
+                self._tenants.move_to_end(tenant)
+                entry.last_used = time.monotonic()
+            return entry
+
+    def _check_failed(self, tenant: str) -> None:
+        with self._lock:
+            failed = self._failed.get(tenant)
+            if failed is None:
+                return
+            wait = failed[0] - time.monotonic()
+            if wait <= 0:
+                del self._failed[tenant]
+                return
+        raise TenantUnavailable(tenant, wait)
+
+    def _build(self, tenant: str) -> _Tenant:
+        if not self.directory or not TENANT_ID.fullmatch(tenant):
+            raise TenantNotFound(tenant)
+        path = os.path.join(self.directory, f"{tenant}.json")
+        started = time.perf_counter()
+        try:
+            kb = load_knowledge_base(path)
+            agent = self._factory(tenant, kb)
+        except FileNotFoundError:
+            raise TenantNotFound(tenant) from None
+        except (OSError, ValueError, KeyError) as e:
+            # unreadable file, invalid JSON, schema violation or content the agent can't be built from
+            logger.error("Building tenant %s from %s failed, retrying in %.0fs: %r", tenant, path, self.retry_after, e)
+            with self._lock:
+                self._failed[tenant] = (time.monotonic() + self.retry_after, repr(e))
+            raise TenantUnavailable(tenant, self.retry_after) from e
+        build_ms = round((time.perf_counter() - started) * 1000, 1)
+        entry = _Tenant(agent, deep_size(agent, self._shared), build_ms)
+        with self._lock:
+            self._tenants[tenant] = entry
+            self.builds += 1
+            # Oldest first; the tenant just built stays even if it alone is over budget
+            while len(self._tenants) > 1 and sum(e.size for e in self._tenants.values()) > self.memory_budget:
+                evicted, old = self._tenants.popitem(last=False)
+                self.evictions += 1
+                logger.info("Evicted tenant %s (%.1f MiB, idle %.0fs)", evicted, old.size / 1048576,
+                            time.monotonic() - old.last_used)
+        logger.info("Built tenant %s (knowledge base %s, %.1f MiB) in %.0f ms", tenant, agent.version,
+                    entry.size / 1048576, build_ms)
+        return entry
@@ -0,0 +1,152 @@
+"""Chat over one WebSocket per browser session: many queries, answered as they finish.
+
+Each text frame from the client is ``{"id": ..., "query": "..."}``; the id is a
+string or 64-bit integer chosen by the client and echoed back verbatim. Replies are
+``{"id": ..., "response": {...}}`` with the same fields as ``POST /v1/chat``,
+or ``{"id": ..., "error": {"status": ..., "detail": ...}}``. Every query runs
+as its own task, so a slow one (say, the first request to a tenant that still
+has to be built) doesn't hold up the ones behind it, and replies can arrive
+in a different order than the queries were sent.
+
+Backpressure is per connection: once ``max_in_flight`` queries are waiting
+for an answer or for their reply to be sent, the socket isn't read until one
+finishes. A client that sends faster than it reads therefore fills the TCP
+window instead of the server's memory. A connection that sends nothing for
+``idle_timeout`` seconds is closed with code 1000.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from fastapi import HTTPException, WebSocket
+from starlette.websockets import WebSocketDisconnect
+
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+MAX_ID_CHARS = 128
+# Integer ids must fit in a signed 64-bit int, the most orjson will encode
+MIN_INT_ID, MAX_INT_ID = -(2 ** 63), 2 ** 63 - 1
+IDLE_CLOSE_CODE = 1000
+
+# query -> serialized ChatResponse body; raises HTTPException to answer with an error frame
+Answer = Callable[[str], Awaitable[bytes]]
+
+
+class BadFrame(ValueError):
+    def __init__(self, detail: str, request_id: Any = None) -> None:
+        super().__init__(detail)
+        self.request_id = request_id
+
+
+def parse_frame(text: str) -> Tuple[Any, str]:
+    """(id, query) from a client frame; raises BadFrame."""
+    try:
+        frame = json.loads(text)
+    except ValueError:
+        raise BadFrame("Frame is not valid JSON") from None
+    if not isinstance(frame, dict):
+        raise BadFrame("Frame must be a JSON object")
+    request_id = frame.get("id")
+    valid_id = (
+        isinstance(request_id, str) and len(request_id) <= MAX_ID_CHARS
+        or isinstance(request_id, int) and not isinstance(request_id, bool) and MIN_INT_ID <= request_id <= MAX_INT_ID
+    )
+    if not valid_id:
+        raise BadFrame(f"id must be a string of at most {MAX_ID_CHARS} characters or a 64-bit integer")
+    query = frame.get("query")
+    if not isinstance(query, str):
+        raise BadFrame("query must be a string", request_id)
+    return request_id, query
+
+
+def reply_frame(request_id: Any, body: bytes) -> str:
+    # The body is already JSON, so it is spliced in rather than parsed and dumped again
+    return (b'{"id":' + dumps(request_id) + b',"response":' + body + b"}").decode()
+
+
+def error_frame(request_id: Any, status: int, detail: str, retry_after: Optional[str] = None) -> str:
+    error = {"status": status, "detail": detail}
+    if retry_after is not None:
+        error["retry_after"] = int(retry_after)
+    return dumps({"id": request_id, "error": error}).decode()
+
+
+class ChatSockets:
+    """Serves chat WebSocket connections and counts them."""
+
+    def __init__(self, idle_timeout: float, max_in_flight: int) -> None:
+        self.idle_timeout = idle_timeout
+        self.max_in_flight = max(1, max_in_flight)
+        self.open = 0
+        self.messages = 0
+        self.idle_closed = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"open": self.open, "messages": self.messages, "idle_closed": self.idle_closed}
+
+    async def serve(self, websocket: WebSocket, answer: Answer) -> None:
+        await websocket.accept()
+        self.open += 1
+        slots = asyncio.Semaphore(self.max_in_flight)
+        # Replies from concurrent tasks must not interleave on the wire
+        send_lock = asyncio.Lock()
+        tasks: Set[asyncio.Task] = set()
+
+        async def send(text: str) -> None:
+            async with send_lock:
+                await websocket.send_text(text)
+
+        async def handle(request_id: Any, query: str) -> None:
+            try:
+                try:
+                    frame = reply_frame(request_id, await answer(query))
+                except HTTPException as exc:
+                    frame = error_frame(request_id, exc.status_code, str(exc.detail), (exc.headers or {}).get("Retry-After"))
+                except Exception:
+                    logger.exception("WebSocket query failed")
+                    frame = error_frame(request_id, 500, "Internal error")
+                await send(frame)
+            except (WebSocketDisconnect, RuntimeError):
+                # The client went away while the answer was being computed
+                pass
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    message = await asyncio.wait_for(websocket.receive(), self.idle_timeout or None)
+                except asyncio.TimeoutError:
+                    slots.release()
+                    self.idle_closed += 1
+                    await websocket.close(code=IDLE_CLOSE_CODE, reason="Idle timeout")
+                    return
+                if message["type"] == "websocket.disconnect":
+                    slots.release()
+                    return
+                self.messages += 1
+                text = message.get("text")
+                if text is None:
+                    text = (message.get("bytes") or b"").decode("utf-8", "replace")
+                try:
+                    request_id, query = parse_frame(text)
+                except BadFrame as exc:
+                    slots.release()
+                    await send(error_frame(exc.request_id, 400, str(exc)))
+                    continue
+                task = asyncio.ensure_future(handle(request_id, query))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.open -= 1
+            pending = list(tasks)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
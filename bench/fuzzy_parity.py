@@ -0,0 +1,86 @@
+"""Check the typo index against a brute-force difflib scan.
+
+For every distinct query word in the corpus, plus with ``--typos`` each of its
+one-character deletions, transpositions and doublings, ``FuzzyIndex.lookup``
+must return exactly the keywords whose ``SequenceMatcher`` ratio against the
+word reaches the threshold, as the original per-keyword scan computed it.
+Exits 1 on any difference.
+
+    python -m bench.fuzzy_parity
+    python -m bench.fuzzy_parity --typos --threshold 0.75
+"""
+import argparse
+import sys
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set
+
+from app.config import FUZZY_MAX_DISTANCE
+from app.fuzzy import FuzzyIndex
+from app.main import ZEEROAgent, normalize_text
+from bench.run import CORPUS_PATH, load_corpus
+
+
+def corpus_words(path: str) -> Set[str]:
+    # Only words longer than three characters get a typo lookup
+    return {w for row in load_corpus(path) for w in normalize_text(row["query"]).split() if len(w) > 3}
+
+
+def typos(word: str) -> Set[str]:
+    found = {word[:i] + word[i + 1:] for i in range(len(word))}
+    found |= {word[:i] + word[i + 1] + word[i] + word[i + 2:] for i in range(len(word) - 1)}
+    found |= {word[:i] + word[i] + word[i:] for i in range(len(word))}
+    return {t for t in found if len(t) > 3}
+
+
+def brute_force(words: List[str], keywords: List[str], threshold: float) -> Dict[str, Set[str]]:
+    """word -> keywords, the way get_close_matches scores them (the quick ratios bound ratio())."""
+    found: Dict[str, Set[str]] = {word: set() for word in words}
+    matcher = SequenceMatcher()
+    for keyword in keywords:
+        # seq2 is the side SequenceMatcher indexes, so each keyword is indexed once
+        matcher.set_seq2(keyword.lower().strip())
+        for word in words:
+            matcher.set_seq1(word)
+            if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold:
+                found[word].add(keyword)
+    return found
+
+
+def check(words: Set[str], keywords: List[str], threshold: float, max_distance: int) -> Dict[str, tuple]:
+    """word -> (index result, brute-force result) for every word where they differ."""
+    index = FuzzyIndex(keywords, threshold=threshold, max_distance=max_distance)
+    ordered = sorted(words)
+    scanned = brute_force(ordered, keywords, threshold)
+    mismatches = {}
+    for word in ordered:
+        found, expected = index.lookup(word), frozenset(scanned[word])
+        if found != expected:
+            mismatches[word] = (found, expected)
+    return mismatches
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--threshold", type=float, default=None, help="similarity threshold (default: the agent's)")
+    parser.add_argument("--max-distance", type=int, default=FUZZY_MAX_DISTANCE)
+    parser.add_argument("--typos", action="store_true", help="also check typos of each corpus word")
+    args = parser.parse_args(argv)
+
+    agent = ZEEROAgent(cache_size=0)
+    threshold = agent.fuzzy_threshold if args.threshold is None else args.threshold
+    keywords = sorted(k for forms in agent.fuzzy_index._forms.values() for k in forms)
+    words = corpus_words(args.corpus)
+    if args.typos:
+        words |= {t for w in words for t in typos(w)}
+
+    mismatches = check(words, keywords, threshold, args.max_distance)
+    print(f"fuzzy parity: {len(words)} words x {len(keywords)} keywords, threshold {threshold}, "
+          f"max distance {args.max_distance}: {len(mismatches)} mismatches")
+    for word, (found, expected) in list(mismatches.items())[:20]:
+        print(f"  {word!r}: missing {sorted(expected - found)}, extra {sorted(found - expected)}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
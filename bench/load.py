@@ -0,0 +1,338 @@
+"""Open-loop load test of a locally started ZEERO server.
+
+Starts ``python -m app.serve`` on a free local port for each worker count,
+then sends POST /v1/chat at fixed target rates over a pool of keep-alive
+connections. Arrivals are open loop: request i is due at ``i / rate`` seconds
+whatever happened to earlier requests, and its latency is measured from that
+due time, so queueing in the client or the server shows up in the numbers
+instead of silently lowering the offered load.
+
+Queries are drawn from the bench corpus with an ORMIK-day mix: mostly jadwal,
+dress code, tugas and lokasi questions, plus other intents, typos and
+off-topic chatter (see MIX).
+
+For every (workers, connections) pair the rate doubles from --start-rate until
+a step misses the budget: p99 over --p99-budget-ms, errors, or throughput
+under 90% of the target. --refine more steps then bisect between the last
+rate that passed and the first that failed; the highest passing rate is the
+saturation point.
+
+    python -m bench.load
+    python -m bench.load --workers 1,2,4 --connections 16,64 --duration 10
+    python -m bench.load --save bench/load-baseline.json
+    python -m bench.load --compare bench/load-baseline.json   # exit 1 if capacity dropped
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench.run import CORPUS_PATH, load_corpus, percentiles, resolved_intent
+
+# Share of each query class in the generated traffic
+MIX = (
+    ("jadwal", 0.25),
+    ("dress", 0.15),
+    ("tugas", 0.15),
+    ("lokasi", 0.15),
+    ("other", 0.12),
+    ("typo", 0.10),
+    ("offtopic", 0.08),
+)
+# A step passes when it reaches this share of its target rate
+MIN_ACHIEVED = 0.9
+READY_TIMEOUT = 60.0
+
+
+def build_mix(corpus: List[Dict[str, str]], size: int, seed: int) -> List[bytes]:
+    """Request bodies drawn from the corpus by query class, in MIX proportions."""
+    from app.main import ZEEROAgent
+
+    agent = ZEEROAgent(cache_size=0)
+    pools: Dict[str, List[str]] = {name: [] for name, _ in MIX}
+    for item in corpus:
+        query = item["query"]
+        label = resolved_intent(agent, query)
+        if item.get("kind") == "typo":
+            pools["typo"].append(query)
+        elif label in ("offtopic", "jadwal", "dress", "tugas", "lokasi"):
+            pools[label].append(query)
+        else:
+            pools["other"].append(query)
+
+    classes = [name for name, _ in MIX if pools[name]]
+    weights = [weight for name, weight in MIX if pools[name]]
+    rng = random.Random(seed)
+    return [
+        json.dumps({"query": rng.choice(pools[name])}).encode()
+        for name in rng.choices(classes, weights, k=size)
+    ]
+
+
+# === Server ===
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """``python -m app.serve`` in a subprocess, ready once /ready answers 200."""
+
+    def __init__(self, workers: int, env: Dict[str, str]) -> None:
+        self.workers = workers
+        self.port = _free_port()
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "Server":
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "app.serve", "--workers", str(self.workers), "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning", "--no-access-log"],
+            env=self.env,
+        )
+        deadline = time.monotonic() + READY_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"server exited with status {self.process.returncode}")
+            if self._ready():
+                return self
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError(f"server not ready after {READY_TIMEOUT:.0f}s")
+
+    def _ready(self) -> bool:
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=1) as sock:
+                sock.sendall(b"GET /ready HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+                return sock.recv(64).startswith(b"HTTP/1.1 200")
+        except OSError:
+            return False
+
+    def __exit__(self, *exc: Any) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+# === Load generation ===
+def _request(body: bytes) -> bytes:
+    return (
+        b"POST /v1/chat HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+    )
+
+
+async def _exchange(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: bytes) -> int:
+    writer.write(request)
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head[9:12])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def run_step(port: int, requests: List[bytes], rate: float, duration: float, connections: int) -> Dict[str, Any]:
+    """Offer ``rate`` requests/second for ``duration`` seconds over ``connections`` connections."""
+    clock = time.perf_counter
+    total = max(1, int(rate * duration))
+    queue: "asyncio.Queue[Optional[Tuple[float, bytes]]]" = asyncio.Queue()
+    latencies: List[float] = []
+    errors = 0
+    finished = 0.0
+
+    async def connection() -> None:
+        nonlocal errors, finished
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                due, request = item
+                try:
+                    status = await _exchange(reader, writer, request)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    writer.close()
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                    continue
+                finished = clock()
+                if status == 200:
+                    latencies.append(finished - due)
+                else:
+                    errors += 1
+        finally:
+            writer.close()
+
+    workers = [asyncio.create_task(connection()) for _ in range(connections)]
+    start = clock() + 0.05
+    sent = 0
+    # Enqueue every request that is due, then sleep until the next one is
+    while sent < total:
+        now = clock()
+        while sent < total and start + sent / rate <= now:
+            queue.put_nowait((start + sent / rate, requests[sent % len(requests)]))
+            sent += 1
+        if sent < total:
+            await asyncio.sleep(max(0.0, start + sent / rate - clock()))
+    for _ in workers:
+        queue.put_nowait(None)
+    await asyncio.gather(*workers)
+
+    elapsed = max(finished - start, duration)
+    stats = percentiles(latencies)
+    return {
+        "target_rps": rate,
+        "achieved_rps": len(latencies) / elapsed,
+        "errors": errors,
+        **{p: stats[p] for p in ("p50", "p95", "p99")},
+    }
+
+
+def passes(step: Dict[str, Any], budget_ms: float) -> bool:
+    return (
+        step["errors"] == 0
+        and step["p99"] <= budget_ms
+        and step["achieved_rps"] >= step["target_rps"] * MIN_ACHIEVED
+    )
+
+
+def sweep(port: int, requests: List[bytes], connections: int, args: argparse.Namespace) -> Dict[str, Any]:
+    steps: List[Dict[str, Any]] = []
+
+    def step(rate: float) -> bool:
+        result = asyncio.run(run_step(port, requests, rate, args.duration, connections))
+        result["ok"] = passes(result, args.p99_budget_ms)
+        steps.append(result)
+        print(f"  {rate:>8.0f} {result['achieved_rps']:>10.0f} {result['p50']:>8.2f} {result['p95']:>8.2f} "
+              f"{result['p99']:>8.2f} {result['errors']:>7}  {'ok' if result['ok'] else 'over budget'}", flush=True)
+        return result["ok"]
+
+    # Warm every connection path and the server's response cache before measuring
+    asyncio.run(run_step(port, requests, args.start_rate, 1.0, connections))
+    saturation, failed = 0.0, None
+    rate = args.start_rate
+    while rate <= args.max_rate:
+        if not step(rate):
+            failed = rate
+            break
+        saturation = rate
+        rate *= 2
+    if failed is not None and saturation:
+        low, high = saturation, failed
+        for _ in range(args.refine):
+            rate = (low + high) / 2
+            if step(rate):
+                low = saturation = rate
+            else:
+                high = rate
+    return {"steps": sorted(steps, key=lambda s: s["target_rps"]), "saturation_rps": saturation}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Configurations whose saturation point dropped by more than threshold."""
+    regressions = []
+    for key, result in current["runs"].items():
+        before = baseline.get("runs", {}).get(key, {}).get("saturation_rps")
+        after = result["saturation_rps"]
+        if before and after < before * (1 - threshold):
+            regressions.append(f"{key} saturation {before:.0f} -> {after:.0f} req/s ({after / before - 1:+.1%})")
+    return regressions
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--workers", type=_ints, default=[1, 2], help="comma-separated worker counts (default: 1,2)")
+    parser.add_argument("--connections", type=_ints, default=[8, 32], help="comma-separated client connection counts")
+    parser.add_argument("--start-rate", type=float, default=100, help="first target rate in requests/second")
+    parser.add_argument("--max-rate", type=float, default=12800, help="stop doubling past this rate")
+    parser.add_argument("--refine", type=int, default=2, help="bisection steps after the first rate over budget")
+    parser.add_argument("--duration", type=float, default=5, help="seconds per rate step")
+    parser.add_argument("--p99-budget-ms", type=float, default=50, help="p99 latency budget per step")
+    parser.add_argument("--requests", type=int, default=5000, help="distinct requests in the generated mix")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--no-cache", action="store_true", help="run the server with the response cache off")
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON (e.g. a new baseline)")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to compare saturation points against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed capacity drop before flagging")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    requests = [_request(body) for body in build_mix(load_corpus(args.corpus), args.requests, args.seed)]
+    env = dict(os.environ, ZEERO_RATE_LIMIT_KEY_RATE="0", ZEERO_RATE_LIMIT_IP_RATE="0", ZEERO_KB_WATCH_INTERVAL="0")
+    if args.no_cache:
+        env["ZEERO_CACHE_SIZE"] = "0"
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "duration": args.duration,
+            "p99_budget_ms": args.p99_budget_ms,
+            "cache": not args.no_cache,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "runs": {},
+    }
+    print(f"ZEERO load test: p99 budget {args.p99_budget_ms:.0f} ms, {args.duration:.0f}s per step, {os.cpu_count()} CPUs")
+    for workers in args.workers:
+        with Server(workers, env) as server:
+            for connections in args.connections:
+                key = f"workers={workers},connections={connections}"
+                print(f"\n{key}")
+                print(f"  {'target':>8} {'achieved':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+                results["runs"][key] = sweep(server.port, requests, connections, args)
+
+    print("\nsaturation points (highest rate within budget):")
+    for key, run in results["runs"].items():
+        print(f"  {key:<28} {run['saturation_rps']:>8.0f} req/s")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print()
+        if regressions:
+            print(f"{len(regressions)} capacity regression(s) over {args.threshold:.0%} against {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"no capacity regressions over {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
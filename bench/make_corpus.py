@@ -0,0 +1,119 @@
+"""Generate the bundled benchmark corpus (bench/corpus.jsonl).
+
+The corpus is deterministic for a given seed so results stay comparable
+between runs. Each line is {"query": ..., "kind": ...} where kind is one of
+clean, typo, long, english or offtopic.
+
+    python -m bench.make_corpus [--size 3000] [--seed 2025]
+"""
+import argparse
+import json
+import os
+import random
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "corpus.jsonl")
+
+CLEAN = [
+    "Apa jadwal ORMIK?", "jadwal ormik", "jadwal ormik 2025", "kapan ormik dimulai", "ormik mulai tanggal berapa",
+    "jam berapa harus datang?", "jam berapa registrasi ulang", "kapan day 1", "kapan last day", "jadwal download guidebook",
+    "dress code putri", "dress code putra", "pakaian apa yang dipakai", "seragam ormik", "outfit hari pertama",
+    "ketentuan putra", "ketentuan putri", "ketentuan peserta", "boleh pakai softlens?", "boleh pakai jaket?",
+    "tugas day 1", "tugas last day", "tugas pra ormik", "tugas hari pertama", "tugas sebelum ormik", "tugas apa saja",
+    "tugas terakhir apa", "tugas persiapan", "divisi event", "divisi it support", "apa itu PO", "divisi lo",
+    "tugas divisi media", "divisi kedis ngapain", "struktur organisasi panitia", "siapa saja panitianya",
+    "lokasi kampus", "alamat kampus dimana", "parkir dimana", "gedung mana", "fasilitas kampus apa saja",
+    "kontak panitia", "nomor whatsapp panitia", "instagram ormik", "cp ormik", "email kampus",
+    "tips persiapan ormik", "tips selama ormik", "tips ormik", "saran sebelum ormik", "tata tertib ormik",
+    "peraturan ormik", "aturan selama ormik", "punishment ringan", "punishment sedang", "punishment berat",
+    "punishment khusus", "hukuman kalau telat", "sanksi pelanggaran", "atribut day 1", "atribut last day",
+    "perlengkapan yang dibawa", "apa yang dibawa", "bawa apa saja", "halo", "halo zeero", "siapa kamu",
+    "siapa pembuat zeero", "developer zeero siapa", "hak peserta", "kewajiban peserta", "perizinan ormik",
+    "izin tidak hadir", "cara izin kalau sakit", "guidebook ormik", "download guidebook", "rundown ormik",
+    "apa itu ormik", "ormik explore 2025", "tentang ormik", "twibbon ormik", "softlens", "BPJS", "mini gift",
+    "yel yel kompi", "lagu mars", "name tag", "buku passport", "video perkenalan",
+]
+
+ENGLISH = [
+    "what is the schedule", "when does ormik start", "where is the campus", "who made this bot",
+    "what should I bring", "dress code for girls", "what are the rules", "how do I contact the committee",
+    "what is the assignment for day 1", "download the guidebook", "what time should I arrive",
+    "what happens if I break the rules", "who is the project officer", "hello", "what is ormik",
+]
+
+OFFTOPIC = [
+    "resep nasi goreng", "cuaca hari ini", "siapa presiden indonesia", "apa kabar", "terima kasih", "ok",
+    "how are you", "rekomendasi film", "harga bitcoin", "cara masak mie", "lirik lagu terbaru",
+    "skor bola semalam", "tolong kerjakan pr matematika saya", "berapa 2 + 2", "ceritakan lelucon",
+]
+
+FILLERS = [
+    "kak", "maaf", "mau tanya", "permisi", "halo kak", "ya", "dong", "sih", "nih", "kakak panitia",
+    "saya mahasiswa baru", "dari prodi TI", "soalnya saya bingung", "terima kasih sebelumnya", "hehe",
+]
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+
+def typo(rng: random.Random, text: str) -> str:
+    words = text.split()
+    for _ in range(rng.randint(1, 2)):
+        candidates = [i for i, w in enumerate(words) if len(w) > 3]
+        if not candidates:
+            break
+        i = rng.choice(candidates)
+        w = list(words[i])
+        j = rng.randrange(len(w))
+        op = rng.randrange(4)
+        if op == 0:
+            del w[j]
+        elif op == 1:
+            w.insert(j, rng.choice(ALPHABET))
+        elif op == 2:
+            w[j] = rng.choice(ALPHABET)
+        elif j + 1 < len(w):
+            w[j], w[j + 1] = w[j + 1], w[j]
+        words[i] = "".join(w)
+    return " ".join(words)
+
+
+def rambling(rng: random.Random) -> str:
+    parts = [rng.choice(FILLERS)]
+    for _ in range(rng.randint(2, 5)):
+        parts.append(rng.choice(CLEAN).rstrip("?"))
+        parts.append(rng.choice(FILLERS))
+    return ", ".join(parts) + "?"
+
+
+def generate(size: int, seed: int):
+    rng = random.Random(seed)
+    kinds = [("clean", 0.45), ("typo", 0.25), ("long", 0.1), ("english", 0.08), ("offtopic", 0.12)]
+    for _ in range(size):
+        kind = rng.choices([k for k, _ in kinds], weights=[w for _, w in kinds])[0]
+        if kind == "clean":
+            query = rng.choice(CLEAN)
+            query = query.lower() if rng.random() < 0.5 else query
+        elif kind == "typo":
+            query = typo(rng, rng.choice(CLEAN).lower())
+        elif kind == "long":
+            query = rambling(rng)
+        elif kind == "english":
+            query = rng.choice(ENGLISH)
+        else:
+            query = rng.choice(OFFTOPIC)
+        yield {"query": query, "kind": kind}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--out", default=CORPUS_PATH)
+    args = parser.parse_args()
+    with open(args.out, "w", encoding="utf-8") as f:
+        for item in generate(args.size, args.seed):
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    print(f"wrote {args.size} queries to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""Replay a query corpus through two agent builds and diff what they answer.
+
+Each side is a source tree, either the working tree (``.``) or a git ref
+(extracted with ``git archive`` into a temporary directory), plus optional
+``ZEERO_*`` overrides. Every side runs in its own Python process with its own
+tree on the path, so config read at import time and code from another commit
+both work. Both processes build their agent and warm it up at the same time,
+then time the corpus in lockstep passes: side by side when there are at least
+two CPUs, alternating base/head and head/base on one, so drift in machine
+speed during the run hits both sides alike.
+
+The corpus is any JSONL with a ``query`` field: the bench corpus or the query
+log (``ZEERO_QUERY_LOG=jsonl``). Repeated queries are replayed once and
+counted with their weight, so changes are reported both per distinct query
+and per logged request.
+
+Reported per query: resolved intent, topic_ok, answer and confidence changes,
+an old-by-new intent confusion matrix and latency. Latency is the fastest of
+``--repeat`` cache-off replies after a warm-up pass.
+
+    python -m bench.replay                                   # HEAD vs working tree
+    python -m bench.replay --base HEAD~3 --head HEAD --corpus logs/queries-*.jsonl
+    python -m bench.replay --base . --head . --head-env ZEERO_FUZZY_THRESHOLD=0.75
+    python -m bench.replay --save replay.json --fail-on-diff # exit 1 if intent or topic changed
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tarfile
+import tempfile
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench.run import CORPUS_PATH, load_corpus, percentiles
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Changes in confidence smaller than this are rounding, not a different decision
+CONFIDENCE_EPSILON = 1e-6
+
+# Runs inside each side's tree, so it relies only on what every build has had:
+# ZEEROAgent().reply() and either analyze() or the original _resolve_intent().
+# Protocol on stdin/stdout: "ready" after the warm-up, then one timed pass per
+# "pass" line (answered with "done"); "end" writes the results file.
+WORKER = r"""
+import json, sys, time
+control, sys.stdout = sys.stdout, sys.stderr
+from app.main import ZEEROAgent
+
+queries_path, results_path = sys.argv[1], sys.argv[2]
+with open(queries_path, encoding="utf-8") as f:
+    queries = json.load(f)
+try:
+    agent = ZEEROAgent(cache_size=0)
+except TypeError:
+    agent = ZEEROAgent()
+
+def intent(query, response):
+    if hasattr(agent, "analyze"):
+        return agent._intent_label(agent.analyze(query))
+    if not response.topic_ok:
+        return "offtopic"
+    return agent._resolve_intent(query.lower()) or "default"
+
+def say(line):
+    control.write(line + "\n")
+    control.flush()
+
+for query in queries:
+    agent.reply(query)
+clock = time.perf_counter
+best = [float("inf")] * len(queries)
+say("ready")
+for command in sys.stdin:
+    if command.strip() != "pass":
+        break
+    for i, query in enumerate(queries):
+        started = clock()
+        agent.reply(query)
+        best[i] = min(best[i], clock() - started)
+    say("done")
+with open(results_path, "w", encoding="utf-8") as f:
+    for query, seconds in zip(queries, best):
+        response = agent.reply(query)
+        f.write(json.dumps({
+            "intent": intent(query, response),
+            "topic_ok": response.topic_ok,
+            "confidence": response.confidence,
+            "answer": response.answer,
+            "seconds": seconds,
+        }, ensure_ascii=False) + "\n")
+"""
+
+
+class Side:
+    """One build to replay: a tree (``.`` or a git ref) plus environment overrides."""
+
+    def __init__(self, name: str, ref: str, env: List[str]) -> None:
+        self.name = name
+        self.ref = ref
+        self.overrides = dict(self._pair(item) for item in env)
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._results_path = ""
+
+    @staticmethod
+    def _pair(item: str) -> Tuple[str, str]:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise ValueError(f"expected KEY=VALUE, got {item!r}")
+        return key, value
+
+    @property
+    def label(self) -> str:
+        ref = "working tree" if self.ref == "." else self.ref
+        overrides = " ".join(f"{k}={v}" for k, v in sorted(self.overrides.items()))
+        return f"{ref} {overrides}".strip()
+
+    def tree(self) -> str:
+        if self.ref == ".":
+            return ROOT
+        if self._tmp is None:
+            archive = subprocess.run(["git", "archive", "--format=tar", self.ref], cwd=ROOT, capture_output=True)
+            if archive.returncode != 0:
+                raise RuntimeError(f"git archive {self.ref}: {archive.stderr.decode().strip()}")
+            self._tmp = tempfile.TemporaryDirectory(prefix=f"zeero-replay-{self.name}-")
+            with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+                tar.extractall(self._tmp.name, filter="data")
+        return self._tmp.name
+
+    def start(self, queries_path: str) -> None:
+        """Start the worker; it builds and warms up its agent in the background."""
+        tree = self.tree()
+        env = dict(
+            os.environ,
+            PYTHONPATH=tree,
+            ZEERO_SNAPSHOT="",
+            ZEERO_KB_WATCH_INTERVAL="0",
+            ZEERO_QUERY_LOG="",
+            ZEERO_TENANTS_DIR="",
+        )
+        env.update(self.overrides)
+        with tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False) as out:
+            self._results_path = out.name
+        self._process = subprocess.Popen(
+            [sys.executable, "-c", WORKER, queries_path, self._results_path],
+            cwd=tree, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+
+    def send(self, command: str) -> None:
+        self._process.stdin.write(command + "\n")
+        self._process.stdin.flush()
+
+    def wait_for(self, reply: str) -> None:
+        line = self._process.stdout.readline().strip()
+        if line != reply:
+            status = self._process.wait()
+            raise RuntimeError(f"{self.name} worker ({self.label}) exited with status {status}")
+
+    def results(self) -> List[Dict[str, Any]]:
+        self.send("end")
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"{self.name} worker ({self.label}) exited with status {self._process.returncode}")
+        with open(self._results_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def close(self) -> None:
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+            os.remove(self._results_path)
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+
+def replay(base: Side, head: Side, queries_path: str, repeat: int, parallel: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    for side in (base, head):
+        side.start(queries_path)
+    for side in (base, head):
+        side.wait_for("ready")
+    for n in range(repeat):
+        if parallel:
+            for side in (base, head):
+                side.send("pass")
+            for side in (base, head):
+                side.wait_for("done")
+            continue
+        for side in ((base, head) if n % 2 == 0 else (head, base)):
+            side.send("pass")
+            side.wait_for("done")
+    return base.results(), head.results()
+
+
+def distinct_queries(paths: List[str], limit: int = 0) -> Tuple[List[str], List[int]]:
+    """Queries in first-seen order and how often each occurs."""
+    counts: Counter = Counter()
+    for path in paths:
+        counts.update(row["query"] for row in load_corpus(path) if row.get("query"))
+    queries = list(counts)
+    if limit:
+        queries = queries[:limit]
+    return queries, [counts[q] for q in queries]
+
+
+def diff(queries: List[str], weights: List[int], base: List[Dict[str, Any]], head: List[Dict[str, Any]]) -> Dict[str, Any]:
+    changes: Dict[str, List[Dict[str, Any]]] = {"intent": [], "topic_ok": [], "answer": [], "confidence": []}
+    confusion: Counter = Counter()
+    deltas = []
+    for query, weight, old, new in zip(queries, weights, base, head):
+        confusion[(old["intent"], new["intent"])] += weight
+        deltas.append((new["seconds"] - old["seconds"], query, old["seconds"], new["seconds"]))
+        row = {"query": query, "weight": weight}
+        for field in ("intent", "topic_ok", "answer"):
+            if old[field] != new[field]:
+                changes[field].append(dict(row, base=old[field], head=new[field]))
+        if abs(old["confidence"] - new["confidence"]) > CONFIDENCE_EPSILON:
+            changes["confidence"].append(dict(row, base=old["confidence"], head=new["confidence"]))
+    for rows in changes.values():
+        rows.sort(key=lambda r: -r["weight"])
+
+    deltas.sort(reverse=True)
+    return {
+        "queries": len(queries),
+        "requests": sum(weights),
+        "changes": changes,
+        "confusion": [{"base": b, "head": h, "requests": n} for (b, h), n in sorted(confusion.items())],
+        "latency": {
+            "base": percentiles(r["seconds"] for r in base),
+            "head": percentiles(r["seconds"] for r in head),
+            "delta": percentiles(d for d, *_ in deltas),
+            "total_ms": {"base": sum(r["seconds"] for r in base) * 1000, "head": sum(r["seconds"] for r in head) * 1000},
+            "slower": [{"query": q, "base_ms": b * 1000, "head_ms": h * 1000} for _, q, b, h in deltas[:10]],
+            "faster": [{"query": q, "base_ms": b * 1000, "head_ms": h * 1000} for _, q, b, h in deltas[::-1][:10]],
+        },
+    }
+
+
+def print_report(results: Dict[str, Any], examples: int) -> None:
+    meta = results["meta"]
+    print(f"ZEERO replay: {results['queries']} distinct queries ({results['requests']} requests), "
+          f"best of {meta['repeat']}, {'parallel' if meta['parallel'] else 'sequential'}")
+    print(f"  base: {meta['base']}")
+    print(f"  head: {meta['head']}")
+
+    print(f"\n{'changed':<12} {'queries':>8} {'requests':>9}")
+    for field, rows in results["changes"].items():
+        print(f"{field:<12} {len(rows):>8} {sum(r['weight'] for r in rows):>9}")
+
+    # Only intents that gained or lost requests get a row and a column; the full matrix is in --save
+    cells = {(c["base"], c["head"]): c["requests"] for c in results["confusion"]}
+    labels = sorted({label for pair in cells if pair[0] != pair[1] for label in pair})
+    unchanged = sum(n for (b, h), n in cells.items() if b == h)
+    if not labels:
+        print(f"\nintent confusion: all {unchanged} requests kept their intent")
+    else:
+        _print_confusion(labels, cells, unchanged)
+
+    for field in ("intent", "topic_ok", "confidence", "answer"):
+        rows = results["changes"][field]
+        if not rows:
+            continue
+        print(f"\n{field} changes (top {min(examples, len(rows))} by requests):")
+        for r in rows[:examples]:
+            if field == "answer":
+                print(f"  x{r['weight']:<4} {r['query']!r}\n        base: {_clip(r['base'])}\n        head: {_clip(r['head'])}")
+            else:
+                print(f"  x{r['weight']:<4} {r['query']!r}: {r['base']} -> {r['head']}")
+
+    latency = results["latency"]
+    print(f"\n{'latency':<8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for series in ("base", "head", "delta"):
+        stats = latency[series]
+        print(f"{series:<8} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['p99']:>9.3f}")
+    before, after = latency["total_ms"]["base"], latency["total_ms"]["head"]
+    if before:
+        print(f"whole corpus: {before:.1f} -> {after:.1f} ms ({after / before - 1:+.1%})")
+    print("most slowed down:")
+    for r in latency["slower"][:examples]:
+        print(f"  {r['base_ms']:>8.3f} -> {r['head_ms']:>8.3f} ms  {_clip(r['query'], 60)}")
+
+
+def _print_confusion(labels: List[str], cells: Dict[Tuple[str, str], int], unchanged: int) -> None:
+    width = max(8, *(len(label) + 1 for label in labels))
+    print(f"\nintent confusion (rows: base, columns: head, requests; {unchanged} kept their intent):")
+    print(" " * width + "".join(f"{label:>{width}}" for label in labels))
+    for row in labels:
+        print(f"{row:<{width}}" + "".join(f"{cells.get((row, col), 0) or '.':>{width}}" for col in labels))
+
+
+def _clip(text: str, width: int = 100) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", action="append", help="JSONL with a query field; repeatable (default: bench corpus)")
+    parser.add_argument("--base", default="HEAD", help="git ref or . for the working tree (default: HEAD)")
+    parser.add_argument("--head", default=".", help="git ref or . for the working tree (default: .)")
+    parser.add_argument("--base-env", action="append", default=[], metavar="KEY=VALUE", help="environment override for base")
+    parser.add_argument("--head-env", action="append", default=[], metavar="KEY=VALUE", help="environment override for head")
+    parser.add_argument("--repeat", type=int, default=4, help="timed passes per side; each query keeps its fastest")
+    parser.add_argument("--limit", type=int, default=0, help="use only the first N distinct queries")
+    parser.add_argument("--examples", type=int, default=10, help="changed queries listed per kind")
+    parser.add_argument("--sequential", action="store_true", help="alternate timed passes even with spare CPUs")
+    parser.add_argument("--save", metavar="PATH", help="write every change and the latency report as JSON")
+    parser.add_argument("--fail-on-diff", action="store_true", help="exit 1 if any intent or topic_ok changed")
+    args = parser.parse_args(argv)
+
+    try:
+        base, head = Side("base", args.base, args.base_env), Side("head", args.head, args.head_env)
+    except ValueError as exc:
+        parser.error(str(exc))
+    for ref in {args.base, args.head} - {"."}:
+        check = subprocess.run(["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], cwd=ROOT, capture_output=True)
+        if check.returncode != 0:
+            parser.error(f"not a git commit: {ref}")
+    queries, weights = distinct_queries(args.corpus or [CORPUS_PATH], args.limit)
+    if not queries:
+        parser.error("the corpus has no queries")
+    parallel = not args.sequential and (os.cpu_count() or 1) >= 2
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", encoding="utf-8", delete=False) as f:
+        json.dump(queries, f, ensure_ascii=False)
+        queries_path = f.name
+    try:
+        base_results, head_results = replay(base, head, queries_path, args.repeat, parallel)
+    finally:
+        os.remove(queries_path)
+        base.close()
+        head.close()
+
+    results = diff(queries, weights, base_results, head_results)
+    results["meta"] = {
+        "base": base.label,
+        "head": head.label,
+        "repeat": args.repeat,
+        "parallel": parallel,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+    print_report(results, args.examples)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nresults saved to {args.save}")
+
+    if args.fail_on_diff and (results["changes"]["intent"] or results["changes"]["topic_ok"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
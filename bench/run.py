@@ -0,0 +1,357 @@
+"""End-to-end latency benchmark for ZEERO Agent.
+
+Replays the bundled corpus (bench/corpus.jsonl) against:
+
+* ``agent``        ZEEROAgent.reply with the response cache disabled
+* ``agent_cached`` ZEEROAgent.reply with the default response cache
+* ``http``         POST /v1/chat through the FastAPI app, in-process over ASGI
+* ``serialize``    the reply, then its JSON body built both ways: through
+                   FastAPI's response_model validation and JSONResponse (the
+                   old route) and from the pre-serialized answer (the new one)
+
+and reports throughput plus p50/p95/p99 latency overall, per resolved intent
+and per pipeline stage, and for ``serialize`` the share of time spent on
+serialization with each path. Results can be saved as a baseline and later runs
+compared against it; regressions beyond the threshold exit with status 1.
+
+    python -m bench.run
+    python -m bench.run --save bench/baseline.json
+    python -m bench.run --compare bench/baseline.json --threshold 0.10
+"""
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import serialize_response
+
+# The http mode sends far more than any client would; as in bench.load, no rate limits
+os.environ.update(ZEERO_RATE_LIMIT_KEY_RATE="0", ZEERO_RATE_LIMIT_IP_RATE="0")
+
+from app import main
+from app.main import ZEEROAgent
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "corpus.jsonl")
+MODES = ("agent", "agent_cached", "http", "serialize")
+# Differences below this many milliseconds, or in series with fewer samples, are noise
+MIN_DELTA_MS = 0.005
+MIN_SAMPLES = 50
+
+
+def load_corpus(path: str) -> List[Dict[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentiles(samples: Iterable[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+    def rank(p: float) -> float:
+        # nearest-rank, in milliseconds
+        return ordered[max(0, math.ceil(p * len(ordered)) - 1)] * 1000
+
+    return {"count": len(ordered), "p50": rank(0.50), "p95": rank(0.95), "p99": rank(0.99)}
+
+
+def resolved_intent(agent: ZEEROAgent, query: str) -> str:
+    return agent._intent_label(agent.analyze(query))
+
+
+# === Stage timing ===
+class StageTimer:
+    """Wrap the agent's pipeline stages on the instance and record their durations.
+
+    Only the instance is patched (plus ``app.main.normalize_text`` while active),
+    so the agent code under test is the code that ships.
+    """
+
+    def __init__(self, agent: ZEEROAgent) -> None:
+        self.agent = agent
+        self.samples: Dict[str, List[float]] = {}
+        self._restore: List[Callable[[], None]] = []
+
+    def _wrap(self, owner: Any, attr: str, stage: str) -> None:
+        original = getattr(owner, attr)
+        samples = self.samples.setdefault(stage, [])
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                samples.append(clock() - start)
+
+        setattr(owner, attr, timed)
+        if owner is main:
+            self._restore.append(lambda: setattr(owner, attr, original))
+        else:
+            self._restore.append(lambda: owner.__dict__.pop(attr, None))
+
+    def __enter__(self) -> "StageTimer":
+        agent = self.agent
+        self._wrap(main, "normalize_text", "normalize")
+        self._wrap(agent.keyword_matcher, "scan", "keyword_scan")
+        self._wrap(agent, "_fuzzy_keywords", "fuzzy")
+        self._wrap(agent.intent_scorer, "score", "intent")
+        self._wrap(agent.retrieval_index, "search", "retrieval")
+        self._wrap(agent, "_get_keyword_based_response", "render")
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        while self._restore:
+            self._restore.pop()()
+
+
+# === Runners ===
+def summarize(latencies: List[float], labels: List[str], elapsed: float) -> Dict[str, Any]:
+    by_intent: Dict[str, List[float]] = {}
+    for label, latency in zip(labels, latencies):
+        by_intent.setdefault(label, []).append(latency)
+    return {
+        "throughput_qps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": percentiles(latencies),
+        "by_intent": {label: percentiles(samples) for label, samples in sorted(by_intent.items())},
+    }
+
+
+def bench_agent(agent: ZEEROAgent, queries: List[str], labels: List[str], repeat: int) -> Dict[str, Any]:
+    clock = time.perf_counter
+    latencies: List[float] = []
+    for q in queries[:200]:
+        agent.reply(q)  # warm-up
+    gc.collect()
+    started = clock()
+    for _ in range(repeat):
+        for q in queries:
+            t0 = clock()
+            agent.reply(q)
+            latencies.append(clock() - t0)
+    elapsed = clock() - started
+    return summarize(latencies, labels * repeat, elapsed)
+
+
+def bench_stages(agent: ZEEROAgent, queries: List[str]) -> Dict[str, Dict[str, float]]:
+    # Separate pass: the wrappers add overhead that must not leak into end-to-end numbers
+    with StageTimer(agent) as timer:
+        for q in queries:
+            agent.reply(q)
+    return {stage: percentiles(samples) for stage, samples in timer.samples.items()}
+
+
+async def _asgi_post(app: Any, path: str, body: bytes) -> int:
+    # Minimal ASGI client: one request, response body discarded
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def bench_http(agent: ZEEROAgent, queries: List[str], labels: List[str], repeat: int) -> Dict[str, Any]:
+    bodies = [json.dumps({"query": q}).encode() for q in queries]
+    previous, main.agent = main.agent, agent
+
+    async def run() -> Dict[str, Any]:
+        clock = time.perf_counter
+        for body in bodies[:100]:
+            await _asgi_post(main.app, "/v1/chat", body)
+        latencies: List[float] = []
+        started = clock()
+        for _ in range(repeat):
+            for body in bodies:
+                t0 = clock()
+                status = await _asgi_post(main.app, "/v1/chat", body)
+                latencies.append(clock() - t0)
+                if status != 200:
+                    raise RuntimeError(f"/v1/chat returned {status}")
+        return summarize(latencies, labels * repeat, clock() - started)
+
+    try:
+        return asyncio.run(run())
+    finally:
+        main.agent = previous
+
+
+def bench_serialize(agent: ZEEROAgent, queries: List[str], labels: List[str], repeat: int) -> Dict[str, Any]:
+    route = next(r for r in main.app.routes if getattr(r, "path", "") == "/v1/chat" and "POST" in r.methods)
+    samples: Dict[str, List[float]] = {"reply": [], "response_model": [], "prebuilt": []}
+
+    async def run() -> Dict[str, Any]:
+        clock = time.perf_counter
+        latencies: List[float] = []
+        for _ in range(repeat):
+            for q in queries:
+                t0 = clock()
+                entry = agent._reply_entry(*agent._bounded_normalize(q))
+                t1 = clock()
+                # What FastAPI does for a sync endpoint returning a model (validation runs in the threadpool)
+                content = await serialize_response(field=route.response_field, response_content=entry.response, is_coroutine=False)
+                JSONResponse(content)
+                t2 = clock()
+                Response(agent._entry_json(entry), media_type="application/json")
+                t3 = clock()
+                samples["reply"].append(t1 - t0)
+                samples["response_model"].append(t2 - t1)
+                samples["prebuilt"].append(t3 - t2)
+                latencies.append((t1 - t0) + (t3 - t2))
+        # Wall time includes the old path too, so throughput comes from the new path's latencies
+        return summarize(latencies, labels * repeat, sum(latencies))
+
+    result = asyncio.run(run())
+    result["stages"] = {stage: percentiles(values) for stage, values in samples.items()}
+    reply = sum(samples["reply"])
+    result["serialization_share"] = {
+        path: sum(samples[path]) / (reply + sum(samples[path])) for path in ("response_model", "prebuilt")
+    }
+    return result
+
+
+def run(corpus: List[Dict[str, str]], modes: Iterable[str], repeat: int) -> Dict[str, Any]:
+    queries = [item["query"] for item in corpus]
+    uncached = ZEEROAgent(cache_size=0)
+    labels = [resolved_intent(uncached, q) for q in queries]
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "queries": len(queries),
+            "repeat": repeat,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+    }
+    for mode in modes:
+        if mode == "agent":
+            results[mode] = bench_agent(uncached, queries, labels, repeat)
+            results[mode]["stages"] = bench_stages(uncached, queries)
+        elif mode == "agent_cached":
+            results[mode] = bench_agent(ZEEROAgent(), queries, labels, repeat)
+        elif mode == "http":
+            results[mode] = bench_http(ZEEROAgent(cache_size=0), queries, labels, repeat)
+        elif mode == "serialize":
+            results[mode] = bench_serialize(ZEEROAgent(cache_size=0), queries, labels, repeat)
+    return results
+
+
+# === Reporting ===
+def _rows(results: Dict[str, Any]) -> Iterable[tuple]:
+    for mode in MODES:
+        section = results.get(mode)
+        if not section:
+            continue
+        yield mode, "overall", section["latency_ms"]
+        for label, stats in section["by_intent"].items():
+            yield mode, f"intent:{label}", stats
+        for stage, stats in section.get("stages", {}).items():
+            yield mode, f"stage:{stage}", stats
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    meta = results["meta"]
+    print(f"ZEERO benchmark: {meta['queries']} queries x{meta['repeat']}, Python {meta['python']}")
+    for mode in MODES:
+        if mode in results:
+            print(f"  {mode:<13} {results[mode]['throughput_qps']:>10.0f} queries/s")
+    if "serialize" in results:
+        share = results["serialize"]["serialization_share"]
+        print(f"  serialization share of reply + body: response_model {share['response_model']:.1%}, "
+              f"prebuilt {share['prebuilt']:.1%}")
+    print()
+    print(f"{'mode':<13} {'series':<24} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for mode, series, stats in _rows(results):
+        print(f"{mode:<13} {series:<24} {stats['count']:>7} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['p99']:>9.3f}")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Human-readable regressions of current against baseline."""
+    regressions = []
+    for mode in MODES:
+        if mode not in current or mode not in baseline:
+            continue
+        before, after = baseline[mode]["throughput_qps"], current[mode]["throughput_qps"]
+        if after < before * (1 - threshold):
+            regressions.append(f"{mode} throughput {before:.0f} -> {after:.0f} queries/s ({after / before - 1:+.1%})")
+
+    old = {(mode, series): stats for mode, series, stats in _rows(baseline)}
+    for mode, series, stats in _rows(current):
+        previous = old.get((mode, series))
+        if previous is None or min(previous["count"], stats["count"]) < MIN_SAMPLES:
+            continue
+        for p in ("p50", "p95", "p99"):
+            before, after = previous[p], stats[p]
+            if after > before * (1 + threshold) and after - before > MIN_DELTA_MS:
+                regressions.append(f"{mode} {series} {p} {before:.3f} -> {after:.3f} ms ({after / before - 1:+.1%})")
+    return regressions
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated subset of: " + ", ".join(MODES))
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus per mode")
+    parser.add_argument("--limit", type=int, default=0, help="use only the first N queries")
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON (e.g. a new baseline)")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    corpus = load_corpus(args.corpus)
+    if args.limit:
+        corpus = corpus[:args.limit]
+    results = run(corpus, modes, args.repeat)
+    print_report(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print()
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%} against {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"no regressions over {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,36 @@
+"""Queries without a topic keyword reach the knowledge base only through its rare words."""
+import pytest
+
+from app.main import ZEEROAgent
+
+
+@pytest.fixture(scope="module")
+def agent():
+    return ZEEROAgent(cache_size=0)
+
+
+@pytest.mark.parametrize("query, item", [
+    ("softlens", "softlens"),
+    ("bpjs", "BPJS"),
+    ("bawa bpjs?", "BPJS"),
+    ("twibbon", "twibbon"),
+    ("twibbon ormik", "twibbon"),
+])
+def test_rare_knowledge_base_word_gets_the_item(agent, query, item):
+    response = agent.reply(query)
+    assert response.topic_ok
+    assert item.lower() in response.answer.lower()
+    assert response.answer != agent.offtopic_answer.answer
+
+
+@pytest.mark.parametrize("query", [
+    "resep nasi goreng",
+    "apa kabar",
+    "film terbaru",
+    "lirik lagu terbaru",
+    "skor bola semalam",
+])
+def test_chit_chat_stays_off_topic(agent, query):
+    response = agent.reply(query)
+    assert not response.topic_ok
+    assert response.answer == agent.offtopic_answer.answer
@@ -0,0 +1,68 @@
+"""A tenant's answers come from its own knowledge base, not the default event's."""
+import json
+
+import pytest
+
+from app.config import KNOWLEDGE_BASE_PATH
+from app.main import ZEEROAgent
+from app.tenants import TenantRegistry
+
+OFFTOPIC_2026 = "Maaf, saya hanya bisa membantu pertanyaan seputar ORMIK 2026. Silakan hubungi @ormik2026 di Instagram."
+
+
+def ormik_2026() -> dict:
+    with open(KNOWLEDGE_BASE_PATH, encoding="utf-8") as f:
+        raw = json.load(f)
+    data = raw["context"]["ormikData"]
+    data["acara"].update(
+        nama="ORMIK 2026",
+        nama_lengkap="ORMIK Explore 2026",
+        kata_kunci=["ormik explore", "ormik 2026"],
+        pesan_offtopic=OFFTOPIC_2026,
+    )
+    data["contact"]["instagram_handle"] = "@ormik2026"
+    data["schedule"] = [
+        {"id": "pra-ormik", "title": "PRA ORMIK", "date": "Senin, 7 September 2026", "fullDate": "2026-09-07"},
+        {"id": "day-1", "title": "DAY 1", "date": "Selasa, 15 September 2026", "fullDate": "2026-09-15"},
+        {"id": "last-day", "title": "LAST DAY", "date": "Sabtu, 19 September 2026", "fullDate": "2026-09-19"},
+    ]
+    return raw
+
+
+@pytest.fixture(scope="module")
+def registry(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("tenants")
+    (directory / "ormik-2026.json").write_text(json.dumps(ormik_2026()), encoding="utf-8")
+    default = ZEEROAgent(cache_size=0)
+    return TenantRegistry(
+        str(directory), 256 * 1024 * 1024,
+        lambda tenant, kb: ZEEROAgent(kb, cache_size=0, tenant=tenant),
+        lambda: default,
+    )
+
+
+def test_task_answers_carry_the_tenants_event_and_dates(registry):
+    answer = registry.get("ormik-2026").reply("tugas day 1").answer
+    assert "Tugas Day 1 ORMIK 2026" in answer
+    assert "Selasa, 15 September 2026" in answer
+    assert "2025" not in answer
+
+    overview = registry.get("ormik-2026").reply("tugas").answer
+    assert "Hari Pertama - 15 Sept" in overview and "Hari Terakhir - 19 Sept" in overview
+    assert "2025" not in overview
+
+
+def test_default_tenant_keeps_its_own_event(registry):
+    answer = registry.get("default").reply("tugas day 1").answer
+    assert "Tugas Day 1 ORMIK 2025" in answer
+    assert "Selasa, 16 September 2025" in answer
+
+
+def test_offtopic_reply_and_topic_keywords_are_the_tenants(registry):
+    agent = registry.get("ormik-2026")
+    offtopic = agent.reply("resep nasi goreng")
+    assert not offtopic.topic_ok
+    assert offtopic.answer == OFFTOPIC_2026
+
+    about = agent.analyze("ormik 2026")
+    assert about.topic_ok and about.intent == "ormik"
@@ -0,0 +1,34 @@
+"""Frames on /v1/chat/ws: bad ids get a 400 error frame and the connection stays usable."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.websocket import MAX_INT_ID, MIN_INT_ID, BadFrame, error_frame, parse_frame, reply_frame
+
+
+@pytest.mark.parametrize("request_id", [MAX_INT_ID + 1, MIN_INT_ID - 1, 2 ** 70, True, 1.5, None, "x" * 129])
+def test_parse_frame_rejects_ids_that_cannot_be_echoed(request_id):
+    with pytest.raises(BadFrame):
+        parse_frame(json.dumps({"id": request_id, "query": "jadwal"}))
+
+
+@pytest.mark.parametrize("request_id", [MAX_INT_ID, MIN_INT_ID, 0, "x" * 128])
+def test_accepted_ids_round_trip(request_id):
+    parsed, query = parse_frame(json.dumps({"id": request_id, "query": "jadwal"}))
+    assert (parsed, query) == (request_id, "jadwal")
+    assert json.loads(reply_frame(parsed, b"{}"))["id"] == request_id
+    assert json.loads(error_frame(parsed, 500, "Internal error"))["id"] == request_id
+
+
+def test_oversized_integer_id_gets_an_error_frame_and_the_socket_stays_open():
+    with TestClient(app) as client, client.websocket_connect("/v1/chat/ws") as ws:
+        ws.send_text(json.dumps({"id": 2 ** 70, "query": "jadwal"}))
+        error = json.loads(ws.receive_text())
+        assert error["id"] is None
+        assert error["error"]["status"] == 400
+
+        ws.send_text(json.dumps({"id": 1, "query": "jadwal"}))
+        reply = json.loads(ws.receive_text())
+        assert reply["id"] == 1 and reply["response"]["topic_ok"]